@@ -0,0 +1,271 @@
+"""
+Cache - In-process LRU/TTL cache with an optional SQLite disk tier
+Values must be JSON-serialisable so they can be persisted across restarts
+"""
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+from app.core.logger import logs
+import asyncio
+import inspect
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+# Returned by cache lookups when a key is absent (None is a valid cached value - negative caching)
+MISSING = object()
+
+
+def normalize_key(text: str) -> str:
+    """Normalise free text into a cache key: unicode-fold, lowercase, drop punctuation, collapse spaces"""
+    text = unicodedata.normalize("NFKC", text or "").casefold()
+    text = re.sub(r"[^\w\s'-]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class CacheEntry:
+    __slots__ = ("value", "stored_at", "expires_at")
+
+    def __init__(self, value: Any, stored_at: float, expires_at: float):
+        self.value = value
+        self.stored_at = stored_at
+        self.expires_at = expires_at
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return (now or time.time()) < self.expires_at
+
+
+class TTLCache:
+    """Bounded in-memory LRU where every entry carries its own expiry"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self.evictions = 0
+
+    def get_entry(self, key: str, allow_stale: bool = False) -> Optional[CacheEntry]:
+        """Return the entry (refreshing its LRU position); expired entries only with allow_stale"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if not allow_stale and not entry.is_fresh():
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def get(self, key: str) -> Any:
+        entry = self.get_entry(key)
+        return MISSING if entry is None else entry.value
+
+    def set(self, key: str, value: Any, ttl: float, stored_at: Optional[float] = None) -> CacheEntry:
+        stored_at = stored_at or time.time()
+        entry = CacheEntry(value, stored_at, stored_at + ttl)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return entry
+
+    def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """
+    File-backed key/value store that survives restarts
+    Several caches can share one database file through different namespaces
+    Methods are blocking - call them through asyncio.to_thread from async code
+    """
+
+    def __init__(self, path: str, namespace: str):
+        self.path = path
+        self.namespace = namespace
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT, "
+                "stored_at REAL NOT NULL, expires_at REAL NOT NULL, "
+                "PRIMARY KEY (namespace, key))"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT value, stored_at, expires_at FROM cache WHERE namespace = ? AND key = ?",
+                (self.namespace, key)
+            ).fetchone()
+        if row is None:
+            return None
+        return CacheEntry(json.loads(row[0]), row[1], row[2])
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, stored_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, key, json.dumps(value, separators=(",", ":")), now, now + ttl)
+            )
+            conn.commit()
+
+    def update(self, key: str, fn: Callable[[Any], Any], ttl: float) -> Any:
+        """
+        Read-modify-write one key in a single IMMEDIATE transaction: other connections to the
+        file (other workers) wait for the write lock instead of overwriting the change
+        fn gets the current value (None if absent or expired) and returns the new one, or None
+        to leave the row untouched. Returns what fn returned
+        """
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key)
+                ).fetchone()
+                now = time.time()
+                value = fn(json.loads(row[0]) if row is not None and now < row[1] else None)
+                if value is not None:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO cache (namespace, key, value, stored_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+                        (self.namespace, key, json.dumps(value, separators=(",", ":")), now, now + ttl)
+                    )
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+        return value
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key))
+            conn.commit()
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            conn = self._connection()
+            cursor = conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND expires_at < ?", (self.namespace, time.time())
+            )
+            conn.commit()
+            return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class TieredCache:
+    """Memory LRU in front of an optional SQLite tier, with hit/miss accounting"""
+
+    def __init__(self, memory: TTLCache, disk: Optional[SQLiteCache] = None):
+        self.memory = memory
+        self.disk = disk
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.disk_errors = 0
+        self.purged = 0
+
+    async def get(self, key: str) -> Tuple[bool, Any]:
+        """Returns (found, value); value may be None for a cached negative result"""
+        entry = self.memory.get_entry(key)
+        if entry is not None:
+            self.memory_hits += 1
+            return self._hit(entry.value)
+
+        if self.disk is not None:
+            try:
+                entry = await asyncio.to_thread(self.disk.get, key)
+            except Exception as e:
+                self.disk_errors += 1
+                logs.define_logger(level=30, message=f"Disk cache read failed: {str(e)}", loggName=inspect.stack()[0])
+                entry = None
+            if entry is not None and entry.is_fresh():
+                self.disk_hits += 1
+                # Promote to memory with the remaining lifetime
+                self.memory.set(key, entry.value, entry.expires_at - time.time(), stored_at=entry.stored_at)
+                return self._hit(entry.value)
+
+        self.misses += 1
+        return False, None
+
+    def _hit(self, value: Any) -> Tuple[bool, Any]:
+        if value is None:
+            self.negative_hits += 1
+        return True, value
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self.memory.set(key, value, ttl)
+        if self.disk is not None:
+            try:
+                await asyncio.to_thread(self.disk.set, key, value, ttl)
+            except Exception as e:
+                self.disk_errors += 1
+                logs.define_logger(level=30, message=f"Disk cache write failed: {str(e)}", loggName=inspect.stack()[0])
+
+    async def purge_expired(self) -> int:
+        """Delete expired rows from the disk tier (expired entries are never served from it)"""
+        if self.disk is None:
+            return 0
+        try:
+            removed = await asyncio.to_thread(self.disk.purge_expired)
+        except Exception as e:
+            self.disk_errors += 1
+            logs.define_logger(level=30, message=f"Disk cache purge failed: {str(e)}", loggName=inspect.stack()[0])
+            return 0
+        self.purged += removed
+        return removed
+
+    def close(self) -> None:
+        if self.disk is not None:
+            self.disk.close()
+
+    def stats(self) -> dict:
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "memory_entries": len(self.memory),
+            "evictions": self.memory.evictions,
+            "disk_errors": self.disk_errors,
+            "purged": self.purged,
+        }
+
+
+async def purge_expired_periodically(caches: list, interval: float) -> None:
+    """
+    Keep the SQLite file from growing without bound: purge every cache's expired rows at
+    startup and then every `interval` seconds (runs as a lifespan task until cancelled)
+    """
+    while True:
+        for cache in caches:
+            await cache.purge_expired()
+        await asyncio.sleep(interval)
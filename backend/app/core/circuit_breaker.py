@@ -0,0 +1,105 @@
+"""
+Circuit Breaker - Fail fast while an upstream is known to be down or throttled
+closed -> (consecutive failures, or a rate-limit answer) -> open -> (cooldown) -> half-open
+-> (probe succeeds) -> closed / (probe fails) -> open
+"""
+from typing import Optional
+from app.core.logger import logs
+import inspect
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose breaker is open"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} circuit is open, retry in {retry_after:.1f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.probe_in_flight = False
+        self.times_opened = 0
+        self.rejected = 0
+        self.last_error: Optional[str] = None
+
+    def retry_after(self) -> float:
+        """Seconds until the breaker lets a probe through (0 when calls are allowed)"""
+        if self.state == OPEN:
+            return max(0.0, self.open_until - time.monotonic())
+        if self.state == HALF_OPEN and self.probe_in_flight:
+            return self.recovery_timeout
+        return 0.0
+
+    def allow(self) -> None:
+        """Raise CircuitOpenError unless a call may go through now"""
+        if self.state == OPEN and time.monotonic() >= self.open_until:
+            self.state = HALF_OPEN
+            self.probe_in_flight = False
+        if self.state == CLOSED:
+            return
+        if self.state == HALF_OPEN and not self.probe_in_flight:
+            # One probe at a time decides whether the upstream has recovered
+            self.probe_in_flight = True
+            return
+        self.rejected += 1
+        raise CircuitOpenError(self.name, self.retry_after() or self.recovery_timeout)
+
+    def record_success(self) -> None:
+        if self.state != CLOSED:
+            logs.define_logger(
+                level=20,
+                message=f"{self.name} circuit closed - upstream recovered",
+                loggName=inspect.stack()[0]
+            )
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.probe_in_flight = False
+
+    def record_failure(self, error: str, cooldown: Optional[float] = None) -> None:
+        """
+        Count a failed call; `cooldown` (e.g. a 429's "retry in Ns") opens the breaker at once
+        for that long, since the upstream has told us it will keep refusing
+        """
+        self.last_error = error[:200]
+        self.consecutive_failures += 1
+        if cooldown is not None or self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self._open(cooldown if cooldown is not None else self.recovery_timeout)
+
+    def record_cancelled(self) -> None:
+        """A cancelled probe proves nothing - let the next caller probe instead"""
+        self.probe_in_flight = False
+
+    def _open(self, cooldown: float) -> None:
+        self.open_until = max(self.open_until, time.monotonic() + cooldown)
+        if self.state != OPEN:
+            self.times_opened += 1
+            logs.define_logger(
+                level=30,
+                message=f"{self.name} circuit opened for {cooldown:.1f}s after: {self.last_error}",
+                loggName=inspect.stack()[0]
+            )
+        self.state = OPEN
+        self.probe_in_flight = False
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "retry_after_s": round(self.retry_after(), 1),
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+            "last_error": self.last_error,
+        }
@@ -14,6 +14,135 @@ class Settings(BaseSettings):
     NOMINATIM_URL: str = "https://nominatim.openstreetmap.org/search"
     OPEN_METEO_URL: str = "https://api.open-meteo.com/v1/forecast"
     OVERPASS_URL: str = "https://overpass-api.de/api/interpreter"
+    PHOTON_URL: str = "https://photon.komoot.io/api/"
+
+    # Shared HTTP connection pool (one keep-alive client per upstream)
+    HTTP_MAX_CONNECTIONS: int = 20
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP2_ENABLED: bool = False  # Requires the optional 'h2' package
+    HTTP_CONNECT_TIMEOUT: float = 5.0
+
+    # Per-upstream read timeouts (seconds)
+    NOMINATIM_TIMEOUT: float = 30.0
+    PHOTON_TIMEOUT: float = 30.0
+    OPEN_METEO_TIMEOUT: float = 10.0
+    OVERPASS_TIMEOUT: float = 30.0
+
+    # Per-upstream rate limits: token bucket (requests/second + burst) and concurrent request cap
+    # Callers queue in arrival order and give up after RATE_LIMIT_MAX_WAIT seconds
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_MAX_WAIT: float = 5.0
+    NOMINATIM_RATE_PER_SEC: Optional[float] = 1.0  # Nominatim usage policy: at most 1 request per second
+    NOMINATIM_BURST: int = 1
+    NOMINATIM_MAX_CONCURRENT: Optional[int] = 1
+    PHOTON_RATE_PER_SEC: Optional[float] = 5.0
+    PHOTON_BURST: int = 5
+    PHOTON_MAX_CONCURRENT: Optional[int] = 4
+    OPEN_METEO_RATE_PER_SEC: Optional[float] = 10.0
+    OPEN_METEO_BURST: int = 10
+    OPEN_METEO_MAX_CONCURRENT: Optional[int] = 8
+    OVERPASS_RATE_PER_SEC: Optional[float] = None  # Overpass limits concurrent slots rather than rate
+    OVERPASS_BURST: int = 1
+    OVERPASS_MAX_CONCURRENT: Optional[int] = 2
+
+    # Hedged geocoding: race Nominatim and Photon instead of waiting for a full failure
+    GEO_HEDGE_ENABLED: bool = True
+    GEO_HEDGE_PERCENTILE: float = 95.0  # Launch the backup after the primary's p95 latency
+    GEO_HEDGE_DEFAULT_DELAY: float = 1.0  # Used until enough latency samples exist
+    GEO_HEDGE_MIN_DELAY: float = 0.25
+    GEO_HEDGE_MAX_DELAY: float = 3.0
+    GEO_HEDGE_MIN_SAMPLES: int = 5
+    GEO_STATS_EWMA_ALPHA: float = 0.2
+
+    # Offline gazetteer consulted before any geocoding network call (GeoNames TSV format)
+    GAZETTEER_ENABLED: bool = True
+    GAZETTEER_PATH: str = str(Path(__file__).resolve().parent.parent.parent / "data" / "gazetteer.tsv")
+
+    # Identical concurrent upstream calls (same place, weather cell or attraction search) share one request
+    SINGLEFLIGHT_ENABLED: bool = True
+
+    # Caching
+    CACHE_DB_PATH: str = "cache/tourism_cache.sqlite3"  # SQLite file for persistent cache tiers
+    CACHE_PURGE_INTERVAL: float = 6 * 3600  # Expired rows are deleted at startup and then this often
+    GEO_CACHE_ENABLED: bool = True
+    GEO_CACHE_DISK_ENABLED: bool = True
+    GEO_CACHE_MAX_ENTRIES: int = 10000
+    GEO_CACHE_TTL: float = 30 * 24 * 3600  # Coordinates of a place name practically never change
+    GEO_CACHE_NEGATIVE_TTL: float = 24 * 3600  # Places the geocoders definitively did not find
+    WEATHER_CACHE_ENABLED: bool = True
+    WEATHER_CACHE_MAX_ENTRIES: int = 5000
+    WEATHER_GRID_DEGREES: float = 0.25  # Cell size (~25 km) - a city and its landmarks share one entry
+    WEATHER_UPDATE_INTERVAL: float = 900  # Open-Meteo refreshes current conditions every 15 minutes
+    WEATHER_STALE_WINDOW: float = 3600  # Serve expired entries this long while refreshing in the background
+    PLACES_CACHE_ENABLED: bool = True
+    PLACES_CACHE_DISK_ENABLED: bool = True
+    PLACES_CACHE_MAX_TILES: int = 2000
+    PLACES_TILE_ZOOM: int = 12  # Slippy-map zoom of POI tiles (~6 km wide at mid latitudes)
+    PLACES_TILE_TTL: float = 7 * 24 * 3600  # OSM attractions change slowly
+    PLACES_TILE_MAX_POIS: int = 200  # Best-ranked named POIs kept per tile
+    PLACES_SEARCH_RADIUS_M: int = 10000
+
+    # Query analysis fast path - rule-based classification of unambiguous queries, skipping the LLM
+    QUERY_FAST_PATH_ENABLED: bool = True
+    QUERY_FAST_PATH_MAX_WORDS: int = 20  # Longer queries are usually nuanced - leave them to the LLM
+    # Complex (trip-planning) queries get their execution plan from the analysis call itself,
+    # so planning_node does not need a second LLM round-trip
+    FUSED_ANALYSIS_PLANNING_ENABLED: bool = True
+
+    # LLM completion cache (exact match on provider, model, messages and temperature)
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_DISK_ENABLED: bool = True
+    LLM_CACHE_MAX_ENTRIES: int = 2000
+    LLM_CACHE_MAX_TEMPERATURE: float = 0.4  # Calls at or below this are cached unless the caller says otherwise
+    LLM_CACHE_DEFAULT_TTL: float = 6 * 3600
+    LLM_CACHE_ANALYSIS_TTL: float = 24 * 3600  # Query analysis / planning depend only on the prompt
+    # Final answers: None keeps the temperature rule; a TTL caches every answer (its prompt already
+    # embeds the weather/places data, so an entry is only reused for identical data)
+    LLM_CACHE_SYNTHESIS_TTL: Optional[float] = None
+    # Response cache - reuse a recent final answer for the same analysed intent and a similar query
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL: float = 3600  # Freshness window; weather answers also expire with their weather entry
+    RESPONSE_CACHE_SIMILARITY: float = 0.6  # Trigram similarity of the query's remaining words (0-1)
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1000  # Intent keys kept in memory
+    RESPONSE_CACHE_VARIANTS_PER_KEY: int = 8  # Differently-worded answers kept per intent
+
+    # LLM call resilience: retries stay inside a wall-clock budget, a circuit breaker fails fast
+    # while the provider is down or throttled
+    LLM_CALL_BUDGET: float = 30.0  # Seconds for one completion, retries included
+    LLM_RETRY_BASE_DELAY: float = 0.5  # Exponential backoff with jitter: 0.5s, 1s, 2s...
+    LLM_RETRY_MAX_DELAY: float = 4.0
+    LLM_BREAKER_FAILURE_THRESHOLD: int = 5  # Consecutive failures that open the breaker
+    LLM_BREAKER_RECOVERY_TIMEOUT: float = 30.0  # Open time before a half-open probe
+    LLM_RATE_LIMIT_COOLDOWN: float = 60.0  # Open time after a 429 that carries no "retry in Ns" hint
+    # Provider pool: AI_PROVIDER first, then every provider in this order that has an API key
+    AI_PROVIDER_ORDER: str = "openai,anthropic,gemini"
+    LLM_FAILOVER_ENABLED: bool = True  # False keeps AI_PROVIDER only
+    # Hedging: race the next provider when the current one has not answered within the threshold
+    LLM_HEDGE_ENABLED: bool = True
+    LLM_HEDGE_DEFAULT_DELAY: float = 5.0
+    LLM_HEDGE_ANALYSIS_DELAY: float = 2.5  # Query analysis / planning - short JSON answers
+    LLM_HEDGE_SYNTHESIS_DELAY: float = 8.0  # Final answers are long; hedge only when clearly stuck
+    LLM_STATS_EWMA_ALPHA: float = 0.2  # Smoothing of each provider's latency/success averages (metrics)
+
+    # End-to-end request deadline: every upstream and LLM call sizes its timeout from what is left
+    REQUEST_DEADLINE: float = 25.0  # Seconds for one chat request (0 disables)
+    REQUEST_SYNTHESIS_RESERVE: float = 8.0  # Held back for the final answer; optional data is dropped to keep it
+    REQUEST_MIN_FETCH_BUDGET: float = 0.5  # Skip an optional fetch outright when less than this is left for it
+
+    # Server-side sessions: clients send a session_id instead of the whole conversation_history
+    SESSION_STORE: str = "sqlite"  # "sqlite" (CACHE_DB_PATH - survives restarts, shared by workers) or "memory"
+    SESSION_TTL: float = 24 * 3600  # Idle sessions expire after this long
+    SESSION_MAX_ENTRIES: int = 10000  # Memory store only - least recently used sessions are dropped
+    SESSION_MAX_MESSAGES: int = 40  # Unsummarised messages kept per session (oldest dropped if summaries fall behind)
+
+    # Prompt context: a rolling summary of older turns plus the newest messages, within a fixed budget
+    CONVERSATION_CONTEXT_TOKENS: int = 600  # Summary + recent messages in the analysis and answer prompts
+    CONVERSATION_MESSAGE_MAX_TOKENS: int = 150  # Longer messages (usually answers) are cut in the prompt
+    SUMMARY_ENABLED: bool = True
+    SUMMARY_MAX_TOKENS: int = 250
+    SUMMARY_RECENT_MESSAGES: int = 4  # Newest messages always kept verbatim, never folded
+    SUMMARY_BATCH_MESSAGES: int = 4  # Fold once this many older messages have built up (one LLM call per 2 turns)
 
     # AI Configuration
     AI_PROVIDER: str = os.getenv("AI_PROVIDER", "openai")
@@ -0,0 +1,60 @@
+"""
+Request Deadline - One wall-clock budget per chat request, carried in a context variable
+Set at the route; repo, rate-limit and LLM calls size their timeouts from what is left, and
+the graph drops optional data (weather, places) when the rest is needed for the answer
+"""
+from contextlib import contextmanager
+from contextvars import Context, ContextVar, copy_context
+from typing import Iterator, Optional
+import time
+
+# Absolute time.monotonic() deadline of the current request (None outside a request)
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+deadline_stats = {"deadline_exceeded": 0, "skipped_fetches": 0, "degraded_answers": 0}
+
+
+class DeadlineExceeded(TimeoutError):
+    """Nothing is left of the request's budget for this step"""
+
+
+@contextmanager
+def request_deadline(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Run the block under a budget of `seconds` (None or 0: no deadline)
+    Tasks created inside the block inherit it - asyncio copies the context into new tasks
+    """
+    token = _deadline.set(time.monotonic() + seconds if seconds else None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def time_remaining() -> Optional[float]:
+    """Seconds left before the current request's deadline (None without one, may be negative)"""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def step_timeout(default: float, reserve: float = 0.0) -> float:
+    """
+    Timeout for one step: `default`, capped at what is left after holding back `reserve`
+    seconds for later steps. Raises DeadlineExceeded when nothing is left
+    """
+    left = time_remaining()
+    if left is None:
+        return default
+    left -= reserve
+    if left <= 0:
+        deadline_stats["deadline_exceeded"] += 1
+        held_back = f" ({reserve:.1f}s held back for later steps)" if reserve else ""
+        raise DeadlineExceeded(f"request deadline reached{held_back}")
+    return min(default, left)
+
+
+def without_deadline() -> Context:
+    """Context for background work started during a request, which must outlive its budget"""
+    context = copy_context()
+    context.run(_deadline.set, None)
+    return context
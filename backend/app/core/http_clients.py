@@ -0,0 +1,98 @@
+"""
+Shared HTTP clients - one pooled, keep-alive httpx.AsyncClient per upstream API
+Created in the FastAPI lifespan hook and injected into the repos
+"""
+from typing import Dict
+from app.core.config import settings
+from app.core.logger import logs
+from app.core.deadline import step_timeout
+import httpx
+import inspect
+
+
+class HttpClientPool:
+    """Holds one long-lived AsyncClient per upstream so connections are reused across requests"""
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._timeouts: Dict[str, float] = {
+            "nominatim": settings.NOMINATIM_TIMEOUT,
+            "photon": settings.PHOTON_TIMEOUT,
+            "open_meteo": settings.OPEN_METEO_TIMEOUT,
+            "overpass": settings.OVERPASS_TIMEOUT,
+        }
+
+    def _http2_available(self) -> bool:
+        """HTTP/2 needs the optional 'h2' package; fall back to HTTP/1.1 keep-alive without it"""
+        if not settings.HTTP2_ENABLED:
+            return False
+        try:
+            import h2  # noqa: F401
+            return True
+        except ImportError:
+            logs.define_logger(
+                level=30,
+                message="HTTP2_ENABLED is set but 'h2' is not installed, using HTTP/1.1",
+                loggName=inspect.stack()[0]
+            )
+            return False
+
+    def _create_client(self, upstream: str) -> httpx.AsyncClient:
+        read_timeout = self._timeouts.get(upstream, 30.0)
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=min(settings.HTTP_CONNECT_TIMEOUT, read_timeout)),
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+            ),
+            http2=self._http2_available(),
+            follow_redirects=True,
+            headers={"User-Agent": "TourismAIIntern/1.0"},
+        )
+
+    def timeout(self, upstream: str) -> httpx.Timeout:
+        """
+        Per-request timeout: the upstream's read timeout, cut down to the request's remaining budget
+        Raises DeadlineExceeded when the budget is already spent
+        """
+        read_timeout = step_timeout(self._timeouts.get(upstream, 30.0))
+        return httpx.Timeout(read_timeout, connect=min(settings.HTTP_CONNECT_TIMEOUT, read_timeout))
+
+    async def start(self) -> None:
+        """Create a client for every known upstream (called from the lifespan hook)"""
+        for upstream in self._timeouts:
+            self.client(upstream)
+        logs.define_logger(
+            level=20,
+            message=f"HTTP client pool started for: {', '.join(self._clients)}",
+            loggName=inspect.stack()[0]
+        )
+
+    def client(self, upstream: str) -> httpx.AsyncClient:
+        """
+        Get the shared client for an upstream
+        Clients are created lazily so the repos also work outside the app lifespan (scripts, benchmarks)
+        """
+        client = self._clients.get(upstream)
+        if client is None or client.is_closed:
+            client = self._create_client(upstream)
+            self._clients[upstream] = client
+        return client
+
+    async def aclose(self) -> None:
+        """Close every pooled connection (called on shutdown)"""
+        for upstream, client in list(self._clients.items()):
+            try:
+                await client.aclose()
+            except Exception as e:
+                logs.define_logger(
+                    level=30,
+                    message=f"Error closing HTTP client for {upstream}: {str(e)}",
+                    loggName=inspect.stack()[0]
+                )
+        self._clients.clear()
+
+
+# Singleton instance
+http_clients = HttpClientPool()
@@ -0,0 +1,94 @@
+"""
+JSON Stream - Incremental extraction of array items from a streamed JSON document
+Lets callers process large responses (e.g. Overpass "elements") item by item without
+buffering the whole body, and stop reading as soon as they have enough
+"""
+from typing import Any, List
+import json
+import re
+
+# Structural characters outside strings, and the characters that matter inside a string
+_OUTSIDE = re.compile(rb'["{}\[\]]')
+_INSIDE = re.compile(rb'["\\]')
+
+
+class JsonArrayStreamParser:
+    """
+    Feed raw byte chunks; get back every item of the top-level `field` array completed so far
+    Only object/array items are supported, which is what the Overpass API returns
+    """
+
+    def __init__(self, field: str):
+        self._field_pattern = re.compile(rb'"' + re.escape(field.encode()) + rb'"\s*:\s*\[')
+        self._buffer = bytearray()
+        self._pos = 0
+        self._in_array = False
+        self._in_string = False
+        self._depth = 0
+        self._item_start = -1
+        self.done = False
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        if self.done:
+            return []
+        self._buffer.extend(chunk)
+        items: List[Any] = []
+
+        if not self._in_array:
+            match = self._field_pattern.search(self._buffer)
+            if match is None:
+                return items
+            self._in_array = True
+            self._pos = match.end()
+
+        buffer = self._buffer
+        while True:
+            if self._in_string:
+                match = _INSIDE.search(buffer, self._pos)
+                if match is None:
+                    self._pos = len(buffer)
+                    break
+                if buffer[match.start()] == 0x5C:  # backslash - skip the escaped character
+                    if match.start() + 1 >= len(buffer):
+                        self._pos = match.start()  # Escape split across chunks, wait for more data
+                        break
+                    self._pos = match.start() + 2
+                    continue
+                self._in_string = False
+                self._pos = match.end()
+                continue
+
+            match = _OUTSIDE.search(buffer, self._pos)
+            if match is None:
+                self._pos = len(buffer)
+                break
+            char = buffer[match.start()]
+            self._pos = match.end()
+
+            if char == 0x22:  # "
+                self._in_string = True
+            elif char in (0x7B, 0x5B):  # { [
+                if self._depth == 0:
+                    self._item_start = match.start()
+                self._depth += 1
+            elif self._depth == 0:  # ] closing the array itself
+                self.done = True
+                break
+            else:  # } ]
+                self._depth -= 1
+                if self._depth == 0:
+                    items.append(json.loads(bytes(buffer[self._item_start:self._pos])))
+                    self._item_start = -1
+
+        # Drop everything already consumed so memory stays bounded by the largest single item
+        keep_from = self._item_start if self._item_start >= 0 else self._pos
+        if keep_from > 0:
+            del buffer[:keep_from]
+            self._pos -= keep_from
+            if self._item_start >= 0:
+                self._item_start = 0
+        return items
+
+    def remainder(self) -> bytes:
+        """What follows the array in the data fed so far (e.g. a trailing "remark"), once done"""
+        return bytes(self._buffer[self._pos:]) if self.done else b""
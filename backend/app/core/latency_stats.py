@@ -0,0 +1,64 @@
+"""
+Latency Stats - Adaptive per-provider latency and success tracking
+Used to order providers and to size hedging delays from observed percentiles
+"""
+from collections import deque
+from typing import Optional
+
+
+class ProviderStats:
+    """EWMA latency / success score plus a sliding window of recent latencies"""
+
+    def __init__(self, alpha: float = 0.2, window: int = 50):
+        self.alpha = alpha
+        self.ewma_latency: Optional[float] = None
+        self.success_rate: float = 1.0  # Optimistic until proven otherwise
+        self.samples: deque = deque(maxlen=window)
+        self.calls = 0
+        self.failures = 0
+
+    def record(self, latency: float, success: bool) -> None:
+        """Record a completed call"""
+        self.calls += 1
+        if not success:
+            self.failures += 1
+        self.samples.append(latency)
+        self._update_latency(latency)
+        self.success_rate = self.alpha * (1.0 if success else 0.0) + (1 - self.alpha) * self.success_rate
+
+    def record_censored(self, elapsed: float) -> None:
+        """
+        Record a call that was cancelled before finishing (e.g. it lost a hedged race)
+        We only know its latency was at least `elapsed`, so it can only push the estimate up
+        """
+        if self.ewma_latency is None or elapsed > self.ewma_latency:
+            self._update_latency(elapsed)
+
+    def _update_latency(self, latency: float) -> None:
+        if self.ewma_latency is None:
+            self.ewma_latency = latency
+        else:
+            self.ewma_latency = self.alpha * latency + (1 - self.alpha) * self.ewma_latency
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Latency percentile over the recent window (None until there are samples)"""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+        return ordered[index]
+
+    def score(self) -> Optional[float]:
+        """Lower is better: expected latency inflated by the failure rate (None without data)"""
+        if self.ewma_latency is None:
+            return None
+        return self.ewma_latency / max(self.success_rate, 0.05)
+
+    def snapshot(self) -> dict:
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "ewma_latency_ms": round(self.ewma_latency * 1000, 1) if self.ewma_latency is not None else None,
+            "p95_latency_ms": round(self.percentile(95) * 1000, 1) if self.samples else None,
+            "success_rate": round(self.success_rate, 3),
+        }
@@ -0,0 +1,161 @@
+"""
+Rate Limiting - Per-upstream token bucket plus concurrency cap with a fair (FIFO) queue
+Keeps bursts inside each provider's usage policy (Nominatim: ~1 request/second, Overpass:
+a few concurrent slots) by making callers wait their turn instead of collecting 429s
+"""
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+from app.core.config import settings
+from app.core.logger import logs
+from app.core.deadline import time_remaining
+import asyncio
+import inspect
+import time
+
+
+class RateLimitExceeded(Exception):
+    """No slot became available within the caller's max wait"""
+
+
+class RateLimiter:
+    """
+    Token bucket (rate, burst) and/or concurrency cap for one upstream
+    Callers are served strictly in arrival order; a caller that cannot be served within
+    max_wait is rejected - immediately when the bucket already predicts a longer wait
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate: Optional[float] = None,
+        burst: int = 1,
+        max_concurrency: Optional[int] = None,
+        max_wait: Optional[float] = None,
+    ):
+        self.name = name
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_concurrency = max_concurrency
+        self.max_wait = max_wait if max_wait is not None else settings.RATE_LIMIT_MAX_WAIT
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._line = asyncio.Lock()  # asyncio.Lock wakes waiters in arrival order
+        self._slots = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+
+        self.waiting = 0
+        self.in_use = 0
+        self.max_queue_depth = 0
+        self.acquired = 0
+        self.rejected = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    @asynccontextmanager
+    async def slot(self, max_wait: Optional[float] = None) -> AsyncIterator[None]:
+        """Hold one request slot for the duration of the block"""
+        if not settings.RATE_LIMIT_ENABLED:
+            yield
+            return
+        await self.acquire(max_wait)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, max_wait: Optional[float] = None) -> None:
+        max_wait = self.max_wait if max_wait is None else max_wait
+        left = time_remaining()
+        if left is not None:
+            # Never queue past the request's deadline
+            max_wait = min(max_wait, left)
+        if self.rate and self._predicted_wait() > max_wait:
+            self._reject(f"queue of {self.waiting} needs ~{self._predicted_wait():.1f}s")
+
+        start = time.monotonic()
+        self.waiting += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.waiting)
+        try:
+            await asyncio.wait_for(self._acquire(), timeout=max(max_wait, 0.0))
+        except asyncio.TimeoutError:
+            self._reject(f"no slot within {max_wait:.1f}s")
+        finally:
+            self.waiting -= 1
+
+        waited = time.monotonic() - start
+        self.acquired += 1
+        self.in_use += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+
+    def release(self) -> None:
+        self.in_use -= 1
+        if self._slots:
+            self._slots.release()
+
+    async def _acquire(self) -> None:
+        async with self._line:
+            if self._slots:
+                await self._slots.acquire()
+            try:
+                await self._take_token()
+            except BaseException:
+                if self._slots:
+                    self._slots.release()
+                raise
+
+    async def _take_token(self) -> None:
+        if not self.rate:
+            return
+        while True:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _predicted_wait(self) -> float:
+        """Time until a caller joining the queue now would get its token"""
+        self._refill()
+        return max(0.0, (self.waiting + 1 - self._tokens) / self.rate)
+
+    def _reject(self, reason: str) -> None:
+        self.rejected += 1
+        logs.define_logger(
+            level=30,
+            message=f"Rate limit for {self.name}: {reason}, giving up",
+            loggName=inspect.stack()[0]
+        )
+        raise RateLimitExceeded(f"{self.name}: {reason}")
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self.waiting,
+            "max_queue_depth": self.max_queue_depth,
+            "in_use": self.in_use,
+            "acquired": self.acquired,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.wait_total / self.acquired * 1000, 1) if self.acquired else 0.0,
+            "max_wait_ms": round(self.wait_max * 1000, 1),
+        }
+
+
+# One limiter per upstream, shared by every repo instance
+rate_limiters: Dict[str, RateLimiter] = {
+    "nominatim": RateLimiter(
+        "nominatim", settings.NOMINATIM_RATE_PER_SEC, settings.NOMINATIM_BURST, settings.NOMINATIM_MAX_CONCURRENT
+    ),
+    "photon": RateLimiter(
+        "photon", settings.PHOTON_RATE_PER_SEC, settings.PHOTON_BURST, settings.PHOTON_MAX_CONCURRENT
+    ),
+    "open_meteo": RateLimiter(
+        "open_meteo", settings.OPEN_METEO_RATE_PER_SEC, settings.OPEN_METEO_BURST, settings.OPEN_METEO_MAX_CONCURRENT
+    ),
+    "overpass": RateLimiter(
+        "overpass", settings.OVERPASS_RATE_PER_SEC, settings.OVERPASS_BURST, settings.OVERPASS_MAX_CONCURRENT
+    ),
+}
@@ -0,0 +1,68 @@
+"""
+SingleFlight - Coalesce identical concurrent calls into one in-flight task
+When a city trends, many requests ask the upstreams the same question at the same moment;
+the first caller (the leader) starts the call and everyone else awaits its result.
+"""
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+from app.core.config import settings
+from app.core.deadline import time_remaining, without_deadline
+import asyncio
+
+T = TypeVar("T")
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Per-key shared tasks. Results are shared objects - callers must not mutate them
+    Cancelling one waiter never cancels the call for the others; the call is only
+    cancelled when every waiter has gone away (or reached its request deadline)
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self.calls = 0  # Calls that actually ran
+        self.coalesced = 0  # Callers that joined a call already in flight
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        if not settings.SINGLEFLIGHT_ENABLED:
+            return await fn()
+
+        call = self._calls.get(key)
+        if call is None:
+            # The shared call belongs to no single request, so it runs without the leader's
+            # deadline; each waiter below gives up at its own
+            call = _Call(asyncio.create_task(fn(), context=without_deadline()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+
+        call.waiters += 1
+        try:
+            # shield: a cancelled (or timed-out) waiter stops waiting without cancelling the shared task
+            left = time_remaining()
+            return await asyncio.wait_for(asyncio.shield(call.task), timeout=None if left is None else max(left, 0.0))
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # The last interested caller was cancelled - nobody needs the result
+                call.task.cancel()
+
+    def _forget(self, key: Hashable, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        # Consume the outcome so an abandoned failure is not reported as "never retrieved"
+        if not call.task.cancelled():
+            call.task.exception()
+
+    def stats(self) -> dict:
+        return {"calls": self.calls, "coalesced": self.coalesced, "in_flight": len(self._calls)}
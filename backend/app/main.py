@@ -1,7 +1,16 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import asyncio
 from app.routes.tourism_routes import router as tourism_router
+from app.core.http_clients import http_clients
+from app.core.cache import purge_expired_periodically
+from app.core.config import settings
+from app.repos.geo_repo import geo_cache
+from app.repos.gazetteer_repo import gazetteer
+from app.repos.places_repo import places_cache
+from app.repos.session_repo import session_repo
+from app.services.ai_client import llm_cache
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -10,8 +19,19 @@ async def lifespan(app: FastAPI):
     """
     print("Application startup...")
     print("Initializing Tourism AI Agent system...")
+    await http_clients.start()
+    gazetteer.load()
+    purge_task = asyncio.create_task(
+        purge_expired_periodically([geo_cache, places_cache, llm_cache, session_repo], settings.CACHE_PURGE_INTERVAL)
+    )
     yield 
     print("Application shutdown...")
+    purge_task.cancel()
+    await http_clients.aclose()
+    geo_cache.close()
+    places_cache.close()
+    llm_cache.close()
+    session_repo.close()
 
 app = FastAPI(
     title="Multi-Agent Tourism API",
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 
 class ConversationMessage(BaseModel):
@@ -7,7 +7,8 @@ class ConversationMessage(BaseModel):
 
 class UserQuery(BaseModel):
     query: str
-    conversation_history: Optional[List[ConversationMessage]] = []
+    session_id: Optional[str] = Field(None, max_length=64)  # From the previous response; history is kept server-side
+    conversation_history: Optional[List[ConversationMessage]] = []  # Legacy clients without a session
 
 class ReasoningStep(BaseModel):
     agent: str  # Name of the agent/node
@@ -24,6 +25,7 @@ class AgentResponse(BaseModel):
     weather_info: Optional[str] = None
     places_info: Optional[List[str]] = None
     final_response: str
-    conversation_history: List[ConversationMessage]
+    session_id: Optional[str] = None
+    conversation_history: List[ConversationMessage]  # Just the new turn, or the full history for clients that sent one
     reasoning_trace: Optional[List[ReasoningStep]] = []
     suggestions: Optional[List[ProactiveSuggestion]] = []
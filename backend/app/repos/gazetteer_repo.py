@@ -0,0 +1,244 @@
+"""
+Gazetteer - Offline place-name index loaded from a GeoNames-style TSV file
+Resolves well-known cities and landmarks in microseconds, without any network call
+"""
+from array import array
+from bisect import bisect_left
+from heapq import nsmallest
+from typing import Iterator, List, NamedTuple, Optional
+from app.core.config import settings
+from app.core.logger import logs
+from app.core.cache import normalize_key
+from app.models.location_models import LocationData
+import inspect
+import os
+import re
+import threading
+
+# GeoNames "geoname" table column positions
+COL_NAME, COL_ASCII_NAME, COL_ALTERNATE_NAMES = 1, 2, 3
+COL_LAT, COL_LON, COL_FEATURE_CLASS, COL_COUNTRY, COL_ADMIN1, COL_POPULATION = 4, 5, 6, 8, 10, 14
+
+# Feature classes that denote a city/region rather than a single attraction
+# (P populated place, A admin area, L parks/areas)
+REGION_FEATURE_CLASSES = {"P", "A", "L"}
+
+# Place names that are also everyday words - only matched in free text when capitalised mid-sentence
+COMMON_WORD_NAMES = {"nice", "rom", "reading", "bath", "split", "mobile", "orange", "male"}
+
+# Country names accepted as a qualifier ("Paris, France"); ISO codes ("Paris, FR") always work
+COUNTRY_NAMES = {
+    "AE": ["United Arab Emirates", "UAE"], "AR": ["Argentina"], "AT": ["Austria"], "AU": ["Australia"],
+    "BE": ["Belgium"], "BR": ["Brazil", "Brasil"], "CA": ["Canada"], "CH": ["Switzerland"], "CN": ["China"],
+    "CZ": ["Czechia", "Czech Republic"], "DE": ["Germany", "Deutschland"], "DK": ["Denmark"], "EG": ["Egypt"],
+    "ES": ["Spain", "España"], "FI": ["Finland"], "FR": ["France"],
+    "GB": ["United Kingdom", "UK", "Great Britain", "Britain", "England", "Scotland", "Wales", "Northern Ireland"],
+    "GR": ["Greece"], "HK": ["Hong Kong"], "HU": ["Hungary"], "ID": ["Indonesia"], "IE": ["Ireland"],
+    "IL": ["Israel"], "IN": ["India"], "IS": ["Iceland"], "IT": ["Italy", "Italia"], "JP": ["Japan"],
+    "KE": ["Kenya"], "KH": ["Cambodia"], "KR": ["South Korea", "Korea"], "LK": ["Sri Lanka"], "MA": ["Morocco"],
+    "MX": ["Mexico", "México"], "MY": ["Malaysia"], "NL": ["Netherlands", "Holland"], "NO": ["Norway"],
+    "NP": ["Nepal"], "NZ": ["New Zealand"], "PE": ["Peru"], "PH": ["Philippines"], "PL": ["Poland"],
+    "PT": ["Portugal"], "QA": ["Qatar"], "RU": ["Russia"], "SE": ["Sweden"], "SG": ["Singapore"],
+    "TH": ["Thailand"], "TR": ["Turkey", "Türkiye"], "TW": ["Taiwan"],
+    "US": ["United States", "United States of America", "USA", "U.S.", "U.S.A.", "America"],
+    "VN": ["Vietnam", "Viet Nam"], "ZA": ["South Africa"],
+}
+_COUNTRY_BY_NAME = {normalize_key(name): code for code, names in COUNTRY_NAMES.items() for name in names}
+
+# Longest alias (in words) tried when scanning free text
+MAX_NAME_WORDS = 5
+
+_WORD = re.compile(r"[\w'-]+")
+
+
+class PlaceMatch(NamedTuple):
+    """A gazetteer place found in free text"""
+    text: str  # As written in the text
+    location: LocationData
+    is_city: bool  # City/region (True) or a specific attraction/landmark (False)
+    start: int  # Character span of the match in the text
+    end: int
+
+
+class Gazetteer:
+    """
+    Compact, array-backed index:
+    - one row per place (name, country, lat, lon, population in parallel arrays)
+    - one sorted list of normalised keys (name, ascii name, aliases) pointing at rows,
+      ordered by population within equal keys so the most populous match comes first
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.names: List[str] = []
+        self.countries: List[str] = []
+        self.admin_codes: List[str] = []
+        self.lats = array("d")
+        self.lons = array("d")
+        self.populations = array("q")
+        self.feature_classes: List[str] = []
+        self.keys: List[str] = []
+        self.key_rows = array("i")
+        self.loaded = False
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def load(self) -> None:
+        """Parse the data file and build the index (idempotent)"""
+        with self._lock:
+            if self.loaded:
+                return
+            if not os.path.exists(self.path):
+                self.loaded = True
+                logs.define_logger(
+                    level=30,
+                    message=f"Gazetteer file not found at {self.path}, offline geocoding disabled",
+                    loggName=inspect.stack()[0]
+                )
+                return
+
+            pairs = []
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    cols = line.rstrip("\n").split("\t")
+                    if len(cols) <= COL_POPULATION:
+                        continue
+                    try:
+                        lat, lon = float(cols[COL_LAT]), float(cols[COL_LON])
+                        population = int(cols[COL_POPULATION] or 0)
+                    except ValueError:
+                        continue
+
+                    row = len(self.names)
+                    self.names.append(cols[COL_NAME])
+                    self.countries.append(cols[COL_COUNTRY])
+                    self.admin_codes.append(cols[COL_ADMIN1])
+                    self.lats.append(lat)
+                    self.lons.append(lon)
+                    self.populations.append(population)
+                    self.feature_classes.append(cols[COL_FEATURE_CLASS])
+
+                    aliases = {cols[COL_NAME], cols[COL_ASCII_NAME]}
+                    aliases.update(alias for alias in cols[COL_ALTERNATE_NAMES].split(",") if alias)
+                    for key in {normalize_key(alias) for alias in aliases}:
+                        if len(key) >= 2:
+                            pairs.append((key, -population, row))
+
+            pairs.sort()
+            self.keys = [key for key, _, _ in pairs]
+            self.key_rows = array("i", (row for _, _, row in pairs))
+            self.loaded = True
+
+            logs.define_logger(
+                level=20,
+                message=f"Gazetteer loaded: {len(self.names)} places, {len(self.keys)} names",
+                loggName=inspect.stack()[0]
+            )
+
+    def _location(self, row: int) -> LocationData:
+        return LocationData(name=self.names[row], lat=self.lats[row], lon=self.lons[row])
+
+    def _exact_row(self, key: str) -> Optional[int]:
+        index = bisect_left(self.keys, key)
+        if index < len(self.keys) and self.keys[index] == key:
+            return self.key_rows[index]
+        return None
+
+    def _rows(self, key: str) -> Iterator[int]:
+        """Every row with this name or alias, most populous first"""
+        index = bisect_left(self.keys, key)
+        while index < len(self.keys) and self.keys[index] == key:
+            yield self.key_rows[index]
+            index += 1
+
+    def _in_region(self, row: int, qualifier: str) -> bool:
+        """Whether a normalised qualifier names the row's country (code or name) or admin area code"""
+        country = self.countries[row]
+        return qualifier in (country.lower(), self.admin_codes[row].lower()) or _COUNTRY_BY_NAME.get(qualifier) == country
+
+    def lookup(self, place_name: str) -> Optional[LocationData]:
+        """
+        Exact or alias match ("Bangalore" -> Bengaluru); the most populous place wins ties
+        "Name, qualifier" matches the name only in a country or admin area the qualifier names
+        ("Paris, US" -> Paris, Texas); an unrecognised qualifier ("Paris, Texas") is a miss,
+        left to the geocoders rather than answered with the wrong Paris
+        """
+        if not self.loaded:
+            self.load()
+
+        row = self._exact_row(normalize_key(place_name))
+        if row is None and "," in place_name:
+            name, *rest = place_name.split(",")
+            qualifiers = [key for key in map(normalize_key, rest) if key]
+            row = next((candidate for candidate in self._rows(normalize_key(name))
+                        if not qualifiers or any(self._in_region(candidate, q) for q in qualifiers)), None)
+
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._location(row)
+
+    def search_prefix(self, prefix: str, limit: int = 5) -> List[LocationData]:
+        """Places whose name or alias starts with the prefix, most populous first"""
+        if not self.loaded:
+            self.load()
+
+        key = normalize_key(prefix)
+        if not key:
+            return []
+        start = bisect_left(self.keys, key)
+        end = bisect_left(self.keys, key + "\uffff")
+        rows = set(self.key_rows[start:end])
+        ranked = nsmallest(limit, rows, key=lambda row: -self.populations[row])
+        return [self._location(row) for row in ranked]
+
+    def find_in_text(self, text: str) -> List[PlaceMatch]:
+        """
+        Places mentioned in free text, left to right, longest alias first ("Tokyo Tower" over "Tokyo")
+        Short abbreviations (LA, NYC) must be upper-case and common-word names (Nice) capitalised
+        mid-sentence, so "nice places" or "la" never match
+        """
+        if not self.loaded:
+            self.load()
+
+        words = [(m.group(), normalize_key(m.group()), m.span()) for m in _WORD.finditer(text)]
+        matches: List[PlaceMatch] = []
+        i = 0
+        while i < len(words):
+            for n in range(min(MAX_NAME_WORDS, len(words) - i), 0, -1):
+                span = words[i:i + n]
+                key = " ".join(norm for _, norm, _ in span)
+                row = self._exact_row(key)
+                if row is None:
+                    continue
+                surface = " ".join(original for original, _, _ in span)
+                if n == 1 and len(key) <= 2 and not surface.isupper():
+                    continue
+                if n == 1 and key in COMMON_WORD_NAMES and (i == 0 or not surface[0].isupper()):
+                    continue
+                matches.append(PlaceMatch(
+                    text=surface,
+                    location=self._location(row),
+                    is_city=self.feature_classes[row] in REGION_FEATURE_CLASSES,
+                    start=span[0][2][0],
+                    end=span[-1][2][1]
+                ))
+                i += n
+                break
+            else:
+                i += 1
+        return matches
+
+    def stats(self) -> dict:
+        return {
+            "places": len(self.names),
+            "names": len(self.keys),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# Singleton instance
+gazetteer = Gazetteer(settings.GAZETTEER_PATH)
@@ -1,27 +1,191 @@
-import httpx
+import asyncio
 import inspect
-from typing import Optional
+import time
+from typing import Dict, Optional, Tuple
 from app.core.config import settings
 from app.core.logger import logs
+from app.core.http_clients import HttpClientPool, http_clients
+from app.core.latency_stats import ProviderStats
+from app.core.cache import SQLiteCache, TieredCache, TTLCache, normalize_key
+from app.core.singleflight import SingleFlight
+from app.core.rate_limit import rate_limiters
 from app.models.location_models import LocationData
+from app.repos.gazetteer_repo import Gazetteer, gazetteer as default_gazetteer
+
+# Shared across GeoRepo instances so every agent benefits from the same observations
+geo_provider_stats: Dict[str, ProviderStats] = {
+    "nominatim": ProviderStats(alpha=settings.GEO_STATS_EWMA_ALPHA),
+    "photon": ProviderStats(alpha=settings.GEO_STATS_EWMA_ALPHA),
+}
+
+# Place name -> coordinates cache: memory LRU in front of a SQLite file that survives restarts
+geo_cache = TieredCache(
+    memory=TTLCache(max_entries=settings.GEO_CACHE_MAX_ENTRIES),
+    disk=SQLiteCache(settings.CACHE_DB_PATH, namespace="geo") if settings.GEO_CACHE_DISK_ENABLED else None
+)
+
+# Concurrent lookups of the same place name share one cache read / geocoder round-trip
+geo_flight = SingleFlight()
+
 
 class GeoRepo:
+    def __init__(
+        self,
+        http: Optional[HttpClientPool] = None,
+        stats: Optional[Dict[str, ProviderStats]] = None,
+        cache: Optional[TieredCache] = None,
+        gazetteer: Optional[Gazetteer] = None
+    ):
+        # Shared keep-alive clients (created in the app lifespan); injectable for benchmarks
+        self.http = http or http_clients
+        self.stats = stats or geo_provider_stats
+        self.cache = cache or geo_cache
+        self.gazetteer = gazetteer or default_gazetteer
+        self._providers = {
+            "nominatim": self._get_coordinates_nominatim,
+            "photon": self._get_coordinates_photon,
+        }
+
     async def get_coordinates(self, place_name: str) -> Optional[LocationData]:
-        """Get coordinates with fallback to Photon API if Nominatim fails"""
-        
-        # Try Nominatim first
-        result = await self._get_coordinates_nominatim(place_name)
+        """
+        Get coordinates for a place name
+        Order: offline gazetteer -> geocode cache -> Nominatim/Photon
+        """
+        if settings.GAZETTEER_ENABLED:
+            local = self.gazetteer.lookup(place_name)
+            if local:
+                return local
+
+        key = normalize_key(place_name)
+        return await geo_flight.do(key, lambda: self._resolve(key, place_name))
+
+    async def _resolve(self, key: str, place_name: str) -> Optional[LocationData]:
+        """Geocode cache, then the geocoders (filling the cache)"""
+        if not settings.GEO_CACHE_ENABLED:
+            result, _ = await self._lookup(place_name)
+            return result
+
+        found, cached = await self.cache.get(key)
+        if found:
+            return LocationData(**cached) if cached else None
+
+        result, answered = await self._lookup(place_name)
         if result:
+            await self.cache.set(key, result.model_dump(), settings.GEO_CACHE_TTL)
+        elif answered:
+            # Only cache "not found" when a geocoder actually answered - never cache outages
+            await self.cache.set(key, None, settings.GEO_CACHE_NEGATIVE_TTL)
+        return result
+
+    async def _lookup(self, place_name: str) -> Tuple[Optional[LocationData], bool]:
+        """
+        Query the geocoders - returns (location, answered)
+        `answered` is True when at least one provider responded without error
+        """
+        if settings.GEO_HEDGE_ENABLED:
+            return await self._get_coordinates_hedged(place_name)
+        return await self._get_coordinates_sequential(place_name)
+
+    async def _get_coordinates_sequential(self, place_name: str) -> Tuple[Optional[LocationData], bool]:
+        """Try providers in score order; the next one only runs after the previous one fails"""
+        answered = False
+        primary, fallback = self._provider_order()
+        for provider in (primary, fallback):
+            try:
+                result = await self._timed_lookup(provider, place_name)
+            except Exception:
+                result = None  # Already logged by the provider
+            else:
+                answered = True
+            if result:
+                return result, True
+
+            if provider == primary:
+                logs.define_logger(
+                    level=30,
+                    message=f"{primary} failed for {place_name}, trying {fallback} fallback",
+                    loggName=inspect.stack()[0]
+                )
+        return None, answered
+
+    def _provider_order(self) -> list[str]:
+        """Best adaptive score first; providers without data keep the default Nominatim-first order"""
+        default_order = list(self._providers)
+        scores = {name: self.stats[name].score() for name in default_order}
+        if any(score is None for score in scores.values()):
+            return default_order
+        return sorted(default_order, key=lambda name: scores[name])
+
+    def _hedge_delay(self, provider: str) -> float:
+        """How long to wait for the primary before launching the backup (its recent p95, clamped)"""
+        stats = self.stats[provider]
+        if len(stats.samples) < settings.GEO_HEDGE_MIN_SAMPLES:
+            return settings.GEO_HEDGE_DEFAULT_DELAY
+        delay = stats.percentile(settings.GEO_HEDGE_PERCENTILE)
+        return min(max(delay, settings.GEO_HEDGE_MIN_DELAY), settings.GEO_HEDGE_MAX_DELAY)
+
+    async def _timed_lookup(self, provider: str, place_name: str) -> Optional[LocationData]:
+        """
+        Run one provider and feed its latency/outcome into the adaptive stats
+        Time spent queueing for the provider's rate limit is not counted against it
+        """
+        stats = self.stats[provider]
+        async with rate_limiters[provider].slot():
+            start = time.perf_counter()
+            try:
+                result = await self._providers[provider](place_name)
+            except asyncio.CancelledError:
+                stats.record_censored(time.perf_counter() - start)
+                raise
+            except Exception:
+                stats.record(time.perf_counter() - start, success=False)
+                raise
+            # A definitive answer counts as success, even if the place was not found
+            stats.record(time.perf_counter() - start, success=True)
             return result
-        
-        # Fallback to Photon API
-        logs.define_logger(
-            level=30, 
-            message=f"Nominatim failed for {place_name}, trying Photon API fallback", 
-            loggName=inspect.stack()[0]
-        )
-        return await self._get_coordinates_photon(place_name)
-    
+
+    async def _get_coordinates_hedged(self, place_name: str) -> Tuple[Optional[LocationData], bool]:
+        """
+        Start the best-scoring provider, launch the other one if no answer arrives within
+        the hedge delay (or the primary fails), take the first good result and cancel the loser
+        """
+        primary, backup = self._provider_order()
+        delay = self._hedge_delay(primary)
+
+        pending = {asyncio.create_task(self._timed_lookup(primary, place_name))}
+        hedged = False
+        answered = False
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=None if hedged else delay,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is not None:
+                        continue  # Already logged by the provider
+                    answered = True
+                    if task.result():
+                        return task.result(), True
+
+                if not hedged:
+                    logs.define_logger(
+                        level=20,
+                        message=f"Hedging geocode for {place_name}: launching {backup} after {primary} "
+                                f"{'failed' if done else f'exceeded {delay:.2f}s'}",
+                        loggName=inspect.stack()[0]
+                    )
+                    pending.add(asyncio.create_task(self._timed_lookup(backup, place_name)))
+                    hedged = True
+            return None, answered
+        finally:
+            # Cancel whichever provider lost the race
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
     async def _get_coordinates_nominatim(self, place_name: str) -> Optional[LocationData]:
         """Primary geocoding using Nominatim"""
         params = {
@@ -33,57 +197,59 @@ class GeoRepo:
             "User-Agent": "TourismAIIntern/1.0",
             "Accept": "application/json"
         }
-        
-        async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-            try:
-                response = await client.get(settings.NOMINATIM_URL, params=params, headers=headers)
-                response.raise_for_status()
-                data = response.json()
-                
-                if data and isinstance(data, list) and len(data) > 0:
-                    return LocationData(
-                        name=data[0].get("display_name", place_name),
-                        lat=float(data[0]["lat"]),
-                        lon=float(data[0]["lon"])
-                    )
-                return None
-            except Exception as e:
-                logs.define_logger(
-                    level=40, 
-                    message=f"Nominatim error for {place_name}: {str(e)}", 
-                    loggName=inspect.stack()[0]
+
+        client = self.http.client("nominatim")
+        try:
+            response = await client.get(
+                settings.NOMINATIM_URL, params=params, headers=headers, timeout=self.http.timeout("nominatim")
+            )
+            response.raise_for_status()
+            data = response.json()
+
+            if data and isinstance(data, list) and len(data) > 0:
+                return LocationData(
+                    name=data[0].get("display_name", place_name),
+                    lat=float(data[0]["lat"]),
+                    lon=float(data[0]["lon"])
                 )
-                return None
-    
+            return None
+        except Exception as e:
+            logs.define_logger(
+                level=40,
+                message=f"Nominatim error for {place_name}: {str(e)}",
+                loggName=inspect.stack()[0]
+            )
+            raise
+
     async def _get_coordinates_photon(self, place_name: str) -> Optional[LocationData]:
         """Fallback geocoding using Photon API (komoot.io)"""
         params = {
             "q": place_name,
             "limit": 1
         }
-        
-        async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-            try:
-                response = await client.get("https://photon.komoot.io/api/", params=params)
-                response.raise_for_status()
-                data = response.json()
-                
-                if data.get("features") and len(data["features"]) > 0:
-                    feature = data["features"][0]
-                    coords = feature["geometry"]["coordinates"]
-                    props = feature.get("properties", {})
-                    
-                    # Photon returns [lon, lat] order
-                    return LocationData(
-                        name=props.get("name", place_name),
-                        lat=coords[1],
-                        lon=coords[0]
-                    )
-                return None
-            except Exception as e:
-                logs.define_logger(
-                    level=40, 
-                    message=f"Photon API error for {place_name}: {str(e)}", 
-                    loggName=inspect.stack()[0]
+
+        client = self.http.client("photon")
+        try:
+            response = await client.get(settings.PHOTON_URL, params=params, timeout=self.http.timeout("photon"))
+            response.raise_for_status()
+            data = response.json()
+
+            if data.get("features") and len(data["features"]) > 0:
+                feature = data["features"][0]
+                coords = feature["geometry"]["coordinates"]
+                props = feature.get("properties", {})
+
+                # Photon returns [lon, lat] order
+                return LocationData(
+                    name=props.get("name", place_name),
+                    lat=coords[1],
+                    lon=coords[0]
                 )
-                return None
\ No newline at end of file
+            return None
+        except Exception as e:
+            logs.define_logger(
+                level=40,
+                message=f"Photon API error for {place_name}: {str(e)}",
+                loggName=inspect.stack()[0]
+            )
+            raise
@@ -1,63 +1,297 @@
-import httpx
 import inspect
-from typing import List
+import json
+import math
+import re
+from contextlib import aclosing
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from app.core.config import settings
 from app.core.logger import logs
+from app.core.http_clients import HttpClientPool, http_clients
+from app.core.cache import SQLiteCache, TieredCache, TTLCache
+from app.core.json_stream import JsonArrayStreamParser
+from app.core.singleflight import SingleFlight
+from app.core.rate_limit import rate_limiters
+
+# Tourism-related OSM tags we query for multiple categories to get better results
+POI_FILTERS = [
+    ('node', '["tourism"="attraction"]'),
+    ('node', '["tourism"="museum"]'),
+    ('node', '["tourism"="viewpoint"]'),
+    ('node', '["historic"]'),
+    ('node', '["leisure"="park"]'),
+    ('way', '["tourism"="attraction"]'),
+    ('way', '["tourism"="museum"]'),
+    ('way', '["historic"]'),
+    ('way', '["leisure"="park"]'),
+]
+# The same filters grouped by poi_priority - tile queries cap each group's output separately,
+# so thousands of historic markers in an old town cannot crowd out its attractions
+POI_FILTER_GROUPS = [
+    [(kind, tag) for kind, tag in POI_FILTERS if '"tourism"' in tag],
+    [(kind, tag) for kind, tag in POI_FILTERS if '"leisure"' in tag],
+    [(kind, tag) for kind, tag in POI_FILTERS if '"historic"' in tag],
+]
+
+# POI tiles (slippy-map z/x/y -> compact [name, lat, lon, priority] rows), memory LRU over SQLite
+places_cache = TieredCache(
+    memory=TTLCache(max_entries=settings.PLACES_CACHE_MAX_TILES),
+    disk=SQLiteCache(settings.CACHE_DB_PATH, namespace="places") if settings.PLACES_CACHE_DISK_ENABLED else None
+)
+places_cache_stats = {"overpass_requests": 0, "tiles_fetched": 0, "early_terminations": 0}
+places_flight = SingleFlight()  # Identical concurrent attraction searches share one lookup
+
+# Overpass reports runtime errors (timeouts, memory) in a "remark" after the elements, with HTTP 200
+_REMARK = re.compile(rb'"remark"\s*:\s*("(?:[^"\\]|\\.)*")')
+
+
+class OverpassIncomplete(Exception):
+    """Overpass stopped the query early - the elements before the remark are not the whole answer"""
+
+
+def lat_lon_to_tile(lat: float, lon: float, zoom: int) -> Tuple[int, int]:
+    """Slippy-map tile containing the coordinates"""
+    n = 2 ** zoom
+    lat = max(min(lat, 85.0511), -85.0511)
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def tile_bounds(x: int, y: int, zoom: int) -> Tuple[float, float, float, float]:
+    """(south, west, north, east) of a slippy-map tile"""
+    n = 2 ** zoom
+    west = x / n * 360.0 - 180.0
+    east = (x + 1) / n * 360.0 - 180.0
+    north = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+    south = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 1) / n))))
+    return south, west, north, east
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in metres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * 6371000 * math.asin(math.sqrt(a))
+
+
+def poi_priority(tags: dict) -> int:
+    """Rank attractions/museums/viewpoints above parks above generic historic features"""
+    if tags.get("tourism") in ("attraction", "museum", "viewpoint"):
+        return 0
+    if tags.get("leisure") == "park":
+        return 1
+    return 2
+
 
 class PlacesRepo:
+    def __init__(self, http: Optional[HttpClientPool] = None, cache: Optional[TieredCache] = None):
+        # Shared keep-alive clients (created in the app lifespan); injectable for benchmarks
+        self.http = http or http_clients
+        self.cache = cache or places_cache
+
     async def get_tourist_attractions(self, lat: float, lon: float, limit: int = 5) -> List[str]:
-        """Fetch tourist attractions near given coordinates using multiple categories"""
-        
-        # Query for multiple tourism-related tags to get better results
+        """
+        Fetch tourist attractions near given coordinates
+        Served from cached POI tiles; only tiles that are missing are fetched from Overpass
+        """
+        key = (round(lat, 5), round(lon, 5), limit)
+        names = await places_flight.do(key, lambda: self._get_tourist_attractions(lat, lon, limit))
+        return list(names)  # Coalesced callers share one result - hand each its own list
+
+    async def _get_tourist_attractions(self, lat: float, lon: float, limit: int) -> List[str]:
+        if not settings.PLACES_CACHE_ENABLED:
+            return await self._fetch_around(lat, lon, limit)
+
+        radius = settings.PLACES_SEARCH_RADIUS_M
+        zoom = settings.PLACES_TILE_ZOOM
+        tiles = self._tiles_for_radius(lat, lon, radius, zoom)
+
+        pois: List[list] = []
+        missing: List[Tuple[int, int]] = []
+        for x, y in tiles:
+            found, rows = await self.cache.get(f"z{zoom}/{x}/{y}")
+            if found:
+                pois.extend(rows)
+            else:
+                missing.append((x, y))
+
+        if missing:
+            # Nearest tiles first - they hold the best answers if only some can be fetched in time
+            cx, cy = lat_lon_to_tile(lat, lon, zoom)
+            missing.sort(key=lambda tile: abs(tile[0] - cx) + abs(tile[1] - cy))
+            fetched = await self._fetch_tiles(missing, zoom)
+            if fetched is None and not pois:
+                return []
+            for rows in (fetched or {}).values():
+                pois.extend(rows)
+
+        return self._rank(pois, lat, lon, radius, limit)
+
+    def _tiles_for_radius(self, lat: float, lon: float, radius: float, zoom: int) -> List[Tuple[int, int]]:
+        """All tiles intersecting the bounding box of the search circle"""
+        dlat = radius / 111320.0
+        dlon = radius / (111320.0 * max(math.cos(math.radians(lat)), 0.01))
+        min_x, min_y = lat_lon_to_tile(lat + dlat, lon - dlon, zoom)
+        max_x, max_y = lat_lon_to_tile(lat - dlat, lon + dlon, zoom)
+        return [(x, y) for x in range(min_x, max_x + 1) for y in range(min_y, max_y + 1)]
+
+    def _rank(self, pois: List[list], lat: float, lon: float, radius: float, limit: int) -> List[str]:
+        """Filter merged tile POIs to the search radius, best category then nearest first, unique names"""
+        candidates = []
+        for name, poi_lat, poi_lon, priority in pois:
+            distance = haversine_m(lat, lon, poi_lat, poi_lon)
+            if distance <= radius:
+                candidates.append((priority, distance, name))
+        candidates.sort()
+
+        places = []
+        seen_names = set()
+        for _, _, name in candidates:
+            if name not in seen_names:
+                places.append(name)
+                seen_names.add(name)
+                if len(places) >= limit:
+                    break
+        return places
+
+    async def _fetch_tiles(self, missing: List[Tuple[int, int]], zoom: int) -> Optional[Dict[str, list]]:
+        """
+        Fetch every missing tile in one Overpass request. Each tile gets its own bbox statements,
+        capped at PLACES_TILE_MAX_POIS per priority group, followed by a marker element that
+        says the tile is complete, and is cached as soon as its marker arrives. Tiles finished
+        before a failure, a timeout remark or the request deadline are not fetched again; the
+        rest are not cached
+        Returns the fetched tiles, or None if none could be fetched
+        """
+        max_pois = settings.PLACES_TILE_MAX_POIS
+        blocks = []
+        for x, y in missing:
+            bbox = ",".join(str(edge) for edge in tile_bounds(x, y, zoom))
+            for group in POI_FILTER_GROUPS:
+                clauses = " ".join(f"{kind}{tag}({bbox});" for kind, tag in group)
+                blocks.append(f"        ({clauses}); out center tags {max_pois};")
+            blocks.append(f'        make tile key="z{zoom}/{x}/{y}"; out;')
+        query = "\n".join(["        [out:json][timeout:25];", *blocks])
+
+        pending: Dict[Tuple[int, int], List[list]] = {tile: [] for tile in missing}
+        tiles: Dict[str, list] = {}
+        seen = set()  # An element matching two groups (a historic attraction) is output twice
+
+        async def finish(tile: Tuple[int, int]) -> None:
+            rows = pending.pop(tile)
+            rows.sort(key=lambda row: row[3])
+            del rows[max_pois:]
+            key = f"z{zoom}/{tile[0]}/{tile[1]}"
+            tiles[key] = rows
+            await self.cache.set(key, rows, settings.PLACES_TILE_TTL)
+            places_cache_stats["tiles_fetched"] += 1
+
+        try:
+            # Streamed element by element - only the compact rows are kept in memory
+            async with aclosing(self._stream_elements(query, strict=True)) as elements:
+                async for element in elements:
+                    if element.get("type") == "tile":
+                        _, x, y = element.get("tags", {}).get("key", "").split("/")
+                        if (int(x), int(y)) in pending:
+                            await finish((int(x), int(y)))
+                        continue
+                    tags = element.get("tags")
+                    if not tags:
+                        continue
+                    name = tags.get("name:en") or tags.get("name")
+                    center = element if "lat" in element else element.get("center")
+                    if not name or not center:
+                        continue
+                    element_id = (element.get("type"), element.get("id"))
+                    if element_id in seen:
+                        continue
+                    seen.add(element_id)
+                    # A way reaching into a tile belongs to the tile holding its centre
+                    rows = pending.get(lat_lon_to_tile(center["lat"], center["lon"], zoom))
+                    if rows is not None:
+                        rows.append([name, center["lat"], center["lon"], poi_priority(tags)])
+            # The response finished cleanly, so any tile still open (no marker) is complete too
+            for tile in list(pending):
+                await finish(tile)
+        except Exception as e:
+            logs.define_logger(
+                level=40,
+                message=f"Error fetching places: {str(e)}",
+                loggName=inspect.stack()[0]
+            )
+        return tiles or None
+
+    async def _fetch_around(self, lat: float, lon: float, limit: int) -> List[str]:
+        """Uncached path: query Overpass around the exact coordinates"""
+        radius = settings.PLACES_SEARCH_RADIUS_M
+        clauses = "\n".join(f"  {kind}{tag}(around:{radius},{lat},{lon});" for kind, tag in POI_FILTERS)
         query = f"""
         [out:json][timeout:25];
         (
-          node["tourism"="attraction"](around:10000,{lat},{lon});
-          node["tourism"="museum"](around:10000,{lat},{lon});
-          node["tourism"="viewpoint"](around:10000,{lat},{lon});
-          node["historic"](around:10000,{lat},{lon});
-          node["leisure"="park"](around:10000,{lat},{lon});
-          way["tourism"="attraction"](around:10000,{lat},{lon});
-          way["tourism"="museum"](around:10000,{lat},{lon});
-          way["historic"](around:10000,{lat},{lon});
-          way["leisure"="park"](around:10000,{lat},{lon});
+{clauses}
         );
         out center tags {limit * 2};
         """
-        
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.post(
-                    settings.OVERPASS_URL,
-                    data=query,
-                    headers={"Content-Type": "application/x-www-form-urlencoded"}
-                )
+
+        places = []
+        seen_names = set()
+        try:
+            async with aclosing(self._stream_elements(query)) as elements:
+                async for element in elements:
+                    if "tags" in element:
+                        tags = element["tags"]
+                        # Prefer English name, fall back to default name
+                        name = tags.get("name:en") or tags.get("name")
+
+                        if name:
+                            # Avoid duplicates
+                            if name not in seen_names:
+                                places.append(name)
+                                seen_names.add(name)
+                                if len(places) >= limit:
+                                    # Enough results - stop reading and close the connection
+                                    places_cache_stats["early_terminations"] += 1
+                                    break
+        except Exception as e:
+            logs.define_logger(
+                level=40,
+                message=f"Error fetching places: {str(e)}",
+                loggName=inspect.stack()[0]
+            )
+            return []
+
+        return places[:limit]
+
+    async def _stream_elements(self, query: str, strict: bool = False) -> AsyncIterator[dict]:
+        """
+        Send a query to Overpass and yield its elements as they arrive on the wire
+        Holds one Overpass slot until the stream is closed
+        strict: read past the elements and raise OverpassIncomplete if Overpass added a remark
+        (it stopped early - a timeout still answers 200), so partial results are not cached
+        """
+        client = self.http.client("overpass")
+        parser = JsonArrayStreamParser("elements")
+        async with rate_limiters["overpass"].slot():
+            places_cache_stats["overpass_requests"] += 1
+            async with client.stream(
+                "POST", settings.OVERPASS_URL, content=query, timeout=self.http.timeout("overpass")
+            ) as response:
                 response.raise_for_status()
-                data = response.json()
-                
-                places = []
-                seen_names = set()
-                
-                if "elements" in data:
-                    for element in data["elements"]:
-                        if "tags" in element:
-                            tags = element["tags"]
-                            # Prefer English name, fall back to default name
-                            name = tags.get("name:en") or tags.get("name")
-                            
-                            if name:
-                                # Avoid duplicates
-                                if name not in seen_names:
-                                    places.append(name)
-                                    seen_names.add(name)
-                                    if len(places) >= limit:
-                                        break
-                
-                return places[:limit]
-            except Exception as e:
-                logs.define_logger(
-                    level=40, 
-                    message=f"Error fetching places: {str(e)}", 
-                    loggName=inspect.stack()[0]
-                )
-                return []
\ No newline at end of file
+                tail = bytearray()
+                async for chunk in response.aiter_bytes():
+                    if parser.done:
+                        tail.extend(chunk)
+                        continue
+                    for element in parser.feed(chunk):
+                        yield element
+                    if parser.done:
+                        if not strict:
+                            return
+                        tail.extend(parser.remainder())
+                remark = _REMARK.search(tail)
+                if remark:
+                    raise OverpassIncomplete(f"Overpass stopped early: {json.loads(remark.group(1))}")
+                if strict and not parser.done:
+                    raise OverpassIncomplete("Overpass response ended before its elements did")
@@ -0,0 +1,200 @@
+"""
+Sessions - Server-side conversation history addressed by a session ID
+Clients send only the session ID with each turn instead of the whole conversation; the
+store is pluggable: an in-process LRU with idle TTL, or the shared SQLite file so sessions
+survive restarts and are visible to every worker
+A session holds the rolling summary of its older turns plus the messages not yet folded into it.
+Every change is one atomic read-modify-write on the store, so concurrent turns never drop each other
+"""
+from typing import Callable, Optional
+from app.core.config import settings
+from app.core.logger import logs
+from app.core.cache import SQLiteCache, TTLCache
+import asyncio
+import inspect
+import re
+import secrets
+
+# Compact encoding: {"m": [[role code, content], ...], "s": summary, "n": messages ever appended}
+ROLE_CODES = {"user": "u", "assistant": "a"}
+CODE_ROLES = {code: role for role, code in ROLE_CODES.items()}
+
+_SESSION_ID = re.compile(r"^[A-Za-z0-9_-]{16,64}$")
+
+session_stats = {"created": 0, "resumed": 0, "unknown": 0, "turns_stored": 0, "purged": 0}
+
+
+def new_session_id() -> str:
+    return secrets.token_urlsafe(16)
+
+
+def valid_session_id(session_id: Optional[str]) -> bool:
+    return bool(session_id) and bool(_SESSION_ID.match(session_id))
+
+
+def encode_session(session: dict) -> dict:
+    record = {
+        "m": [[ROLE_CODES.get(msg["role"], msg["role"]), msg["content"]] for msg in session["messages"]],
+        "n": session["total"],
+    }
+    if session.get("summary"):
+        record["s"] = session["summary"]
+    return record
+
+
+def decode_session(record: dict) -> dict:
+    """
+    messages: not yet folded into the summary, oldest first
+    total: messages ever appended, so messages[i] is message number total - len(messages) + i
+    """
+    messages = [{"role": CODE_ROLES.get(code, code), "content": content} for code, content in record.get("m", [])]
+    return {"messages": messages, "summary": record.get("s"), "total": record.get("n", len(messages))}
+
+
+class MemorySessionStore:
+    """Sessions in a bounded in-process LRU; idle sessions expire after the TTL (lost on restart)"""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.ttl = ttl
+        self._cache = TTLCache(max_entries=max_entries)
+
+    async def get(self, session_id: str) -> Optional[dict]:
+        entry = self._cache.get_entry(session_id)
+        return entry.value if entry is not None else None
+
+    async def update(self, session_id: str, fn: Callable[[Optional[dict]], Optional[dict]]) -> None:
+        """Apply fn to the record (None if absent); atomic, as nothing here yields to the event loop"""
+        entry = self._cache.get_entry(session_id)
+        record = fn(entry.value if entry is not None else None)
+        if record is not None:
+            self._cache.set(session_id, record, self.ttl)
+
+    async def purge_expired(self) -> int:
+        return 0  # Bounded LRU - expired sessions are never served and age out of it
+
+    def close(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {"entries": len(self._cache), "evictions": self._cache.evictions}
+
+
+class SQLiteSessionStore:
+    """
+    Sessions in the local SQLite cache file - survive restarts and are shared by every worker
+    Updates are IMMEDIATE transactions, so workers appending to one session take turns
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, ttl: float):
+        self.ttl = ttl
+        self._db = SQLiteCache(path, namespace="session")
+        self.errors = 0
+
+    async def get(self, session_id: str) -> Optional[dict]:
+        try:
+            entry = await asyncio.to_thread(self._db.get, session_id)
+        except Exception as e:
+            self.errors += 1
+            logs.define_logger(level=30, message=f"Session read failed: {str(e)}", loggName=inspect.stack()[0])
+            return None
+        return entry.value if entry is not None and entry.is_fresh() else None
+
+    async def update(self, session_id: str, fn: Callable[[Optional[dict]], Optional[dict]]) -> None:
+        try:
+            await asyncio.to_thread(self._db.update, session_id, fn, self.ttl)
+        except Exception as e:
+            self.errors += 1
+            logs.define_logger(level=30, message=f"Session write failed: {str(e)}", loggName=inspect.stack()[0])
+
+    async def purge_expired(self) -> int:
+        try:
+            return await asyncio.to_thread(self._db.purge_expired)
+        except Exception as e:
+            self.errors += 1
+            logs.define_logger(level=30, message=f"Session purge failed: {str(e)}", loggName=inspect.stack()[0])
+            return 0
+
+    def close(self) -> None:
+        self._db.close()
+
+    def stats(self) -> dict:
+        return {"errors": self.errors}
+
+
+def build_session_store():
+    if settings.SESSION_STORE.lower() == "sqlite":
+        return SQLiteSessionStore(settings.CACHE_DB_PATH, settings.SESSION_TTL)
+    return MemorySessionStore(settings.SESSION_MAX_ENTRIES, settings.SESSION_TTL)
+
+
+class SessionRepo:
+    def __init__(self, store=None):
+        self.store = store or build_session_store()
+
+    async def load(self, session_id: Optional[str]) -> Optional[dict]:
+        """A live session (see decode_session), or None if the ID is unknown, malformed or expired"""
+        if not valid_session_id(session_id):
+            return None
+        record = await self.store.get(session_id)
+        if record is None:
+            session_stats["unknown"] += 1
+            return None
+        session_stats["resumed"] += 1
+        return decode_session(record)
+
+    def start(self) -> str:
+        """A new session ID; the session is stored with its first turn"""
+        session_stats["created"] += 1
+        return new_session_id()
+
+    async def append_turn(self, session_id: str, user_message: str, assistant_message: str) -> None:
+        """
+        Add one user/assistant exchange. At most SESSION_MAX_MESSAGES unsummarised messages are
+        kept - if summarising falls behind, the oldest are dropped
+        """
+        def add_turn(record: Optional[dict]) -> dict:
+            session = decode_session(record) if record else {"messages": [], "summary": None, "total": 0}
+            session["messages"].append({"role": "user", "content": user_message})
+            session["messages"].append({"role": "assistant", "content": assistant_message})
+            session["messages"] = session["messages"][-settings.SESSION_MAX_MESSAGES:]
+            session["total"] += 2
+            return encode_session(session)
+
+        await self.store.update(session_id, add_turn)
+        session_stats["turns_stored"] += 1
+
+    async def fold(self, session_id: str, summary: str, upto: int) -> None:
+        """
+        Replace the summary with one covering messages before number `upto` and drop those
+        messages. Turns appended while the summary was being written are kept
+        """
+        def apply_summary(record: Optional[dict]) -> Optional[dict]:
+            if record is None:
+                return None  # Expired while the summary was being written
+            session = decode_session(record)
+            first = session["total"] - len(session["messages"])
+            session["messages"] = session["messages"][max(0, upto - first):]
+            session["summary"] = summary
+            return encode_session(session)
+
+        await self.store.update(session_id, apply_summary)
+
+    async def purge_expired(self) -> int:
+        """Delete expired sessions from the store (run with the cache purge)"""
+        removed = await self.store.purge_expired()
+        session_stats["purged"] += removed
+        return removed
+
+    def close(self) -> None:
+        self.store.close()
+
+    def stats(self) -> dict:
+        return {"store": self.store.name, **session_stats, **self.store.stats()}
+
+
+# Singleton instance
+session_repo = SessionRepo()
@@ -1,14 +1,149 @@
-import httpx
+import asyncio
 import inspect
-from typing import Optional
+import math
+import time
+from typing import Dict, List, Optional, Tuple
 from app.core.config import settings
 from app.core.logger import logs
+from app.core.http_clients import HttpClientPool, http_clients
+from app.core.cache import TTLCache
+from app.core.singleflight import SingleFlight
+from app.core.rate_limit import rate_limiters
+from app.core.deadline import without_deadline
 from app.models.weather_models import WeatherData
 
+# Grid-cell weather cache shared by every WeatherRepo instance
+weather_cache = TTLCache(max_entries=settings.WEATHER_CACHE_MAX_ENTRIES)
+weather_cache_stats = {"hits": 0, "stale_hits": 0, "misses": 0, "background_refreshes": 0, "batch_requests": 0}
+_refreshing: set = set()  # Cells with a background refresh in flight
+_background_tasks: set = set()  # Strong references so refresh tasks are not garbage collected
+weather_flight = SingleFlight()  # One in-flight Open-Meteo request per missing cell
+
+
+def grid_cell(lat: float, lon: float) -> Tuple[float, float]:
+    """Snap coordinates to the centre of their cache grid cell"""
+    size = settings.WEATHER_GRID_DEGREES
+    return (
+        round((math.floor(lat / size) + 0.5) * size, 4),
+        round((math.floor(lon / size) + 0.5) * size, 4)
+    )
+
+
+def seconds_until_next_update(now: Optional[float] = None) -> float:
+    """TTL that expires when Open-Meteo publishes its next update (aligned to the update interval)"""
+    now = now or time.time()
+    interval = settings.WEATHER_UPDATE_INTERVAL
+    return interval - (now % interval)
+
+
+def weather_stamp(lat: float, lon: float) -> Optional[float]:
+    """When the fresh cached weather for these coordinates was fetched (None if absent or expired)"""
+    cell = grid_cell(lat, lon)
+    entry = weather_cache.get_entry(f"{cell[0]},{cell[1]}")
+    return entry.stored_at if entry is not None else None
+
 
 class WeatherRepo:
+    def __init__(self, http: Optional[HttpClientPool] = None, cache: Optional[TTLCache] = None):
+        # Shared keep-alive clients (created in the app lifespan); injectable for benchmarks
+        self.http = http or http_clients
+        self.cache = cache if cache is not None else weather_cache
+
     async def get_current_weather(self, lat: float, lon: float) -> Optional[WeatherData]:
-        """Fetch current weather data for given coordinates"""
+        """
+        Fetch current weather for given coordinates, served from the grid-cell cache when possible
+        Expired entries within the stale window are returned immediately and refreshed in the background
+        """
+        if not settings.WEATHER_CACHE_ENABLED:
+            return await self._fetch_current_weather(lat, lon)
+
+        cell = grid_cell(lat, lon)
+        key = f"{cell[0]},{cell[1]}"
+        found, weather = self._cached(key, cell)
+        if found:
+            return weather
+
+        weather_cache_stats["misses"] += 1
+        # Everyone missing the same cell at once waits on one Open-Meteo request
+        return await weather_flight.do(key, lambda: self._refresh(key, cell))
+
+    async def get_current_weather_batch(self, coordinates: List[Tuple[float, float]]) -> List[Optional[WeatherData]]:
+        """
+        Fetch current weather for many (lat, lon) pairs, one result per pair in the same order
+        Cached cells are served as in get_current_weather; all remaining cells are fetched
+        together in a single multi-coordinate Open-Meteo request
+        """
+        if not coordinates:
+            return []
+
+        cells = [grid_cell(lat, lon) for lat, lon in coordinates]
+        if not settings.WEATHER_CACHE_ENABLED:
+            return await self._fetch_current_weather_batch(cells)
+
+        results: Dict[str, Optional[WeatherData]] = {}
+        missing: List[Tuple[float, float]] = []
+        for cell in cells:
+            key = f"{cell[0]},{cell[1]}"
+            if key in results or cell in missing:
+                continue
+            found, weather = self._cached(key, cell)
+            if found:
+                results[key] = weather
+            else:
+                weather_cache_stats["misses"] += 1
+                missing.append(cell)
+
+        if missing:
+            fetched = await self._fetch_current_weather_batch(missing)
+            ttl = seconds_until_next_update()
+            for cell, weather in zip(missing, fetched):
+                key = f"{cell[0]},{cell[1]}"
+                if weather is not None:
+                    self.cache.set(key, weather, ttl)
+                results[key] = weather
+
+        return [results.get(f"{cell[0]},{cell[1]}") for cell in cells]
+
+    def _cached(self, key: str, cell: Tuple[float, float]) -> Tuple[bool, Optional[WeatherData]]:
+        """Fresh or stale-but-usable cache hit (stale hits schedule a background refresh)"""
+        entry = self.cache.get_entry(key, allow_stale=True)
+        now = time.time()
+
+        if entry is not None and entry.is_fresh(now):
+            weather_cache_stats["hits"] += 1
+            return True, entry.value
+
+        if entry is not None and now - entry.expires_at < settings.WEATHER_STALE_WINDOW:
+            weather_cache_stats["stale_hits"] += 1
+            self._schedule_refresh(key, cell)
+            return True, entry.value
+
+        return False, None
+
+    def _schedule_refresh(self, key: str, cell: Tuple[float, float]) -> None:
+        """Refresh a stale cell without making the caller wait (one refresh per cell at a time)"""
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+        weather_cache_stats["background_refreshes"] += 1
+        # The refresh outlives the request that noticed the stale entry - not bound by its deadline
+        task = asyncio.create_task(self._refresh(key, cell), context=without_deadline())
+        _background_tasks.add(task)
+
+        def _done(finished: asyncio.Task) -> None:
+            _background_tasks.discard(finished)
+            _refreshing.discard(key)
+
+        task.add_done_callback(_done)
+
+    async def _refresh(self, key: str, cell: Tuple[float, float]) -> Optional[WeatherData]:
+        weather = await self._fetch_current_weather(cell[0], cell[1])
+        if weather is not None:
+            self.cache.set(key, weather, seconds_until_next_update())
+        return weather
+
+    async def _fetch_current_weather(self, lat: float, lon: float) -> Optional[WeatherData]:
+        """Fetch current weather data for given coordinates from Open-Meteo"""
         params = {
             "latitude": lat,
             "longitude": lon,
@@ -16,34 +151,72 @@ class WeatherRepo:
             "hourly": "precipitation_probability",
             "forecast_days": 1
         }
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(settings.OPEN_METEO_URL, params=params)
-                response.raise_for_status()
-                data = response.json()
-                
-                if "current_weather" in data:
-                    current = data["current_weather"]
-                    
-                    # Get precipitation probability from hourly forecast
-                    precip_prob = None
-                    if "hourly" in data and "precipitation_probability" in data["hourly"]:
-                        hourly_precip = data["hourly"]["precipitation_probability"]
-                        if hourly_precip:
-                            # Average the next few hours
-                            precip_prob = sum(hourly_precip[:6]) / min(len(hourly_precip), 6)
-                    
-                    return WeatherData(
-                        temperature=current.get("temperature"),
-                        precipitation_probability=precip_prob,
-                        windspeed=current.get("windspeed"),
-                        weather_code=current.get("weathercode")
-                    )
-                return None
-            except Exception as e:
-                logs.define_logger(
-                    level=40, 
-                    message=f"Error fetching weather: {str(e)}", 
-                    loggName=inspect.stack()[0]
-                )
-                return None
+        client = self.http.client("open_meteo")
+        try:
+            async with rate_limiters["open_meteo"].slot():
+                response = await client.get(settings.OPEN_METEO_URL, params=params, timeout=self.http.timeout("open_meteo"))
+            response.raise_for_status()
+            return self._parse_weather(response.json())
+        except Exception as e:
+            logs.define_logger(
+                level=40,
+                message=f"Error fetching weather: {str(e)}",
+                loggName=inspect.stack()[0]
+            )
+            return None
+
+    async def _fetch_current_weather_batch(self, coordinates: List[Tuple[float, float]]) -> List[Optional[WeatherData]]:
+        """
+        Fetch current weather for several coordinates in one request
+        Open-Meteo accepts comma-separated latitude/longitude lists and then returns a JSON
+        array with one forecast per location, in request order
+        """
+        if len(coordinates) == 1:
+            return [await self._fetch_current_weather(*coordinates[0])]
+
+        params = {
+            "latitude": ",".join(str(lat) for lat, _ in coordinates),
+            "longitude": ",".join(str(lon) for _, lon in coordinates),
+            "current_weather": "true",
+            "hourly": "precipitation_probability",
+            "forecast_days": 1
+        }
+        client = self.http.client("open_meteo")
+        weather_cache_stats["batch_requests"] += 1
+        try:
+            async with rate_limiters["open_meteo"].slot():
+                response = await client.get(settings.OPEN_METEO_URL, params=params, timeout=self.http.timeout("open_meteo"))
+            response.raise_for_status()
+            data = response.json()
+            if isinstance(data, dict):
+                data = [data]
+            results = [self._parse_weather(item) for item in data[:len(coordinates)]]
+            return results + [None] * (len(coordinates) - len(results))
+        except Exception as e:
+            logs.define_logger(
+                level=40,
+                message=f"Error fetching weather batch: {str(e)}",
+                loggName=inspect.stack()[0]
+            )
+            return [None] * len(coordinates)
+
+    def _parse_weather(self, data: dict) -> Optional[WeatherData]:
+        """Build WeatherData from one Open-Meteo location forecast"""
+        if "current_weather" in data:
+            current = data["current_weather"]
+
+            # Get precipitation probability from hourly forecast
+            precip_prob = None
+            if "hourly" in data and "precipitation_probability" in data["hourly"]:
+                hourly_precip = data["hourly"]["precipitation_probability"]
+                if hourly_precip:
+                    # Average the next few hours
+                    precip_prob = sum(hourly_precip[:6]) / min(len(hourly_precip), 6)
+
+            return WeatherData(
+                temperature=current.get("temperature"),
+                precipitation_probability=precip_prob,
+                windspeed=current.get("windspeed"),
+                weather_code=current.get("weathercode")
+            )
+        return None
@@ -5,6 +5,18 @@ from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
 from app.models.agent_models import UserQuery, AgentResponse
 from app.services.langgraph_tourism import langgraph_tourism_agent
+from app.services.query_classifier import query_classifier
+from app.services.ai_client import ai_client, llm_cache, llm_cache_stats
+from app.services.response_cache import response_cache
+from app.services.conversation_summary import conversation_summarizer
+from app.repos.geo_repo import geo_cache, geo_flight, geo_provider_stats
+from app.repos.gazetteer_repo import gazetteer
+from app.repos.weather_repo import weather_cache, weather_cache_stats, weather_flight
+from app.repos.places_repo import places_cache, places_cache_stats, places_flight
+from app.repos.session_repo import session_repo
+from app.core.rate_limit import rate_limiters
+from app.core.deadline import deadline_stats, request_deadline
+from app.core.config import settings
 from app.core.logger import logs
 import inspect
 import json
@@ -15,48 +27,93 @@ router = APIRouter(prefix="/api/tourism", tags=["Tourism"])
 # Using LangGraph-based tourism agent
 tourism_agent = langgraph_tourism_agent
 
+# Queued after the last event of a stream
+_STREAM_END = object()
+
+
+async def pump_events(queue: asyncio.Queue, task: asyncio.Task):
+    """
+    Yield queued events until the task finishes, then stop
+    The task's done-callback enqueues an end sentinel behind any pending events, so the
+    consumer just awaits the queue - no polling timeouts and no wake-ups while idle
+    """
+    task.add_done_callback(lambda _: queue.put_nowait(_STREAM_END))
+    while True:
+        event = await queue.get()
+        if event is _STREAM_END:
+            return
+        yield event
+
+async def open_session(query: UserQuery) -> tuple:
+    """
+    Returns (session_id, history, summary, client_sent_history)
+    A live session supplies its rolling summary and the turns not yet folded into it.
+    Otherwise clients that send their conversation_history (legacy clients, which never
+    resume a session) use it without a session - session_id is None and nothing is stored -
+    and everyone else starts a new session
+    """
+    client_history = [{"role": msg.role, "content": msg.content}
+                      for msg in query.conversation_history] if query.conversation_history else []
+    session = await session_repo.load(query.session_id)
+    if session is not None:
+        return query.session_id, session["messages"], session["summary"], bool(client_history)
+    if client_history:
+        return None, client_history, None, True
+    return session_repo.start(), [], None, False
+
+
+def turn_messages(query: str, answer: str) -> list:
+    return [{"role": "user", "content": query}, {"role": "assistant", "content": answer}]
+
 @router.post("/chat/stream")
 async def chat_with_streaming(query: UserQuery):
     """
-    Streaming endpoint that sends real-time reasoning updates via SSE
+    Streaming endpoint that sends real-time reasoning updates and answer tokens (delta events) via SSE
     """
     async def event_generator():
         try:
-            # Convert conversation history
-            history = [{"role": msg.role, "content": msg.content} 
-                       for msg in query.conversation_history] if query.conversation_history else []
+            # Conversation history lives server-side under the session ID
+            session_id, history, summary, client_sent_history = await open_session(query)
             
-            # Create a queue to receive reasoning updates
+            # Create a queue to receive reasoning updates and answer tokens
             reasoning_queue = asyncio.Queue()
             
-            # Process query with streaming callback
+            # Process query with streaming callbacks
             async def reasoning_callback(step):
-                await reasoning_queue.put(step)
+                await reasoning_queue.put({'type': 'reasoning', 'data': step})
             
-            # Start processing in background
-            process_task = asyncio.create_task(
-                tourism_agent.process_query_streaming(
-                    query.query, 
-                    history,
-                    reasoning_callback
+            async def token_callback(delta):
+                await reasoning_queue.put({'type': 'delta', 'data': delta})
+            
+            # Start processing in background - the task inherits the request deadline
+            with request_deadline(settings.REQUEST_DEADLINE):
+                process_task = asyncio.create_task(
+                    tourism_agent.process_query_streaming(
+                        query.query, 
+                        history,
+                        reasoning_callback,
+                        token_callback,
+                        conversation_summary=summary
+                    )
                 )
-            )
             
-            # Stream reasoning steps as they come
-            while not process_task.done() or not reasoning_queue.empty():
-                try:
-                    step = await asyncio.wait_for(reasoning_queue.get(), timeout=0.1)
-                    yield f"data: {json.dumps({'type': 'reasoning', 'data': step})}\n\n"
-                except asyncio.TimeoutError:
-                    continue
+            # Stream reasoning steps and answer tokens as they come
+            try:
+                async for event in pump_events(reasoning_queue, process_task):
+                    yield f"data: {json.dumps(event)}\n\n"
+            finally:
+                # Client went away mid-stream - stop working on its query
+                if not process_task.done():
+                    process_task.cancel()
             
             # Get final result
             result = await process_task
             
-            # Build conversation history
-            updated_history = history.copy()
-            updated_history.append({"role": "user", "content": query.query})
-            updated_history.append({"role": "assistant", "content": result["final_response"]})
+            new_turn = turn_messages(query.query, result["final_response"])
+            if session_id is not None:
+                await session_repo.append_turn(session_id, query.query, result["final_response"])
+                if not client_sent_history:
+                    conversation_summarizer.schedule(session_id)  # Folds older turns into the summary off the critical path
             
             # Send final response
             final_data = {
@@ -67,7 +124,9 @@ async def chat_with_streaming(query: UserQuery):
                     'places_info': result.get("places_info", []),
                     'final_response': result["final_response"],
                     'suggestions': result.get("suggestions", []),
-                    'conversation_history': updated_history
+                    'session_id': session_id,
+                    # Session clients get only the new turn; clients that sent a history get it back in full
+                    'conversation_history': history + new_turn if client_sent_history else new_turn
                 }
             }
             yield f"data: {json.dumps(final_data)}\n\n"
@@ -96,27 +155,31 @@ async def chat_with_tourism_agent(query: UserQuery):
     - Weather information (if requested)
     - Tourist attractions (if requested)
     - Natural language response
-    - Updated conversation history
+    - The session ID and the new conversation turn
     
     Now powered by LangGraph for better orchestration and parallel execution
-    Session memory enabled for contextual conversations
+    Session memory enabled for contextual conversations: send the returned session_id with
+    the next query instead of the conversation history
     """
     try:
-        # Convert conversation history to dict format
-        history = [{"role": msg.role, "content": msg.content} 
-                   for msg in query.conversation_history] if query.conversation_history else []
+        # Conversation history lives server-side under the session ID
+        session_id, history, summary, client_sent_history = await open_session(query)
         
-        # Process query through LangGraph workflow
-        result = await tourism_agent.process_query(query.query, history)
+        # Process query through LangGraph workflow, within the request deadline
+        with request_deadline(settings.REQUEST_DEADLINE):
+            result = await tourism_agent.process_query(query.query, history, conversation_summary=summary)
         
-        # Build updated conversation history
-        updated_history = history.copy()
-        updated_history.append({"role": "user", "content": query.query})
-        updated_history.append({"role": "assistant", "content": result["final_response"]})
+        new_turn = turn_messages(query.query, result["final_response"])
+        if session_id is not None:
+            await session_repo.append_turn(session_id, query.query, result["final_response"])
+            if not client_sent_history:
+                conversation_summarizer.schedule(session_id)  # Folds older turns into the summary off the critical path
         
-        # Convert back to ConversationMessage objects
+        # Session clients get only the new turn; clients that sent a history get it back in full
         from app.models.agent_models import ConversationMessage
-        conversation_messages = [ConversationMessage(**msg) for msg in updated_history]
+        conversation_messages = [
+            ConversationMessage(**msg) for msg in (history + new_turn if client_sent_history else new_turn)
+        ]
         
         # Convert reasoning trace and suggestions
         from app.models.agent_models import ReasoningStep, ProactiveSuggestion
@@ -128,6 +191,7 @@ async def chat_with_tourism_agent(query: UserQuery):
             weather_info=result["weather_info"],
             places_info=result["places_info"],
             final_response=result["final_response"],
+            session_id=session_id,
             conversation_history=conversation_messages,
             reasoning_trace=reasoning_steps,
             suggestions=suggestions
@@ -144,6 +208,34 @@ async def chat_with_tourism_agent(query: UserQuery):
             detail="An error occurred while processing your request. Please try again."
         )
 
+@router.get("/metrics", tags=["Health"])
+async def metrics():
+    """Cache and upstream statistics (how much upstream traffic the caches remove)"""
+    return {
+        "analysis": query_classifier.stats(),
+        "llm_cache": {**llm_cache_stats, "cache": llm_cache.stats()},
+        "llm_providers": ai_client.stats(),
+        "response_cache": response_cache.stats(),
+        "rate_limits": {name: limiter.stats() for name, limiter in rate_limiters.items()},
+        "deadline": deadline_stats,
+        "sessions": {**session_repo.stats(), "summaries": conversation_summarizer.stats()},
+        "geocoding": {
+            "gazetteer": gazetteer.stats(),
+            "cache": geo_cache.stats(),
+            "singleflight": geo_flight.stats(),
+            "providers": {name: stats.snapshot() for name, stats in geo_provider_stats.items()}
+        },
+        "weather": {
+            "cache": {**weather_cache_stats, "entries": len(weather_cache)},
+            "singleflight": weather_flight.stats()
+        },
+        "places": {
+            "tile_cache": places_cache.stats(),
+            "singleflight": places_flight.stats(),
+            **places_cache_stats
+        }
+    }
+
 @router.get("/health", tags=["Health"])
 async def health_check():
     """Check if the tourism service is running"""
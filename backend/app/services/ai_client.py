@@ -1,224 +1,283 @@
 """
-AI Client - Wrapper for OpenAI, Anthropic, and Google Gemini APIs
-Provides a unified interface for all providers
+AI Client - Unified interface over an ordered pool of LLM providers (OpenAI, Anthropic, Gemini)
+Adds the completion cache, failover when a provider fails or its breaker is open, and hedged
+requests when the provider in use is slower than the call site's threshold
 """
-from typing import List, Dict, Any
+from typing import AsyncIterator, List, Dict, Optional, Tuple
 from app.core.config import settings
 from app.core.logger import logs
+from app.core.cache import SQLiteCache, TieredCache, TTLCache
+from app.core.circuit_breaker import CircuitOpenError
+from app.core.deadline import step_timeout
+from app.services.llm_providers import LLMProvider, build_provider_pool, rate_limit_cooldown
 import inspect
 import asyncio
+import hashlib
+import json
 import time
 
+# Exact-match completion cache shared by every call site, memory LRU over SQLite
+llm_cache = TieredCache(
+    memory=TTLCache(max_entries=settings.LLM_CACHE_MAX_ENTRIES),
+    disk=SQLiteCache(settings.CACHE_DB_PATH, namespace="llm") if settings.LLM_CACHE_DISK_ENABLED else None
+)
+llm_cache_stats = {"hits": 0, "misses": 0, "stores": 0, "tokens_saved_estimate": 0}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) for savings metrics"""
+    return max(1, len(text) // 4)
+
+
 class AIClient:
-    def __init__(self):
-        self.provider = settings.AI_PROVIDER.lower()
-        
-        if self.provider == "openai":
-            from openai import AsyncOpenAI
-            if not settings.OPENAI_API_KEY:
-                raise ValueError("OPENAI_API_KEY not set in environment variables")
-            self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
-            self.model = settings.OPENAI_MODEL
-        elif self.provider == "anthropic":
-            from anthropic import AsyncAnthropic
-            if not settings.ANTHROPIC_API_KEY:
-                raise ValueError("ANTHROPIC_API_KEY not set in environment variables")
-            self.client = AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
-            self.model = settings.ANTHROPIC_MODEL
-        elif self.provider == "gemini":
-            import google.generativeai as genai
-            if not settings.GEMINI_API_KEY:
-                raise ValueError("GEMINI_API_KEY not set in environment variables")
-            genai.configure(api_key=settings.GEMINI_API_KEY)
-            self.genai = genai
-            self.model = settings.GEMINI_MODEL
-        else:
-            raise ValueError(f"Unsupported AI provider: {self.provider}")
+    def __init__(self, providers: Optional[List[LLMProvider]] = None):
+        # Ordered pool: AI_PROVIDER first, then backups with configured keys (injectable for benchmarks)
+        self.providers = providers if providers is not None else build_provider_pool()
+        self.primary = self.providers[0]
+        self.provider = self.primary.name
+        self.model = self.primary.model
+        self.hedges = 0
+        self.failovers = 0
+        self.wins: Dict[str, int] = {provider.name: 0 for provider in self.providers}
+    
+    def _cache_key(self, messages: List[Dict[str, str]], temperature: float, provider: LLMProvider) -> str:
+        """
+        Answers are stored under the provider that produced them and looked up under the provider
+        that would be asked first, so a backup's answer is only reused while that backup is in front
+        """
+        payload = json.dumps(
+            {"provider": provider.name, "model": provider.model, "messages": messages, "temperature": temperature},
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
     
-    async def chat_completion(self, messages: List[Dict[str, str]], temperature: float = 0.7, max_retries: int = 3) -> str:
+    def _cache_ttl(self, temperature: float, cache_ttl: Optional[float]) -> float:
         """
-        Send a chat completion request to the AI provider with retry logic
+        Call sites may pass their own TTL (0 disables caching for the call); otherwise
+        low-temperature calls are cached with the default TTL and creative ones are not
+        """
+        if not settings.LLM_CACHE_ENABLED:
+            return 0
+        if cache_ttl is not None:
+            return cache_ttl
+        return settings.LLM_CACHE_DEFAULT_TTL if temperature <= settings.LLM_CACHE_MAX_TEMPERATURE else 0
+    
+    async def _cache_lookup(self, key: str, messages: List[Dict[str, str]]) -> Optional[str]:
+        found, cached = await llm_cache.get(key)
+        if found and cached:
+            llm_cache_stats["hits"] += 1
+            llm_cache_stats["tokens_saved_estimate"] += (
+                estimate_tokens("".join(msg["content"] for msg in messages)) + estimate_tokens(cached)
+            )
+            return cached
+        llm_cache_stats["misses"] += 1
+        return None
+    
+    async def _cache_store(self, key: str, response: str, ttl: float) -> None:
+        if response and response.strip():
+            await llm_cache.set(key, response, ttl)
+            llm_cache_stats["stores"] += 1
+    
+    async def chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_retries: int = 3,
+        cache_ttl: Optional[float] = None,
+        timeout: Optional[float] = None,
+        hedge_after: Optional[float] = None
+    ) -> str:
+        """
+        Send a chat completion request to the provider pool with retry logic
         Returns the assistant's response as a string
+        Identical requests are answered from the completion cache (see _cache_ttl)
+        hedge_after: seconds before a backup provider is raced against a slow one
+        (default LLM_HEDGE_DEFAULT_DELAY); the first answer wins
+        Raises CircuitOpenError without calling anything while every breaker is open
         """
-        last_error = None
+        ttl = self._cache_ttl(temperature, cache_ttl)
+        if ttl > 0:
+            cached = await self._cache_lookup(self._cache_key(messages, temperature, self._candidates()[0]), messages)
+            if cached is not None:
+                return cached
+        response, provider = await self._complete(messages, temperature, max_retries, timeout, hedge_after)
+        if ttl > 0:
+            await self._cache_store(self._cache_key(messages, temperature, provider), response, ttl)
+        return response
+    
+    def _candidates(self) -> List[LLMProvider]:
+        """Providers whose breaker is not open, in pool order (the primary alone if all are open)"""
+        return [provider for provider in self.providers if provider.available()] or self.providers[:1]
+    
+    async def _complete(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_retries: int,
+        timeout: Optional[float],
+        hedge_after: Optional[float]
+    ) -> Tuple[str, LLMProvider]:
+        """
+        Returns (answer, provider that produced it)
+        Start the first available provider; move on to the next one when it fails, and race
+        the next one against it when it has not answered within the hedge delay
+        Every provider shares one wall-clock budget (`timeout`, default LLM_CALL_BUDGET),
+        cut down to what is left of the request's deadline
+        """
+        requested = settings.LLM_CALL_BUDGET if timeout is None else timeout
+        budget = step_timeout(requested)
+        deadline = time.monotonic() + budget
+        # Running out of time only counts against a provider that had the whole budget it was
+        # given; one cut short by the request's deadline says nothing about the provider
+        blame_timeouts = budget >= requested
+        candidates = self._candidates()
+        if len(candidates) == 1:
+            response = await candidates[0].complete_with_retries(messages, temperature, max_retries, deadline, blame_timeouts)
+            self.wins[candidates[0].name] += 1
+            return response, candidates[0]
         
-        for attempt in range(max_retries):
-            try:
-                return await self._chat_completion_impl(messages, temperature)
-            except Exception as e:
-                last_error = e
-                error_str = str(e)
-                
-                # Check if it's a rate limit error (429)
-                if "429" in error_str or "quota" in error_str.lower() or "rate limit" in error_str.lower():
-                    # Extract retry delay from error message if available
-                    retry_delay = 60  # Default 60 seconds
-                    if "retry in" in error_str.lower():
-                        try:
-                            # Try to extract the retry delay (e.g., "retry in 59.92s")
-                            import re
-                            match = re.search(r'retry in (\d+\.?\d*)', error_str.lower())
-                            if match:
-                                retry_delay = float(match.group(1))
-                        except:
-                            pass
-                    
-                    if attempt < max_retries - 1:
+        hedge_delay = hedge_after if hedge_after is not None else settings.LLM_HEDGE_DEFAULT_DELAY
+        if not settings.LLM_HEDGE_ENABLED:
+            hedge_delay = None
+        backups = iter(candidates)
+        pending: Dict[asyncio.Task, LLMProvider] = {}
+        last_error: Optional[BaseException] = None
+        launched = 0
+        
+        def launch() -> bool:
+            nonlocal launched
+            provider = next(backups, None)
+            if provider is None:
+                return False
+            pending[asyncio.create_task(
+                provider.complete_with_retries(messages, temperature, max_retries, deadline, blame_timeouts)
+            )] = provider
+            launched += 1
+            return True
+        
+        launch()
+        try:
+            while pending:
+                # Once every candidate is running there is nobody left to hedge with
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=hedge_delay if launched < len(candidates) else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    if launch():
+                        self.hedges += 1
                         logs.define_logger(
-                            level=30,
-                            message=f"Rate limit hit (attempt {attempt + 1}/{max_retries}). Waiting {retry_delay}s before retry...",
+                            level=20,
+                            message=f"Hedging LLM call: no answer within {hedge_delay:.1f}s, racing {list(pending.values())[-1].name}",
                             loggName=inspect.stack()[0]
                         )
-                        await asyncio.sleep(retry_delay)
-                        continue
+                    continue
+                
+                for task in done:
+                    provider = pending.pop(task)
+                    if task.exception() is None and task.result():
+                        self.wins[provider.name] += 1
+                        return task.result(), provider
+                    last_error = task.exception()
                 
-                # For other errors, use exponential backoff
-                if attempt < max_retries - 1:
-                    wait_time = 2 ** attempt  # 1s, 2s, 4s
+                # Failover: nothing left running, hand over to the next provider right away
+                if not pending and launch():
+                    self.failovers += 1
                     logs.define_logger(
                         level=30,
-                        message=f"Error on attempt {attempt + 1}/{max_retries}: {error_str}. Retrying in {wait_time}s...",
+                        message=f"LLM failover to {list(pending.values())[-1].name} after: {last_error or 'empty response'}",
                         loggName=inspect.stack()[0]
                     )
-                    await asyncio.sleep(wait_time)
-                else:
-                    logs.define_logger(
-                        level=40,
-                        message=f"All {max_retries} attempts failed: {error_str}",
-                        loggName=inspect.stack()[0]
-                    )
-                    raise
-        
-        # If we exhausted all retries
-        if last_error:
-            raise last_error
-        return ""
+            if last_error is not None:
+                raise last_error
+            return "", candidates[0]
+        finally:
+            # Cancel whichever providers lost the race
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
     
-    async def _chat_completion_impl(self, messages: List[Dict[str, str]], temperature: float = 0.7) -> str:
+    async def stream_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        cache_ttl: Optional[float] = None,
+        hedge_after: Optional[float] = None
+    ) -> AsyncIterator[str]:
         """
-        Internal implementation of chat completion
+        Stream the assistant's response as text deltas while the provider generates it
+        Streams from the first provider whose breaker is closed; errors before the first delta
+        (including no delta within the call budget) fall back to chat_completion's
+        failover/hedging path and yield the whole answer at once; errors mid-stream are raised
+        Cached answers are yielded in one piece; completed streams are stored like chat_completion
         """
+        ttl = self._cache_ttl(temperature, cache_ttl)
+        provider = self._candidates()[0]
+        key = self._cache_key(messages, temperature, provider) if ttl > 0 else None
+        if key is not None:
+            cached = await self._cache_lookup(key, messages)
+            if cached is not None:
+                yield cached
+                return
+        
+        started = False
+        parts = []
+        # The budget bounds the wait for the first delta; once the answer is flowing it may finish
+        first_delta_budget = step_timeout(settings.LLM_CALL_BUDGET)
+        first_delta = None
         try:
-            if self.provider == "openai":
-                response = await self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    temperature=temperature
-                )
-                content = response.choices[0].message.content
-                logs.define_logger(
-                    level=20,
-                    message=f"OpenAI response received: {len(content) if content else 0} chars",
-                    loggName=inspect.stack()[0]
-                )
-                return content or ""
-            
-            elif self.provider == "anthropic":
-                # Anthropic uses different format - extract system message if present
-                system_message = None
-                anthropic_messages = []
-                
-                for msg in messages:
-                    if msg["role"] == "system":
-                        system_message = msg["content"]
-                    else:
-                        anthropic_messages.append({
-                            "role": msg["role"],
-                            "content": msg["content"]
-                        })
-                
-                response = await self.client.messages.create(
-                    model=self.model,
-                    max_tokens=1024,
-                    temperature=temperature,
-                    system=system_message if system_message else "",
-                    messages=anthropic_messages
-                )
-                return response.content[0].text
-            
-            elif self.provider == "gemini":
-                # Convert messages to a simple prompt for Gemini
-                prompt_parts = []
-                
-                for msg in messages:
-                    role = msg["role"]
-                    content = msg["content"]
-                    if role == "system":
-                        prompt_parts.append(f"Instructions: {content}")
-                    elif role == "user":
-                        prompt_parts.append(f"User: {content}")
-                    elif role == "assistant":
-                        prompt_parts.append(f"Assistant: {content}")
-                
-                full_prompt = "\n\n".join(prompt_parts)
-                
+            provider.breaker.allow()
+            async with asyncio.timeout(first_delta_budget) as first_delta:
+                async for delta in provider.stream(messages, temperature):
+                    if delta:
+                        if not started:
+                            first_delta.reschedule(None)
+                        started = True
+                        parts.append(delta)
+                        yield delta
+            provider.breaker.record_success()
+            self.wins[provider.name] += 1
+            if key is not None:
+                await self._cache_store(key, "".join(parts), ttl)
+        except (asyncio.CancelledError, GeneratorExit):
+            provider.breaker.record_cancelled()
+            raise
+        except Exception as e:
+            error = str(e) or f"{type(e).__name__}: no answer within the call budget"
+            cut_short = first_delta_budget < settings.LLM_CALL_BUDGET
+            if cut_short and first_delta is not None and first_delta.expired():
+                provider.breaker.record_cancelled()  # The request ran out of time, not the provider
+            elif not isinstance(e, CircuitOpenError):
+                provider.breaker.record_failure(error, rate_limit_cooldown(error))
+            if started:
                 logs.define_logger(
-                    level=20,
-                    message=f"Gemini request - prompt length: {len(full_prompt)} chars",
+                    level=40,
+                    message=f"Error while streaming AI response: {str(e)}",
                     loggName=inspect.stack()[0]
                 )
-                
-                # Use generate_content method (Gemini SDK is synchronous)
-                model = self.genai.GenerativeModel(self.model)
-                
-                # Configure safety settings to allow travel-related content
-                safety_settings = [
-                    {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
-                    {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
-                    {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
-                    {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"},
-                ]
-                
-                response = model.generate_content(
-                    full_prompt,
-                    generation_config=self.genai.types.GenerationConfig(
-                        temperature=temperature,
-                        max_output_tokens=2048,  # Increased for longer responses
-                    ),
-                    safety_settings=safety_settings
-                )
-                
-                # Handle complex responses - try multiple extraction methods
-                text = ""
-                
-                # Method 1: Try simple .text accessor
-                try:
-                    text = response.text
-                except:
-                    # Method 2: Extract from parts directly
-                    try:
-                        if response.candidates and len(response.candidates) > 0:
-                            parts = response.candidates[0].content.parts
-                            text = "".join(part.text for part in parts if hasattr(part, 'text'))
-                    except Exception as parts_error:
-                        logs.define_logger(
-                            level=40,
-                            message=f"Failed to extract from parts: {str(parts_error)}",
-                            loggName=inspect.stack()[0]
-                        )
-                
-                if text:
-                    logs.define_logger(
-                        level=20,
-                        message=f"Gemini response extracted - length: {len(text)} chars",
-                        loggName=inspect.stack()[0]
-                    )
-                    return text
-                else:
-                    logs.define_logger(
-                        level=40,
-                        message="Gemini returned empty response after all extraction attempts",
-                        loggName=inspect.stack()[0]
-                    )
-                    return ""
-        
-        except Exception as e:
+                raise
             logs.define_logger(
-                level=40,
-                message=f"Error in AI chat completion: {str(e)}",
+                level=30,
+                message=f"Streaming from {provider.name} failed before the first token ({error}), falling back to a single completion",
                 loggName=inspect.stack()[0]
             )
-            raise
+            response, answered_by = await self._complete(messages, temperature, 3, None, hedge_after)
+            if key is not None:
+                await self._cache_store(self._cache_key(messages, temperature, answered_by), response, ttl)
+            yield response
+    
+    def stats(self) -> dict:
+        return {
+            "providers": {
+                provider.name: {**provider.snapshot(), "wins": self.wins[provider.name]}
+                for provider in self.providers
+            },
+            "hedges": self.hedges,
+            "failovers": self.failovers,
+        }
 
 # Singleton instance
 ai_client = AIClient()
@@ -0,0 +1,132 @@
+"""
+Conversation Summary - A rolling summary of each session's older turns
+After a turn is stored, turns beyond the most recent few are folded into the session's
+summary by a background LLM call, off the request's critical path. Prompts then carry the
+summary plus as many recent messages as fit a fixed token budget, so their size stays flat
+however long the conversation runs, and nothing said early on is simply cut off.
+"""
+from typing import Dict, List, Optional
+from app.core.config import settings
+from app.core.deadline import without_deadline
+from app.core.logger import logs
+from app.repos.session_repo import SessionRepo, session_repo
+from app.services.ai_client import ai_client, estimate_tokens
+import asyncio
+import inspect
+
+# Shared counters for the metrics endpoint
+summary_stats = {"updates": 0, "failures": 0, "messages_folded": 0}
+
+_background_tasks: set = set()  # Strong references so summary tasks are not garbage collected
+
+SUMMARY_PROMPT = """You maintain the running summary of a conversation between a traveller and a tourism assistant.
+Update the summary with the new messages below. Keep what later questions may refer back to:
+destinations and places discussed, dates, trip length, budget, interests and constraints, and any
+decisions or recommendations made. Drop greetings, weather readings and long attraction lists.
+Answer with the updated summary only, in plain sentences, at most {words} words.
+
+Current summary:
+{summary}
+
+New messages:
+{messages}"""
+
+
+def _clip(text: str, max_tokens: int) -> str:
+    """Cut text to roughly max_tokens (see estimate_tokens), marking the cut"""
+    max_chars = max_tokens * 4
+    return text if len(text) <= max_chars else text[:max(0, max_chars - 3)].rstrip() + "..."
+
+
+def history_context(history: Optional[List[Dict[str, str]]], summary: Optional[str] = None,
+                    budget: Optional[int] = None) -> List[str]:
+    """
+    Prompt lines for the conversation so far, within `budget` tokens (default
+    CONVERSATION_CONTEXT_TOKENS): the summary of earlier turns first, then the newest
+    messages that still fit, oldest first. Each message is cut to CONVERSATION_MESSAGE_MAX_TOKENS
+    """
+    budget = settings.CONVERSATION_CONTEXT_TOKENS if budget is None else budget
+    lines = []
+    if summary:
+        summary_line = f"Summary of earlier conversation: {_clip(summary, min(settings.SUMMARY_MAX_TOKENS, budget))}"
+        budget -= estimate_tokens(summary_line)
+        lines.append(summary_line)
+
+    recent = []
+    for msg in reversed(history or []):
+        if budget < 16:  # Not enough left for a useful message
+            break
+        role = msg.get('role', 'user')
+        content = _clip(msg.get('content', ''), min(settings.CONVERSATION_MESSAGE_MAX_TOKENS, budget))
+        line = f"{role}: {content}"
+        budget -= estimate_tokens(line)
+        recent.append(line)
+    return lines + recent[::-1]
+
+
+class ConversationSummarizer:
+    """Folds older session messages into the rolling summary, one background update per session at a time"""
+
+    def __init__(self, repo: SessionRepo = session_repo):
+        self.repo = repo
+        self._summarizing: set = set()
+
+    def schedule(self, session_id: str) -> None:
+        """Start a summary update for the session if enough unsummarised turns have built up"""
+        if not settings.SUMMARY_ENABLED or session_id in self._summarizing:
+            return
+        self._summarizing.add(session_id)
+        # The update outlives the request that triggered it - not bound by its deadline
+        task = asyncio.create_task(self._update(session_id), context=without_deadline())
+        _background_tasks.add(task)
+
+        def _done(finished: asyncio.Task) -> None:
+            _background_tasks.discard(finished)
+            self._summarizing.discard(session_id)
+
+        task.add_done_callback(_done)
+
+    async def _update(self, session_id: str) -> None:
+        session = await self.repo.load(session_id)
+        if session is None:
+            return
+        messages = session["messages"]
+        if len(messages) < settings.SUMMARY_RECENT_MESSAGES + settings.SUMMARY_BATCH_MESSAGES:
+            return
+
+        # Keep the most recent messages verbatim; fold the rest
+        fold = messages[:len(messages) - settings.SUMMARY_RECENT_MESSAGES]
+        upto = session["total"] - settings.SUMMARY_RECENT_MESSAGES
+        prompt = SUMMARY_PROMPT.format(
+            words=settings.SUMMARY_MAX_TOKENS * 3 // 4,
+            summary=session["summary"] or "(none yet)",
+            messages="\n".join(
+                f"{msg['role']}: {_clip(msg['content'], settings.CONVERSATION_MESSAGE_MAX_TOKENS * 2)}" for msg in fold
+            ),
+        )
+        try:
+            summary = await ai_client.chat_completion(
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.2,
+                cache_ttl=0,  # Every summary input is unique
+                hedge_after=settings.LLM_HEDGE_ANALYSIS_DELAY
+            )
+        except Exception as e:
+            summary_stats["failures"] += 1
+            logs.define_logger(level=30, message=f"Conversation summary failed: {str(e)}", loggName=inspect.stack()[0])
+            return
+
+        summary = summary.strip()
+        if not summary:
+            summary_stats["failures"] += 1
+            return
+        await self.repo.fold(session_id, _clip(summary, settings.SUMMARY_MAX_TOKENS), upto)
+        summary_stats["updates"] += 1
+        summary_stats["messages_folded"] += len(fold)
+
+    def stats(self) -> dict:
+        return {**summary_stats, "in_flight": len(self._summarizing)}
+
+
+# Singleton instance
+conversation_summarizer = ConversationSummarizer()
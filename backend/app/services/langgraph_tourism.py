@@ -5,23 +5,46 @@ Multi-agent workflow using LangGraph for better state management and parallel ex
 from typing import TypedDict, Annotated, Literal
 from langgraph.graph import StateGraph, END
 from langchain_core.messages import BaseMessage
+from langchain_core.runnables import RunnableConfig
+import asyncio
 import operator
 import json
+import time
 
 from app.services.ai_client import ai_client
+from app.services.query_classifier import (
+    query_classifier, PLACES_KEYWORDS, INFO_REQUEST_PATTERNS, COMPLEX_KEYWORDS, MULTI_DAY_KEYWORDS
+)
+from app.services.response_cache import response_cache
+from app.services.conversation_summary import history_context
 from app.repos.geo_repo import GeoRepo
 from app.repos.weather_repo import WeatherRepo
 from app.repos.places_repo import PlacesRepo
+from app.models.location_models import LocationData
+from app.core.config import settings
+from app.core.deadline import deadline_stats, step_timeout, time_remaining
 from app.core.logger import logs
 import inspect
 
+# Appended to the analysis prompt when the query looks like trip planning - the plan then
+# comes back with the analysis and planning_node skips its own LLM call
+FUSED_PLAN_FIELDS = """This looks like a trip-planning query, so ALSO include:
+- execution_plan: array of 3-4 specific steps (e.g., ["Check weather forecast", "Find top 5 attractions", "Suggest day-by-day itinerary"])
+- travel_tips: brief travel tip for this destination (1-2 sentences)
+
+"""
+
 
 # Define the shared state
 class TourismState(TypedDict):
     """Shared state that flows through the graph"""
     query: str
-    conversation_history: list[dict] | None  # Store previous conversation
+    conversation_history: list[dict] | None  # Recent messages not yet folded into the summary
+    conversation_summary: str | None  # Rolling summary of the session's earlier turns
     location: str | None
+    coordinates: LocationData | None  # Resolved once by the geocode node and reused by every data node
+    locations: list[str] | None  # Every place in a multi-city query, primary location first
+    locations_coordinates: list[LocationData | None] | None  # Coordinates for each entry of locations
     main_location: str | None  # The primary city/region being discussed (preserved across follow-up queries)
     needs_weather: bool
     needs_places: bool
@@ -31,9 +54,12 @@ class TourismState(TypedDict):
     weather_info: str | None
     places_info: list[str] | None
     travel_tips: str | None  # Additional travel tips for complex queries
+    skipped_data: Annotated[list[str], operator.add]  # Optional data dropped to meet the request deadline
     final_response: str | None
     error: str | None
-    reasoning_trace: list[dict] | None  # Track which agents ran and why
+    # Track which agents ran and why. Nodes return only their new steps and the reducer
+    # concatenates them, so parallel branches (weather/places) never overwrite each other
+    reasoning_trace: Annotated[list[dict], operator.add]
 
 
 class LangGraphTourismAgent:
@@ -44,32 +70,64 @@ class LangGraphTourismAgent:
         self.weather_repo = WeatherRepo()
         self.places_repo = PlacesRepo()
         self.graph = self._build_graph()
-        self.reasoning_callback = None  # For streaming reasoning
     
-    async def _add_reasoning(self, state: TourismState, agent: str, action: str, reason: str) -> list[dict]:
-        """Helper to add reasoning step to trace and optionally stream it"""
-        trace = state.get("reasoning_trace") or []
+    async def _add_reasoning(self, state: TourismState, config: RunnableConfig, agent: str, action: str, reason: str) -> list[dict]:
+        """
+        Helper to create a reasoning step and optionally stream it
+        Returns the new steps only - the state reducer appends them to the trace
+        The streaming callback travels with the run's config, so concurrent requests
+        sharing this agent never see each other's steps
+        """
         step = {
             "agent": agent,
             "action": action,
             "reason": reason
         }
-        trace.append(step)
         
         # If streaming callback is set, send the step immediately
-        if self.reasoning_callback:
-            await self.reasoning_callback(step)
+        reasoning_callback = (config or {}).get("configurable", {}).get("reasoning_callback")
+        if reasoning_callback:
+            await reasoning_callback(step)
         
-        return trace
+        return [step]
+    
+    def _data_budget(self) -> float | None:
+        """
+        How long an optional data fetch (weather, places) may take: the request's remaining
+        budget minus the synthesis reserve. None without a deadline, 0 when it should be skipped
+        """
+        left = time_remaining()
+        if left is None:
+            return None
+        left -= settings.REQUEST_SYNTHESIS_RESERVE
+        return left if left >= settings.REQUEST_MIN_FETCH_BUDGET else 0.0
+    
+    async def _skip_for_deadline(self, state: TourismState, config: RunnableConfig, agent: str, data: str) -> list[dict]:
+        """Record that `data` was left out to answer within the request deadline"""
+        deadline_stats["skipped_fetches"] += 1
+        logs.define_logger(
+            level=30,
+            message=f"Request deadline near - answering without {data} for: {state['query']}",
+            loggName=inspect.stack()[0]
+        )
+        return await self._add_reasoning(
+            state,
+            config,
+            agent=agent,
+            action=f"Skipping {data}",
+            reason="The request is close to its time limit - answering with the information already gathered"
+        )
     
     # ========== NODE FUNCTIONS ==========
     
-    async def analyze_query_node(self, state: TourismState) -> TourismState:
+    async def analyze_query_node(self, state: TourismState, config: RunnableConfig) -> dict:
         """Analyze the user query to determine intent and extract location"""
+        reasoning_trace = []
         try:
             # Add reasoning
             reasoning_trace = await self._add_reasoning(
                 state,
+                config,
                 agent="Query Analyzer",
                 action="Analyzing user query",
                 reason="Understanding what information the user needs (location, weather, attractions, itinerary planning)"
@@ -81,16 +139,31 @@ class LangGraphTourismAgent:
                 loggName=inspect.stack()[0]
             )
             
-            # Build context from conversation history
-            context = ""
-            if state.get('conversation_history') and len(state['conversation_history']) > 0:
-                context = "\n\nPrevious conversation context:\n"
-                for msg in state['conversation_history'][-4:]:  # Last 4 messages for context
-                    role = msg.get('role', 'user')
-                    content = msg.get('content', '')
-                    context += f"{role}: {content}\n"
+            # Unambiguous queries are classified from keyword rules + the gazetteer, no LLM call
+            analysis = query_classifier.classify(state['query'], state.get('conversation_history'))
+            if analysis is not None:
+                logs.define_logger(
+                    level=20,
+                    message=f"Fast-path analysis: {analysis}",
+                    loggName=inspect.stack()[0]
+                )
+            else:
+                # Build context from conversation history
+                context = ""
+                history_lines = history_context(state.get('conversation_history'), state.get('conversation_summary'))
+                if history_lines:
+                    context = "\n\nPrevious conversation context:\n" + "\n".join(history_lines) + "\n"
+                
+                # Complex-looking queries ask for the plan in the same call
+                query_lower = state['query'].lower()
+                fuse_plan = (
+                    settings.FUSED_ANALYSIS_PLANNING_ENABLED
+                    and any(keyword in query_lower for keyword in COMPLEX_KEYWORDS)
+                    and not any(pattern in query_lower for pattern in INFO_REQUEST_PATTERNS)
+                )
+                plan_fields = FUSED_PLAN_FIELDS if fuse_plan else ""
             
-            prompt = f"""Analyze this tourism query and extract information in JSON format.
+                prompt = f"""Analyze this tourism query and extract information in JSON format.
 {context}
 Current Query: "{state['query']}"
 
@@ -102,6 +175,7 @@ Important:
 Return a JSON object with:
 - location: The specific place/attraction mentioned (can be city or attraction name)
 - is_city: true if location is a city/town/region, false if it's a specific attraction/landmark
+- other_locations: array of any OTHER cities/regions the same trip covers (e.g. "Rome, Florence and Venice" -> location "Rome", other_locations ["Florence", "Venice"]), empty array if none
 - needs_weather: true if asking about weather/temperature/climate
 - needs_places: true if asking about places to visit/attractions/things to do
 - query_type: Classify the query as one of:
@@ -118,54 +192,49 @@ Examples:
 {{"location": "Paris", "is_city": true, "needs_weather": false, "needs_places": true, "query_type": "detailed_places"}}
 {{"location": "Tokyo", "is_city": true, "needs_weather": true, "needs_places": false, "query_type": "weather_focused"}}
 {{"location": "Eiffel Tower", "is_city": false, "needs_weather": false, "needs_places": false, "query_type": "simple"}}
+{{"location": "Rome", "is_city": true, "other_locations": ["Florence", "Venice"], "needs_weather": true, "needs_places": true, "query_type": "detailed_places"}}
 
-Return ONLY the JSON, no other text."""
+{plan_fields}Return ONLY the JSON, no other text."""
 
-            response = await ai_client.chat_completion(
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3
-            )
+                llm_start = time.perf_counter()
+                response = await ai_client.chat_completion(
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.3,
+                    cache_ttl=settings.LLM_CACHE_ANALYSIS_TTL,
+                    timeout=step_timeout(settings.LLM_CALL_BUDGET, reserve=settings.REQUEST_SYNTHESIS_RESERVE),
+                    hedge_after=settings.LLM_HEDGE_ANALYSIS_DELAY
+                )
+                query_classifier.record_llm(time.perf_counter() - llm_start)
             
-            # Clean the response - remove markdown code blocks if present
-            cleaned_response = response.strip()
-            if cleaned_response.startswith("```"):
-                # Remove markdown code blocks
-                lines = cleaned_response.split("\n")
-                cleaned_response = "\n".join([l for l in lines if not l.startswith("```")])
+                # Clean the response - remove markdown code blocks if present
+                cleaned_response = response.strip()
+                if cleaned_response.startswith("```"):
+                    # Remove markdown code blocks
+                    lines = cleaned_response.split("\n")
+                    cleaned_response = "\n".join([l for l in lines if not l.startswith("```")])
             
-            # Try to find JSON in the response
-            try:
-                analysis = json.loads(cleaned_response.strip())
-            except:
-                # If JSON parsing fails, try to extract JSON from text
-                import re
-                json_match = re.search(r'\{[^}]+\}', cleaned_response)
-                if json_match:
-                    analysis = json.loads(json_match.group())
-                else:
-                    raise ValueError("No valid JSON found in response")
+                # Try to find JSON in the response
+                try:
+                    analysis = json.loads(cleaned_response.strip())
+                except:
+                    # If JSON parsing fails, try to extract JSON from text
+                    import re
+                    json_match = re.search(r'\{[^}]+\}', cleaned_response)
+                    if json_match:
+                        analysis = json.loads(json_match.group())
+                    else:
+                        raise ValueError("No valid JSON found in response")
             
             # Keyword-based detection for places queries
             query_lower = state['query'].lower()
-            places_keywords = ['place', 'attraction', 'visit', 'spot', 'thing', 'see', 'do', 'tourist', 'sights', 'landmark']
-            asking_for_places = any(keyword in query_lower for keyword in places_keywords)
+            asking_for_places = any(keyword in query_lower for keyword in PLACES_KEYWORDS)
             
             # Detect if asking for information ABOUT a specific place (not planning)
-            info_request_patterns = [
-                'tell me about', 'tell me more about', 'what can you tell me about',
-                'information about', 'details about', 'describe', 
-                'what is', 'what are the details', 'learn about', 'know about',
-                'opening hours', 'entry fee', 'entrance fee', 'admission',
-                'what makes it special', 'visitor tips', 'history of'
-            ]
-            is_info_request = any(pattern in query_lower for pattern in info_request_patterns)
+            is_info_request = any(pattern in query_lower for pattern in INFO_REQUEST_PATTERNS)
             
             # Detect complex queries that need multi-step execution and structured itinerary format
-            complex_keywords = ['plan', 'trip', 'weekend', 'itinerary', 'schedule', 'visit for', 'days in', 'day in', 'spend', 'vacation', 'travel to']
-            multi_day_keywords = ['days', 'day', 'weekend', 'week']
-            
-            is_complex = any(keyword in query_lower for keyword in complex_keywords)
-            has_duration = any(keyword in query_lower for keyword in multi_day_keywords)
+            is_complex = any(keyword in query_lower for keyword in COMPLEX_KEYWORDS)
+            has_duration = any(keyword in query_lower for keyword in MULTI_DAY_KEYWORDS)
             
             # Determine query type and format
             query_type = analysis.get("query_type", "simple")
@@ -204,6 +273,16 @@ Return ONLY the JSON, no other text."""
                 # Keep existing main location or use extracted location
                 main_location = current_main_location or extracted_location
             
+            execution_plan = analysis.get("execution_plan")
+            if not isinstance(execution_plan, list) or not execution_plan:
+                execution_plan = None
+            
+            # Multi-city queries: primary location first, then the other stops (no duplicates)
+            locations = [extracted_location] if extracted_location else []
+            for other in analysis.get("other_locations") or []:
+                if isinstance(other, str) and other.strip() and other.strip().lower() not in {l.lower() for l in locations}:
+                    locations.append(other.strip())
+            
             logs.define_logger(
                 level=20,
                 message=f"Analysis result - query: '{state['query']}', location: {extracted_location}, main_location: {main_location}, needs_places: {needs_places}, query_type: {query_type}, is_complex: {is_complex}",
@@ -211,15 +290,16 @@ Return ONLY the JSON, no other text."""
             )
             
             return {
-                **state,
                 "location": extracted_location,
+                "locations": locations,
                 "main_location": main_location,
                 "needs_weather": analysis.get("needs_weather", False),
                 "needs_places": needs_places,
                 "query_type": query_type,
                 "is_complex_query": is_complex,
-                "execution_plan": None,
-                "travel_tips": None,
+                # Present only when the plan was fused into this analysis call
+                "execution_plan": execution_plan if is_complex else None,
+                "travel_tips": analysis.get("travel_tips") if is_complex and execution_plan else None,
                 "reasoning_trace": reasoning_trace
             }
             
@@ -239,25 +319,43 @@ Return ONLY the JSON, no other text."""
                     break
             
             return {
-                **state,
                 "location": location,
+                "locations": [location] if location else [],
                 "needs_weather": True,
                 "needs_places": True,
                 "query_type": "simple",
                 "is_complex_query": False,
                 "execution_plan": None,
-                "travel_tips": None
+                "travel_tips": None,
+                "reasoning_trace": reasoning_trace
             }
     
-    async def planning_node(self, state: TourismState) -> TourismState:
+    async def planning_node(self, state: TourismState, config: RunnableConfig) -> dict:
         """Generate autonomous execution plan for complex queries"""
         if not state.get("is_complex_query"):
-            return state
+            return {"reasoning_trace": []}  # Nothing to add
         
+        if state.get("execution_plan"):
+            # The plan came back with the query analysis - no second LLM call needed
+            reasoning_trace = await self._add_reasoning(
+                state,
+                config,
+                agent="Trip Planner",
+                action="Using itinerary plan from query analysis",
+                reason="The plan was produced together with the query analysis"
+            )
+            return {
+                "needs_weather": True,  # Complex queries always need weather
+                "needs_places": True,    # And places
+                "reasoning_trace": reasoning_trace
+            }
+        
+        reasoning_trace = []
         try:
             # Add reasoning
             reasoning_trace = await self._add_reasoning(
                 state,
+                config,
                 agent="Trip Planner",
                 action="Creating multi-day itinerary plan",
                 reason="Query requires detailed day-by-day planning for multiple days"
@@ -283,7 +381,10 @@ Return ONLY the JSON, no other text."""
 
             response = await ai_client.chat_completion(
                 messages=[{"role": "user", "content": prompt}],
-                temperature=0.4
+                temperature=0.4,
+                cache_ttl=settings.LLM_CACHE_ANALYSIS_TTL,
+                timeout=step_timeout(settings.LLM_CALL_BUDGET, reserve=settings.REQUEST_SYNTHESIS_RESERVE),
+                hedge_after=settings.LLM_HEDGE_ANALYSIS_DELAY
             )
             
             # Parse response
@@ -301,11 +402,11 @@ Return ONLY the JSON, no other text."""
             )
             
             return {
-                **state,
                 "execution_plan": plan_data.get("execution_plan", []),
                 "travel_tips": plan_data.get("travel_tips"),
                 "needs_weather": True,  # Complex queries always need weather
-                "needs_places": True     # And places
+                "needs_places": True,    # And places
+                "reasoning_trace": reasoning_trace
             }
             
         except Exception as e:
@@ -316,21 +417,102 @@ Return ONLY the JSON, no other text."""
             )
             # Fallback plan
             return {
-                **state,
                 "execution_plan": ["Check weather", "Find top attractions", "Provide recommendations"],
                 "needs_weather": True,
-                "needs_places": True
+                "needs_places": True,
+                "reasoning_trace": reasoning_trace
             }
     
-    async def weather_node(self, state: TourismState) -> TourismState:
-        """Fetch weather information for the location"""
+    def _response_cacheable(self, state: TourismState) -> bool:
+        """
+        Only turns without earlier context share the cache: the answer prompt carries the
+        session's history and summary, so an answer shaped by one conversation (its places,
+        preferences, plans) must never be served to another
+        """
+        if state.get("error"):
+            return False
+        return not (state.get("conversation_history") or state.get("conversation_summary"))
+
+    async def response_cache_node(self, state: TourismState, config: RunnableConfig) -> dict:
+        """Serve a recent answer to the same intent and similar wording, skipping data fetch and synthesis"""
+        if not self._response_cacheable(state):
+            return {"reasoning_trace": []}
+        cached = response_cache.lookup(state)
+        if cached is None:
+            return {"reasoning_trace": []}
+
+        reasoning_trace = await self._add_reasoning(
+            state,
+            config,
+            agent="Response Cache",
+            action="Reusing a recent answer",
+            reason=f"A similar question about {state.get('location')} was answered recently with the same data"
+        )
+        # Streaming clients still get the answer through the delta channel, in one piece
+        token_callback = config.get("configurable", {}).get("token_callback")
+        if token_callback:
+            await token_callback(cached["final_response"])
+        return {**cached, "reasoning_trace": reasoning_trace}
+
+    async def geocode_node(self, state: TourismState, config: RunnableConfig) -> dict:
+        """Resolve the location's coordinates once so every data node can reuse them"""
+        if not state.get("location") or not (state.get("needs_weather") or state.get("needs_places")):
+            return {"reasoning_trace": []}  # Nothing to add
+        
+        budget = self._data_budget()
+        if budget == 0:
+            return {"coordinates": None, "locations_coordinates": None}  # The data nodes skip themselves
+        
+        try:
+            locations = state.get("locations") or [state["location"]]
+            logs.define_logger(
+                level=20,
+                message=f"Geocoding: {', '.join(locations)}",
+                loggName=inspect.stack()[0]
+            )
+            
+            # Multi-city queries geocode every stop concurrently; the primary location comes first
+            coords_list = list(await asyncio.wait_for(
+                asyncio.gather(*(self.geo_repo.get_coordinates(location) for location in locations)),
+                timeout=budget
+            ))
+            return {"coordinates": coords_list[0], "locations_coordinates": coords_list}
+            
+        except TimeoutError:
+            logs.define_logger(
+                level=30,
+                message=f"Geocoding cut off by the request deadline after {budget:.1f}s",
+                loggName=inspect.stack()[0]
+            )
+            return {"coordinates": None, "locations_coordinates": None}
+        except Exception as e:
+            logs.define_logger(
+                level=40,
+                message=f"Error geocoding location: {str(e)}",
+                loggName=inspect.stack()[0]
+            )
+            return {"coordinates": None, "locations_coordinates": None}
+    
+    async def weather_node(self, state: TourismState, config: RunnableConfig) -> dict:
+        """Fetch weather information for the location (runs in parallel with places_node)"""
         if not state.get("location") or not state.get("needs_weather"):
-            return state
+            return {"reasoning_trace": []}  # Nothing to add
+        
+        budget = self._data_budget()
+        if budget == 0:
+            reasoning_trace = await self._skip_for_deadline(state, config, "Weather Agent", "live weather")
+            return {"skipped_data": ["weather"], "reasoning_trace": reasoning_trace}
         
+        reasoning_trace = []
         try:
+            locations = state.get("locations") or [state["location"]]
+            if len(locations) > 1:
+                return await self._multi_location_weather(state, config, locations, budget)
+            
             # Add reasoning
             reasoning_trace = await self._add_reasoning(
                 state,
+                config,
                 agent="Weather Agent",
                 action=f"Fetching current weather for {state['location']}",
                 reason="User needs weather information for trip planning"
@@ -342,43 +524,87 @@ Return ONLY the JSON, no other text."""
                 loggName=inspect.stack()[0]
             )
             
-            # Get coordinates
-            coords = await self.geo_repo.get_coordinates(state["location"])
+            # Coordinates were resolved by the geocode node
+            coords = state.get("coordinates")
             if not coords:
-                return {**state, "weather_info": "Location not found"}
+                return {"weather_info": "Location not found", "reasoning_trace": reasoning_trace}
             
-            # Get weather
-            weather = await self.weather_repo.get_current_weather(
-                coords.lat, 
-                coords.lon
+            # Get weather - whatever is left of the data budget
+            weather = await asyncio.wait_for(
+                self.weather_repo.get_current_weather(coords.lat, coords.lon),
+                timeout=budget
             )
             
             if not weather:
-                return {**state, "weather_info": "Weather data not available"}
+                return {"weather_info": "Weather data not available", "reasoning_trace": reasoning_trace}
             
             # Format weather info
             precip = weather.precipitation_probability if weather.precipitation_probability else 0
             weather_text = f"In {state['location']} it's currently {weather.temperature}°C with a {precip:.1f}% chance of rain."
             
-            return {**state, "weather_info": weather_text, "reasoning_trace": reasoning_trace}
+            return {"weather_info": weather_text, "reasoning_trace": reasoning_trace}
             
+        except TimeoutError:
+            reasoning_trace += await self._skip_for_deadline(state, config, "Weather Agent", "live weather")
+            return {"skipped_data": ["weather"], "reasoning_trace": reasoning_trace}
         except Exception as e:
             logs.define_logger(
                 level=40,
                 message=f"Error fetching weather: {str(e)}",
                 loggName=inspect.stack()[0]
             )
-            return {**state, "weather_info": f"Could not fetch weather: {str(e)}"}
+            return {"weather_info": f"Could not fetch weather: {str(e)}", "reasoning_trace": reasoning_trace}
     
-    async def places_node(self, state: TourismState) -> TourismState:
-        """Fetch tourist attractions for the location"""
+    async def _multi_location_weather(self, state: TourismState, config: RunnableConfig, locations: list[str], budget: float | None) -> dict:
+        """Weather for every stop of a multi-city query in one batched Open-Meteo request"""
+        reasoning_trace = await self._add_reasoning(
+            state,
+            config,
+            agent="Weather Agent",
+            action=f"Fetching current weather for {', '.join(locations)}",
+            reason="Trip covers several places - fetching all of them in a single batched request"
+        )
+        
+        coords_list = state.get("locations_coordinates") or []
+        resolved = [(name, coords) for name, coords in zip(locations, coords_list) if coords]
+        if not resolved:
+            return {"weather_info": "Location not found", "reasoning_trace": reasoning_trace}
+        
+        try:
+            weathers = await asyncio.wait_for(
+                self.weather_repo.get_current_weather_batch([(coords.lat, coords.lon) for _, coords in resolved]),
+                timeout=budget
+            )
+        except TimeoutError:
+            reasoning_trace += await self._skip_for_deadline(state, config, "Weather Agent", "live weather")
+            return {"skipped_data": ["weather"], "reasoning_trace": reasoning_trace}
+        
+        parts = []
+        for (name, _), weather in zip(resolved, weathers):
+            if weather:
+                precip = weather.precipitation_probability if weather.precipitation_probability else 0
+                parts.append(f"In {name} it's currently {weather.temperature}°C with a {precip:.1f}% chance of rain.")
+        
+        if not parts:
+            return {"weather_info": "Weather data not available", "reasoning_trace": reasoning_trace}
+        return {"weather_info": " ".join(parts), "reasoning_trace": reasoning_trace}
+    
+    async def places_node(self, state: TourismState, config: RunnableConfig) -> dict:
+        """Fetch tourist attractions for the location (runs in parallel with weather_node)"""
         if not state.get("location") or not state.get("needs_places"):
-            return state
+            return {"reasoning_trace": []}  # Nothing to add
+        
+        budget = self._data_budget()
+        if budget == 0:
+            reasoning_trace = await self._skip_for_deadline(state, config, "Places Agent", "attraction search")
+            return {"places_info": [], "skipped_data": ["places"], "reasoning_trace": reasoning_trace}
         
+        reasoning_trace = []
         try:
             # Add reasoning
             reasoning_trace = await self._add_reasoning(
                 state,
+                config,
                 agent="Places Agent",
                 action=f"Finding top tourist attractions in {state['location']}",
                 reason="User wants to know about places to visit and things to do"
@@ -390,37 +616,41 @@ Return ONLY the JSON, no other text."""
                 loggName=inspect.stack()[0]
             )
             
-            # Get coordinates
-            coords = await self.geo_repo.get_coordinates(state["location"])
+            # Coordinates were resolved by the geocode node
+            coords = state.get("coordinates")
             if not coords:
-                return {**state, "places_info": []}
+                return {"places_info": [], "reasoning_trace": reasoning_trace}
             
-            # Get places
-            places = await self.places_repo.get_tourist_attractions(
-                coords.lat,
-                coords.lon,
-                limit=5
+            # Get places - whatever is left of the data budget
+            places = await asyncio.wait_for(
+                self.places_repo.get_tourist_attractions(coords.lat, coords.lon, limit=5),
+                timeout=budget
             )
             
             # places is already a list of names
             place_names = places if isinstance(places, list) else []
             
-            return {**state, "places_info": place_names, "reasoning_trace": reasoning_trace}
+            return {"places_info": place_names, "reasoning_trace": reasoning_trace}
             
+        except TimeoutError:
+            reasoning_trace += await self._skip_for_deadline(state, config, "Places Agent", "attraction search")
+            return {"places_info": [], "skipped_data": ["places"], "reasoning_trace": reasoning_trace}
         except Exception as e:
             logs.define_logger(
                 level=40,
                 message=f"Error fetching places: {str(e)}",
                 loggName=inspect.stack()[0]
             )
-            return {**state, "places_info": []}
+            return {"places_info": [], "reasoning_trace": reasoning_trace}
     
-    async def synthesize_node(self, state: TourismState) -> TourismState:
+    async def synthesize_node(self, state: TourismState, config: RunnableConfig) -> dict:
         """Generate the final response using all gathered information"""
+        reasoning_trace = []
         try:
             # Add reasoning
             reasoning_trace = await self._add_reasoning(
                 state,
+                config,
                 agent="Response Generator",
                 action="Generating personalized response",
                 reason="Combining all gathered information into a helpful, formatted response for the user"
@@ -436,12 +666,10 @@ Return ONLY the JSON, no other text."""
             context_parts = []
             
             # Add conversation history for context
-            if state.get('conversation_history') and len(state['conversation_history']) > 0:
+            history_lines = history_context(state.get('conversation_history'), state.get('conversation_summary'))
+            if history_lines:
                 context_parts.append("Previous conversation:")
-                for msg in state['conversation_history'][-4:]:  # Last 4 messages
-                    role = msg.get('role', 'user')
-                    content = msg.get('content', '')[:200]  # Limit length
-                    context_parts.append(f"{role}: {content}")
+                context_parts.extend(history_lines)
                 context_parts.append("")  # Empty line separator
             
             context_parts.append(f"Current query: {state['query']}")
@@ -449,6 +677,9 @@ Return ONLY the JSON, no other text."""
             if state.get("location"):
                 context_parts.append(f"Location: {state['location']}")
             
+            if state.get("locations") and len(state["locations"]) > 1:
+                context_parts.append(f"Trip stops: {', '.join(state['locations'])}")
+            
             if state.get("weather_info"):
                 context_parts.append(f"Weather: {state['weather_info']}")
             
@@ -456,6 +687,11 @@ Return ONLY the JSON, no other text."""
                 places_list = "\n".join([f"- {place}" for place in state["places_info"]])
                 context_parts.append(f"Top attractions:\n{places_list}")
             
+            if state.get("skipped_data"):
+                deadline_stats["degraded_answers"] += 1
+                skipped = " and ".join("live weather" if data == "weather" else "the attraction search" for data in state["skipped_data"])
+                context_parts.append(f"Note: {skipped} could not be fetched in time. Answer with what you know and briefly say so - do not invent current conditions.")
+            
             context = "\n\n".join(context_parts)
             
             # Get query type and data availability
@@ -484,8 +720,8 @@ Return ONLY the JSON, no other text."""
 User Query: {state['query']}
 
 Available Information:
-- Location: {state.get('location', 'Unknown')}
-- Weather: {state.get('weather_info', 'Weather data unavailable')}
+- Location: {', '.join(state.get('locations') or []) or state.get('location', 'Unknown')}
+- Weather: {state.get('weather_info') or 'Weather data unavailable'}
 - Top Attractions:
 {places_list}
 
@@ -498,7 +734,7 @@ Create a STRUCTURED multi-day itinerary following this EXACT format:
 
 ---
 **🌤️ WEATHER OVERVIEW**
-{state.get('weather_info', 'Check local weather before departure')}
+{state.get('weather_info') or 'Check local weather before departure'}
 
 **📍 TOP ATTRACTIONS**
 List the attractions as bullet points, each on its own line.
@@ -616,10 +852,26 @@ Just chat naturally - no formal formatting needed."""
 
                 temperature = 0.8
 
-            response = await ai_client.chat_completion(
-                messages=[{"role": "user", "content": prompt}],
-                temperature=temperature
-            )
+            token_callback = config.get("configurable", {}).get("token_callback")
+            if token_callback:
+                # Forward tokens as they are generated instead of waiting for the whole answer
+                response_parts = []
+                async for delta in ai_client.stream_chat_completion(
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=temperature,
+                    cache_ttl=settings.LLM_CACHE_SYNTHESIS_TTL,
+                    hedge_after=settings.LLM_HEDGE_SYNTHESIS_DELAY
+                ):
+                    response_parts.append(delta)
+                    await token_callback(delta)
+                response = "".join(response_parts)
+            else:
+                response = await ai_client.chat_completion(
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=temperature,
+                    cache_ttl=settings.LLM_CACHE_SYNTHESIS_TTL,
+                    hedge_after=settings.LLM_HEDGE_SYNTHESIS_DELAY
+                )
             
             logs.define_logger(
                 level=20,
@@ -633,9 +885,16 @@ Just chat naturally - no formal formatting needed."""
                     message="AI returned empty response! Check API key and prompt.",
                     loggName=inspect.stack()[0]
                 )
-                return {**state, "final_response": "I apologize, but I couldn't generate a response. Please try again."}
+                return {"final_response": "I apologize, but I couldn't generate a response. Please try again.", "reasoning_trace": reasoning_trace}
             
-            return {**state, "final_response": response.strip(), "reasoning_trace": reasoning_trace}
+            final_response = response.strip()
+            if self._response_cacheable(state) and not state.get("skipped_data"):
+                response_cache.store(state, {
+                    "final_response": final_response,
+                    "weather_info": state.get("weather_info"),
+                    "places_info": state.get("places_info"),
+                })
+            return {"final_response": final_response, "reasoning_trace": reasoning_trace}
             
         except Exception as e:
             logs.define_logger(
@@ -643,12 +902,15 @@ Just chat naturally - no formal formatting needed."""
                 message=f"Error synthesizing response: {str(e)}",
                 loggName=inspect.stack()[0]
             )
-            return {**state, "final_response": "I apologize, but I encountered an error generating your response."}
+            return {"final_response": "I apologize, but I encountered an error generating your response.", "reasoning_trace": reasoning_trace}
     
     # ========== ROUTING LOGIC ==========
     
-    def route_after_analysis(self, state: TourismState) -> Literal["planning", "fetch_data", "synthesize"]:
-        """Determine next step after query analysis"""
+    def route_after_analysis(self, state: TourismState) -> Literal["cached", "planning", "fetch_data", "synthesize"]:
+        """Determine next step after query analysis (and the response cache lookup)"""
+        if state.get("final_response"):
+            return "cached"
+        
         if state.get("error"):
             return "synthesize"
         
@@ -726,7 +988,9 @@ Just chat naturally - no formal formatting needed."""
         
         # Add nodes
         workflow.add_node("analyze", self.analyze_query_node)
+        workflow.add_node("response_cache", self.response_cache_node)
         workflow.add_node("planning", self.planning_node)
+        workflow.add_node("geocode", self.geocode_node)
         workflow.add_node("weather", self.weather_node)
         workflow.add_node("places", self.places_node)
         workflow.add_node("synthesize", self.synthesize_node)
@@ -734,37 +998,47 @@ Just chat naturally - no formal formatting needed."""
         # Set entry point
         workflow.set_entry_point("analyze")
         
+        # A recent answer to the same intent ends the run right after analysis
+        workflow.add_edge("analyze", "response_cache")
+        
         # Add conditional routing after analysis - complex queries go through planning
         workflow.add_conditional_edges(
-            "analyze",
+            "response_cache",
             self.route_after_analysis,
             {
+                "cached": END,  # Served from the response cache
                 "planning": "planning",  # Complex queries need multi-step planning
-                "fetch_data": "weather",  # Simple queries fetch data directly
+                "fetch_data": "geocode",  # Simple queries fetch data directly
                 "synthesize": "synthesize"  # General queries skip data fetching
             }
         )
         
         # After planning, fetch data
-        workflow.add_edge("planning", "weather")
+        workflow.add_edge("planning", "geocode")
+        
+        # Resolve coordinates once, then fan out: weather and places are independent
+        # upstream calls (Open-Meteo / Overpass) so they run as concurrent branches
+        workflow.add_edge("geocode", "weather")
+        workflow.add_edge("geocode", "places")
         
-        # Weather and Places can run in parallel conceptually,
-        # but we chain them here for simplicity
-        workflow.add_edge("weather", "places")
-        workflow.add_edge("places", "synthesize")
+        # Join - synthesize waits for both branches to finish
+        workflow.add_edge(["weather", "places"], "synthesize")
         workflow.add_edge("synthesize", END)
         
         return workflow.compile()
     
     # ========== PUBLIC API ==========
     
-    async def process_query(self, query: str, conversation_history: list[dict] = None) -> dict:
+    async def process_query(self, query: str, conversation_history: list[dict] = None, config: RunnableConfig | None = None,
+                            conversation_summary: str | None = None) -> dict:
         """
         Process a tourism query through the LangGraph workflow
         
         Args:
             query: User's tourism question
             conversation_history: List of previous messages for context
+            config: Optional run config (per-request streaming callbacks live in "configurable")
+            conversation_summary: Rolling summary of turns older than conversation_history
             
         Returns:
             dict with location, weather_info, places_info, and final_response
@@ -774,7 +1048,11 @@ Just chat naturally - no formal formatting needed."""
             initial_state: TourismState = {
                 "query": query,
                 "conversation_history": conversation_history or [],
+                "conversation_summary": conversation_summary,
                 "location": None,
+                "coordinates": None,
+                "locations": None,
+                "locations_coordinates": None,
                 "main_location": None,
                 "needs_weather": False,
                 "needs_places": False,
@@ -786,11 +1064,12 @@ Just chat naturally - no formal formatting needed."""
                 "is_complex_query": False,
                 "execution_plan": None,
                 "travel_tips": None,
+                "skipped_data": [],
                 "reasoning_trace": []
             }
             
             # Run the graph
-            final_state = await self.graph.ainvoke(initial_state)
+            final_state = await self.graph.ainvoke(initial_state, config=config)
             
             # Generate proactive suggestions
             suggestions = self._generate_suggestions(final_state)
@@ -814,7 +1093,8 @@ Just chat naturally - no formal formatting needed."""
             )
             raise
     
-    async def process_query_streaming(self, query: str, conversation_history: list[dict] = None, callback=None) -> dict:
+    async def process_query_streaming(self, query: str, conversation_history: list[dict] = None, callback=None, token_callback=None,
+                                      conversation_summary: str | None = None) -> dict:
         """
         Process query with streaming reasoning updates
         
@@ -822,20 +1102,22 @@ Just chat naturally - no formal formatting needed."""
             query: User's tourism question
             conversation_history: List of previous messages
             callback: Async function to call with each reasoning step
+            token_callback: Async function to call with each text delta of the final answer
+            conversation_summary: Rolling summary of turns older than conversation_history
             
         Returns:
-            Same as process_query but streams reasoning via callback
+            Same as process_query but streams reasoning (and answer tokens) via the callbacks
         """
-        # Set the callback for streaming
-        self.reasoning_callback = callback
-        
-        try:
-            # Process normally - reasoning will stream via callback
-            result = await self.process_query(query, conversation_history)
-            return result
-        finally:
-            # Clear callback after processing
-            self.reasoning_callback = None
+        # Callbacks are scoped to this run through the graph config, not stored on the
+        # shared agent, so overlapping streams each get only their own events
+        config: RunnableConfig = {
+            "configurable": {
+                "reasoning_callback": callback,
+                "token_callback": token_callback
+            }
+        }
+        return await self.process_query(query, conversation_history, config=config,
+                                        conversation_summary=conversation_summary)
 
 
 # Singleton instance
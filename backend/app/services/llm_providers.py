@@ -0,0 +1,356 @@
+"""
+LLM Providers - One class per vendor (OpenAI, Anthropic, Google Gemini) behind a common interface
+Each provider owns its SDK client, circuit breaker and latency stats; AIClient orders them
+into a failover / hedging pool
+"""
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.core.logger import logs
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.latency_stats import ProviderStats
+import inspect
+import asyncio
+import random
+import re
+import time
+
+# Safety settings for Gemini - allow travel-related content
+GEMINI_SAFETY_SETTINGS = [
+    {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"},
+]
+
+
+def rate_limit_cooldown(error: str) -> Optional[float]:
+    """
+    For rate-limit / quota errors, how long the provider asked us to stay away
+    ("retry in 59.92s", else LLM_RATE_LIMIT_COOLDOWN); None for any other error
+    """
+    lower = error.lower()
+    if "429" not in lower and "quota" not in lower and "rate limit" not in lower:
+        return None
+    match = re.search(r"retry in (\d+\.?\d*)", lower)
+    return float(match.group(1)) if match else settings.LLM_RATE_LIMIT_COOLDOWN
+
+
+class LLMProvider(ABC):
+    """Base class - subclasses implement complete() and stream()"""
+
+    name = "base"
+
+    def __init__(self, model: str):
+        self.model = model
+        self.breaker = CircuitBreaker(
+            self.name,
+            failure_threshold=settings.LLM_BREAKER_FAILURE_THRESHOLD,
+            recovery_timeout=settings.LLM_BREAKER_RECOVERY_TIMEOUT
+        )
+        self.stats = ProviderStats(alpha=settings.LLM_STATS_EWMA_ALPHA)
+
+    @abstractmethod
+    async def complete(self, messages: List[Dict[str, str]], temperature: float) -> str:
+        """The whole answer in one call"""
+
+    @abstractmethod
+    def stream(self, messages: List[Dict[str, str]], temperature: float) -> AsyncIterator[str]:
+        """Text deltas as the provider generates them"""
+
+    def available(self) -> bool:
+        """False while the breaker is open (without consuming the half-open probe)"""
+        return self.breaker.retry_after() == 0
+
+    async def complete_with_retries(self, messages: List[Dict[str, str]], temperature: float, max_retries: int,
+                                    deadline: float, blame_timeouts: bool = True) -> str:
+        """
+        Retry transient failures with jittered exponential backoff, all before `deadline`
+        (time.monotonic). A wait that would overrun it - such as a 429 asking us to come back
+        in 60s - fails the call now instead of pinning the user's connection, and while the
+        breaker is open calls fail without reaching the provider
+        blame_timeouts=False: the budget was cut short by the request's deadline, so running
+        out of it says nothing about the provider and is not recorded as a failure
+        """
+        for attempt in range(max_retries):
+            self.breaker.allow()
+            start = time.perf_counter()
+            try:
+                response = await asyncio.wait_for(
+                    self.complete(messages, temperature),
+                    timeout=max(deadline - time.monotonic(), 0.0)
+                )
+            except asyncio.CancelledError:
+                self.breaker.record_cancelled()
+                self.stats.record_censored(time.perf_counter() - start)
+                raise
+            except Exception as e:
+                if not blame_timeouts and isinstance(e, asyncio.TimeoutError) and time.monotonic() >= deadline:
+                    # The request ran out of time, not the provider - keep it out of the breaker
+                    self.breaker.record_cancelled()
+                    self.stats.record_censored(time.perf_counter() - start)
+                    raise TimeoutError(f"{self.name} call cut off by the request deadline") from e
+                self.stats.record(time.perf_counter() - start, success=False)
+                error = str(e) or f"{type(e).__name__}: call exceeded its time budget"
+                cooldown = rate_limit_cooldown(error)
+                self.breaker.record_failure(error, cooldown)
+
+                delay = cooldown if cooldown is not None else min(
+                    settings.LLM_RETRY_BASE_DELAY * 2 ** attempt, settings.LLM_RETRY_MAX_DELAY
+                ) * random.uniform(0.5, 1.0)
+                delay = max(delay, self.breaker.retry_after())
+                remaining = deadline - time.monotonic()
+
+                if attempt == max_retries - 1 or delay >= remaining:
+                    logs.define_logger(
+                        level=40,
+                        message=f"{self.name} call failed after {attempt + 1} attempt(s), not retrying "
+                                f"(next wait {delay:.1f}s, {max(remaining, 0):.1f}s of budget left): {error}",
+                        loggName=inspect.stack()[0]
+                    )
+                    if not str(e):
+                        raise TimeoutError(error) from e
+                    raise
+
+                logs.define_logger(
+                    level=30,
+                    message=f"{self.name} error on attempt {attempt + 1}/{max_retries}: {error}. Retrying in {delay:.1f}s...",
+                    loggName=inspect.stack()[0]
+                )
+                await asyncio.sleep(delay)
+                continue
+
+            self.stats.record(time.perf_counter() - start, success=True)
+            self.breaker.record_success()
+            return response
+        return ""
+
+    def snapshot(self) -> dict:
+        return {"model": self.model, "circuit": self.breaker.stats(), "latency": self.stats.snapshot()}
+
+
+class OpenAIProvider(LLMProvider):
+    name = "openai"
+
+    def __init__(self, api_key: str, model: str):
+        from openai import AsyncOpenAI
+        super().__init__(model)
+        self.client = AsyncOpenAI(api_key=api_key)
+
+    async def complete(self, messages: List[Dict[str, str]], temperature: float) -> str:
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=temperature
+        )
+        content = response.choices[0].message.content
+        logs.define_logger(
+            level=20,
+            message=f"OpenAI response received: {len(content) if content else 0} chars",
+            loggName=inspect.stack()[0]
+        )
+        return content or ""
+
+    async def stream(self, messages: List[Dict[str, str]], temperature: float) -> AsyncIterator[str]:
+        stream = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=temperature,
+            stream=True
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+class AnthropicProvider(LLMProvider):
+    name = "anthropic"
+
+    def __init__(self, api_key: str, model: str):
+        from anthropic import AsyncAnthropic
+        super().__init__(model)
+        self.client = AsyncAnthropic(api_key=api_key)
+
+    def _anthropic_messages(self, messages: List[Dict[str, str]]) -> Tuple[Optional[str], List[Dict[str, str]]]:
+        """Anthropic uses different format - extract system message if present"""
+        system_message = None
+        anthropic_messages = []
+
+        for msg in messages:
+            if msg["role"] == "system":
+                system_message = msg["content"]
+            else:
+                anthropic_messages.append({
+                    "role": msg["role"],
+                    "content": msg["content"]
+                })
+        return system_message, anthropic_messages
+
+    async def complete(self, messages: List[Dict[str, str]], temperature: float) -> str:
+        system_message, anthropic_messages = self._anthropic_messages(messages)
+        response = await self.client.messages.create(
+            model=self.model,
+            max_tokens=1024,
+            temperature=temperature,
+            system=system_message if system_message else "",
+            messages=anthropic_messages
+        )
+        return response.content[0].text
+
+    async def stream(self, messages: List[Dict[str, str]], temperature: float) -> AsyncIterator[str]:
+        system_message, anthropic_messages = self._anthropic_messages(messages)
+        stream = await self.client.messages.create(
+            model=self.model,
+            max_tokens=1024,
+            temperature=temperature,
+            system=system_message if system_message else "",
+            messages=anthropic_messages,
+            stream=True
+        )
+        async for event in stream:
+            if event.type == "content_block_delta" and getattr(event.delta, "text", None):
+                yield event.delta.text
+
+
+class GeminiProvider(LLMProvider):
+    name = "gemini"
+
+    def __init__(self, api_key: str, model: str):
+        import google.generativeai as genai
+        super().__init__(model)
+        genai.configure(api_key=api_key)
+        self.genai = genai
+        # Built once and reused - the model object is stateless between calls
+        self.gemini_model = genai.GenerativeModel(model, safety_settings=GEMINI_SAFETY_SETTINGS)
+
+    def _gemini_prompt(self, messages: List[Dict[str, str]]) -> str:
+        """Convert messages to a simple prompt for Gemini"""
+        prompt_parts = []
+
+        for msg in messages:
+            role = msg["role"]
+            content = msg["content"]
+            if role == "system":
+                prompt_parts.append(f"Instructions: {content}")
+            elif role == "user":
+                prompt_parts.append(f"User: {content}")
+            elif role == "assistant":
+                prompt_parts.append(f"Assistant: {content}")
+
+        return "\n\n".join(prompt_parts)
+
+    async def complete(self, messages: List[Dict[str, str]], temperature: float) -> str:
+        full_prompt = self._gemini_prompt(messages)
+
+        logs.define_logger(
+            level=20,
+            message=f"Gemini request - prompt length: {len(full_prompt)} chars",
+            loggName=inspect.stack()[0]
+        )
+
+        # Async API - the blocking generate_content would stall the event loop
+        # (and every other request/SSE stream on this worker) for the whole call
+        response = await self.gemini_model.generate_content_async(
+            full_prompt,
+            generation_config=self.genai.types.GenerationConfig(
+                temperature=temperature,
+                max_output_tokens=2048,  # Increased for longer responses
+            )
+        )
+
+        # Handle complex responses - try multiple extraction methods
+        text = ""
+
+        # Method 1: Try simple .text accessor
+        try:
+            text = response.text
+        except:
+            # Method 2: Extract from parts directly
+            try:
+                if response.candidates and len(response.candidates) > 0:
+                    parts = response.candidates[0].content.parts
+                    text = "".join(part.text for part in parts if hasattr(part, 'text'))
+            except Exception as parts_error:
+                logs.define_logger(
+                    level=40,
+                    message=f"Failed to extract from parts: {str(parts_error)}",
+                    loggName=inspect.stack()[0]
+                )
+
+        if text:
+            logs.define_logger(
+                level=20,
+                message=f"Gemini response extracted - length: {len(text)} chars",
+                loggName=inspect.stack()[0]
+            )
+            return text
+        logs.define_logger(
+            level=40,
+            message="Gemini returned empty response after all extraction attempts",
+            loggName=inspect.stack()[0]
+        )
+        return ""
+
+    async def stream(self, messages: List[Dict[str, str]], temperature: float) -> AsyncIterator[str]:
+        response = await self.gemini_model.generate_content_async(
+            self._gemini_prompt(messages),
+            generation_config=self.genai.types.GenerationConfig(
+                temperature=temperature,
+                max_output_tokens=2048,
+            ),
+            stream=True
+        )
+        async for chunk in response:
+            try:
+                text = chunk.text
+            except Exception:
+                # Chunks without text parts (e.g. safety/finish metadata)
+                continue
+            if text:
+                yield text
+
+
+# Provider name -> (class, API key setting, model setting)
+PROVIDER_CLASSES = {
+    "openai": (OpenAIProvider, "OPENAI_API_KEY", "OPENAI_MODEL"),
+    "anthropic": (AnthropicProvider, "ANTHROPIC_API_KEY", "ANTHROPIC_MODEL"),
+    "gemini": (GeminiProvider, "GEMINI_API_KEY", "GEMINI_MODEL"),
+}
+
+
+def build_provider_pool() -> List[LLMProvider]:
+    """
+    AI_PROVIDER first (its key is required), then every other provider in AI_PROVIDER_ORDER
+    whose key is configured. Backups whose SDK fails to load are skipped with a warning
+    """
+    primary = settings.AI_PROVIDER.lower()
+    if primary not in PROVIDER_CLASSES:
+        raise ValueError(f"Unsupported AI provider: {primary}")
+    order = [primary] + [
+        name.strip().lower() for name in settings.AI_PROVIDER_ORDER.split(",")
+        if name.strip() and name.strip().lower() != primary
+    ]
+
+    pool: List[LLMProvider] = []
+    for name in order:
+        if name not in PROVIDER_CLASSES or any(provider.name == name for provider in pool):
+            continue
+        provider_class, key_setting, model_setting = PROVIDER_CLASSES[name]
+        api_key = getattr(settings, key_setting)
+        if not api_key:
+            if name == primary:
+                raise ValueError(f"{key_setting} not set in environment variables")
+            continue
+        try:
+            pool.append(provider_class(api_key, getattr(settings, model_setting)))
+        except Exception as e:
+            if name == primary:
+                raise
+            logs.define_logger(
+                level=30,
+                message=f"Skipping backup LLM provider {name}: {str(e)}",
+                loggName=inspect.stack()[0]
+            )
+        if not settings.LLM_FAILOVER_ENABLED:
+            break
+    return pool
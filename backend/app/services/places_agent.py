@@ -5,6 +5,7 @@ Uses external Places API and AI to provide natural language responses
 from typing import Optional, List
 from app.repos.geo_repo import GeoRepo
 from app.repos.places_repo import PlacesRepo
+from app.models.location_models import LocationData
 from app.services.ai_client import ai_client
 from app.core.logger import logs
 import inspect
@@ -15,14 +16,16 @@ class PlacesAgent:
         self.places_repo = PlacesRepo()
         self.name = "Places Agent"
     
-    async def get_tourist_places(self, place_name: str, limit: int = 5) -> Optional[List[str]]:
+    async def get_tourist_places(self, place_name: str, limit: int = 5, location: Optional[LocationData] = None) -> Optional[List[str]]:
         """
         Fetch tourist attractions for a given place
         Returns a list of place names
+        Pass an already resolved location to skip geocoding
         """
         try:
-            # Step 1: Get coordinates for the place
-            location = await self.geo_repo.get_coordinates(place_name)
+            # Step 1: Get coordinates for the place (unless the caller already has them)
+            if location is None:
+                location = await self.geo_repo.get_coordinates(place_name)
             if not location:
                 return None
             
@@ -41,11 +44,11 @@ class PlacesAgent:
             )
             return None
     
-    async def process_query(self, place_name: str, user_query: str) -> Optional[str]:
+    async def process_query(self, place_name: str, user_query: str, location: Optional[LocationData] = None) -> Optional[str]:
         """
         Process a places-related query with AI assistance
         """
-        places = await self.get_tourist_places(place_name)
+        places = await self.get_tourist_places(place_name, location=location)
         
         if not places:
             return None
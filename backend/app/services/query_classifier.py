@@ -0,0 +1,153 @@
+"""
+Query Classifier - Deterministic fast path for query analysis
+Classifies unambiguous queries ("weather in Tokyo", "best places in Paris") from keyword
+rules plus the offline gazetteer, so the analysis LLM call is only spent on hard queries
+"""
+from typing import Optional
+from app.core.config import settings
+from app.repos.gazetteer_repo import gazetteer
+import re
+import time
+
+# Keyword rules shared with analyze_query_node (which applies them on top of any analysis)
+PLACES_KEYWORDS = ['place', 'attraction', 'visit', 'spot', 'thing', 'see', 'do', 'tourist', 'sights', 'landmark']
+INFO_REQUEST_PATTERNS = [
+    'tell me about', 'tell me more about', 'what can you tell me about',
+    'information about', 'details about', 'describe',
+    'what is', 'what are the details', 'learn about', 'know about',
+    'opening hours', 'entry fee', 'entrance fee', 'admission',
+    'what makes it special', 'visitor tips', 'history of'
+]
+COMPLEX_KEYWORDS = ['plan', 'trip', 'weekend', 'itinerary', 'schedule', 'visit for', 'days in', 'day in', 'spend', 'vacation', 'travel to']
+MULTI_DAY_KEYWORDS = ['days', 'day', 'weekend', 'week']
+WEATHER_KEYWORDS = ['weather', 'temperature', 'forecast', 'rain', 'raining', 'rainy', 'climate', 'sunny', 'humid', 'snow', 'degrees', 'hot', 'cold']
+
+# Whole-word versions for the fast path - substring matching is fine as a hint on top of
+# the LLM, but too loose to skip it ("do" in "London", "see" in "Chelsea")
+_PLACES_WORDS = re.compile(
+    r"\b(places?|attractions?|visit|spots?|things? to do|see|tourist|sights?|sightseeing|landmarks?|must-see)\b"
+)
+_WEATHER_WORDS = re.compile(r"\b(" + "|".join(WEATHER_KEYWORDS) + r")\b")
+_COMPLEX_WORDS = re.compile(r"\b(" + "|".join(re.escape(k) for k in COMPLEX_KEYWORDS) + r")\b")
+# Follow-ups that lean on earlier turns ("what about there?") need the LLM and the history
+_CONTEXT_REFERENCES = re.compile(r"\b(there|it|that|this|those|these|same|here)\b")
+# What follows a place name: an optional comma, then the next word
+_AFTER_PLACE = re.compile(r"\s*(,)?\s*([\w'-]+)?")
+
+
+def refers_to_context(query: str) -> bool:
+    """Whether the query leans on earlier turns ("what about there?")"""
+    return bool(_CONTEXT_REFERENCES.search(query.lower()))
+
+
+class QueryClassifier:
+    """Rule-based analysis that either answers confidently or defers to the LLM (returns None)"""
+
+    def __init__(self):
+        self.classified = 0
+        self.fast_path_hits = 0
+        self.llm_fallbacks = 0
+        self.fast_path_seconds = 0.0
+        self.llm_seconds = 0.0
+
+    def classify(self, query: str, conversation_history: Optional[list] = None) -> Optional[dict]:
+        """
+        Analysis in the same shape the LLM returns, or None when confidence is low
+        The caller records the LLM fallback latency through record_llm
+        """
+        if not settings.QUERY_FAST_PATH_ENABLED:
+            return None
+
+        start = time.perf_counter()
+        analysis = self._classify(query, conversation_history)
+        self.fast_path_seconds += time.perf_counter() - start
+        self.classified += 1
+        if analysis is not None:
+            self.fast_path_hits += 1
+        return analysis
+
+    def record_llm(self, seconds: float) -> None:
+        self.llm_fallbacks += 1
+        self.llm_seconds += seconds
+
+    def _classify(self, query: str, conversation_history: Optional[list]) -> Optional[dict]:
+        text = query.strip()
+        lower = text.lower()
+        if not text or len(text.split()) > settings.QUERY_FAST_PATH_MAX_WORDS:
+            return None
+        if conversation_history and refers_to_context(text):
+            return None
+
+        matches = gazetteer.find_in_text(text)
+        if not matches:
+            return None
+        # "Eiffel Tower in Paris" - attraction vs city is a judgement call, leave it to the LLM
+        if len(matches) > 1 and not all(match.is_city for match in matches):
+            return None
+        # "Paris or Rome for a weekend?" is a choice between places, not a trip to both
+        if len(matches) > 1 and re.search(r"\bor\b", lower):
+            return None
+        # "Paris, Texas" / "London Ontario" - a qualifier the gazetteer did not read may mean another place
+        if any(self._unread_qualifier(text, match, matches) for match in matches):
+            return None
+
+        primary = matches[0]
+        others = [match.location.name for match in matches[1:]]
+
+        wants_weather = bool(_WEATHER_WORDS.search(lower))
+        wants_places = bool(_PLACES_WORDS.search(lower))
+        is_complex = bool(_COMPLEX_WORDS.search(lower))
+
+        if any(pattern in lower for pattern in INFO_REQUEST_PATTERNS):
+            # "What is the temperature ... and what places ..." mixes signals - defer
+            if others or wants_weather or wants_places or is_complex:
+                return None
+            return {
+                "location": primary.location.name,
+                "is_city": primary.is_city,
+                "other_locations": [],
+                "needs_weather": False,
+                "needs_places": False,
+                "query_type": "simple"
+            }
+
+        if not (wants_weather or wants_places or is_complex):
+            return None
+
+        if wants_weather and not wants_places and not is_complex:
+            query_type = "weather_focused"
+        else:
+            query_type = "detailed_places"
+
+        return {
+            "location": primary.location.name,
+            "is_city": primary.is_city,
+            "other_locations": others,
+            "needs_weather": wants_weather or is_complex,
+            "needs_places": wants_places or is_complex,
+            "query_type": query_type
+        }
+
+    @staticmethod
+    def _unread_qualifier(text: str, match, matches: list) -> bool:
+        """A comma, or a capitalised word, after the place that does not start another matched place"""
+        after = _AFTER_PLACE.match(text, match.end)
+        comma, word = after.group(1), after.group(2)
+        if word is None or any(other.start == after.start(2) for other in matches):
+            return False
+        return bool(comma) or word[0].isupper()
+
+    def stats(self) -> dict:
+        total = self.classified
+        return {
+            "classified": total,
+            "fast_path_hits": self.fast_path_hits,
+            "llm_fallbacks": self.llm_fallbacks,
+            "hit_rate": round(self.fast_path_hits / total, 3) if total else 0.0,
+            "fast_path_avg_ms": round(self.fast_path_seconds / total * 1000, 3) if total else 0.0,
+            "llm_avg_ms": round(self.llm_seconds / self.llm_fallbacks * 1000, 1) if self.llm_fallbacks else 0.0,
+        }
+
+
+# Singleton instance
+query_classifier = QueryClassifier()
@@ -0,0 +1,163 @@
+"""
+Response Cache - Reuse recent final answers for questions with the same analysed intent
+Entries are keyed on the normalised location, query type and data needs; within a key the
+query wording is compared with a character-trigram similarity (offline, no embeddings), so
+"top things to do in Rome" and "what should I see in Rome?" share one answer while
+"things to do in Rome with kids" gets its own.
+"""
+from typing import Optional
+from app.core.cache import TTLCache, normalize_key
+from app.core.config import settings
+from app.repos.weather_repo import weather_stamp
+from app.services.query_classifier import PLACES_KEYWORDS, WEATHER_KEYWORDS, COMPLEX_KEYWORDS
+import re
+import time
+
+# Words that carry no intent beyond what the key already holds - dropped before comparing
+FILLER_WORDS = {
+    'a', 'an', 'the', 'in', 'at', 'to', 'of', 'for', 'on', 'and', 'or', 'with', 'near', 'around', 'about',
+    'i', 'me', 'my', 'we', 'us', 'you', 'can', 'could', 'should', 'would', 'will', 'must', 'please',
+    'what', 'which', 'where', 'whats', "what's", 'how', 'is', 'are', 'be', 'there', 'it', 'its', "it's",
+    'tell', 'show', 'give', 'list', 'suggest', 'recommend', 'some', 'any', 'top', 'best', 'good', 'great',
+    'popular', 'famous', 'places', 'attractions', 'things', 'sights', 'sightseeing', 'spots', 'landmarks',
+    'go', 'like', 'now', 'today', 'currently', 'right', 'current', 'weather', 'going', 'help', 'want', 'need', 'know',
+}
+# Intent keywords beyond the key's needs: "hot" vs "cold" or "rain" vs "snow" is what the question
+# asks, and a weekend is not any other trip - these stay in the signature
+INTENT_DETAIL_WORDS = {'rain', 'raining', 'rainy', 'sunny', 'humid', 'snow', 'degrees', 'hot', 'cold', 'weekend'}
+FILLER_WORDS.update(word for word in PLACES_KEYWORDS + WEATHER_KEYWORDS + COMPLEX_KEYWORDS
+                    if word not in INTENT_DETAIL_WORDS)
+
+_WORD = re.compile(r"[\w'-]+")
+# "3 days" and "5 days" differ by one trigram but want different answers - numbers must match exactly
+NUMBER_WORDS = {
+    'one': '1', 'two': '2', 'three': '3', 'four': '4', 'five': '5',
+    'six': '6', 'seven': '7', 'eight': '8', 'nine': '9', 'ten': '10',
+}
+
+# Shared counters for the metrics endpoint
+response_cache_stats = {"hits": 0, "misses": 0, "stores": 0, "weather_invalidations": 0}
+
+
+def query_trigrams(query: str, location: Optional[str] = None) -> frozenset:
+    """
+    Character trigrams of the query's remaining words once filler and the location are dropped
+    Numbers become whole "#n" tokens, which similarity requires to match exactly
+    """
+    text = re.sub(r"\b(a|one) week\b", "7 days", normalize_key(query))
+    ignored = set(normalize_key(location or "").split())
+    grams = set()
+    for word in _WORD.findall(text):
+        word = NUMBER_WORDS.get(word, word)
+        if word.isdigit():
+            grams.add(f"#{word}")
+        elif word not in FILLER_WORDS and word not in ignored:
+            padded = f"  {word} "
+            grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+def similarity(a: frozenset, b: frozenset) -> float:
+    """Dice coefficient of two trigram sets (two queries with nothing left to compare are equal)"""
+    if {g for g in a if g[0] == "#"} != {g for g in b if g[0] == "#"}:
+        return 0.0
+    if not a and not b:
+        return 1.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+class ResponseCache:
+    """Intent key -> recent answers, each remembering its query trigrams and weather snapshot"""
+
+    def __init__(self, memory: Optional[TTLCache] = None):
+        self.memory = memory if memory is not None else TTLCache(max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES)
+
+    @staticmethod
+    def intent_key(state: dict) -> Optional[str]:
+        """None when the analysis found no location - nothing stable to key on"""
+        location = state.get("location")
+        if not location:
+            return None
+        stops = ",".join(normalize_key(stop) for stop in (state.get("locations") or [])[1:])
+        if state.get("is_complex_query"):
+            # planning_node switches on weather and places later in the run
+            needs = "plan"
+        else:
+            needs = ("w" if state.get("needs_weather") else "-") + ("p" if state.get("needs_places") else "-")
+        return "|".join([normalize_key(location), stops, state.get("query_type") or "simple", needs])
+
+    def lookup(self, state: dict) -> Optional[dict]:
+        """A fresh cached answer for this analysed query, or None"""
+        if not settings.RESPONSE_CACHE_ENABLED:
+            return None
+        key = self.intent_key(state)
+        variants = self.memory.get_entry(key) if key else None
+        if variants is None:
+            response_cache_stats["misses"] += 1
+            return None
+
+        grams = query_trigrams(state["query"], state.get("location"))
+        now = time.time()
+        best, best_score = None, 0.0
+        for variant in list(variants.value):
+            if now - variant["stored_at"] > settings.RESPONSE_CACHE_TTL:
+                variants.value.remove(variant)
+                continue
+            if not self._weather_unchanged(variant):
+                # Open-Meteo published new conditions since this answer was written
+                variants.value.remove(variant)
+                response_cache_stats["weather_invalidations"] += 1
+                continue
+            score = similarity(grams, variant["grams"])
+            if score >= settings.RESPONSE_CACHE_SIMILARITY and score > best_score:
+                best, best_score = variant, score
+
+        if best is None:
+            response_cache_stats["misses"] += 1
+            return None
+        response_cache_stats["hits"] += 1
+        return best["result"]
+
+    def store(self, state: dict, result: dict) -> None:
+        """Remember a final answer; weather answers only while their weather entry is fresh"""
+        if not settings.RESPONSE_CACHE_ENABLED:
+            return
+        key = self.intent_key(state)
+        if not key:
+            return
+
+        weather = None
+        if result.get("weather_info"):
+            coordinates = [c for c in (state.get("locations_coordinates") or [state.get("coordinates")]) if c]
+            stamps = [weather_stamp(c.lat, c.lon) for c in coordinates]
+            if not coordinates or None in stamps:
+                return
+            weather = [[c.lat, c.lon, stamp] for c, stamp in zip(coordinates, stamps)]
+
+        entry = self.memory.get_entry(key)
+        variants = entry.value if entry is not None else []
+        grams = query_trigrams(state["query"], state.get("location"))
+        # A newer answer to the same wording replaces the old one
+        variants = [v for v in variants if similarity(grams, v["grams"]) < 1.0]
+        variants.append({"grams": grams, "stored_at": time.time(), "weather": weather, "result": result})
+        del variants[:-settings.RESPONSE_CACHE_VARIANTS_PER_KEY]
+        self.memory.set(key, variants, settings.RESPONSE_CACHE_TTL)
+        response_cache_stats["stores"] += 1
+
+    @staticmethod
+    def _weather_unchanged(variant: dict) -> bool:
+        if not variant["weather"]:
+            return True
+        return all(weather_stamp(lat, lon) == stamp for lat, lon, stamp in variant["weather"])
+
+    def stats(self) -> dict:
+        hits, misses = response_cache_stats["hits"], response_cache_stats["misses"]
+        return {
+            **response_cache_stats,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+            "keys": len(self.memory),
+        }
+
+
+# Singleton instance
+response_cache = ResponseCache()
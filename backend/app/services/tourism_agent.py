@@ -88,15 +88,15 @@ class TourismAgent:
             if not location:
                 return f"I don't know if {place_name} exists or I couldn't find information about it. Please check the spelling or try a different location."
             
-            # Step 3: Gather information from child agents
+            # Step 3: Gather information from child agents (reusing the resolved location)
             weather_info = None
             places_info = None
             
             if wants_weather:
-                weather_info = await self.weather_agent.get_weather_info(place_name)
+                weather_info = await self.weather_agent.get_weather_info(place_name, location)
             
             if wants_places:
-                places = await self.places_agent.get_tourist_places(place_name)
+                places = await self.places_agent.get_tourist_places(place_name, location=location)
                 if places:
                     places_info = "\n".join(places)
             
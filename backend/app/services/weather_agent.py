@@ -5,6 +5,7 @@ Uses external Weather API and AI to provide natural language responses
 from typing import Optional
 from app.repos.geo_repo import GeoRepo
 from app.repos.weather_repo import WeatherRepo
+from app.models.location_models import LocationData
 from app.services.ai_client import ai_client
 from app.core.logger import logs
 import inspect
@@ -15,14 +16,16 @@ class WeatherAgent:
         self.weather_repo = WeatherRepo()
         self.name = "Weather Agent"
     
-    async def get_weather_info(self, place_name: str) -> Optional[str]:
+    async def get_weather_info(self, place_name: str, location: Optional[LocationData] = None) -> Optional[str]:
         """
         Fetch weather information for a given place
         Returns a natural language description of the weather
+        Pass an already resolved location to skip geocoding
         """
         try:
-            # Step 1: Get coordinates for the place
-            location = await self.geo_repo.get_coordinates(place_name)
+            # Step 1: Get coordinates for the place (unless the caller already has them)
+            if location is None:
+                location = await self.geo_repo.get_coordinates(place_name)
             if not location:
                 return None
             
@@ -43,11 +46,11 @@ class WeatherAgent:
             )
             return None
     
-    async def process_query(self, place_name: str, user_query: str) -> Optional[str]:
+    async def process_query(self, place_name: str, user_query: str, location: Optional[LocationData] = None) -> Optional[str]:
         """
         Process a weather-related query with AI assistance
         """
-        weather_info = await self.get_weather_info(place_name)
+        weather_info = await self.get_weather_info(place_name, location)
         
         if not weather_info:
             return None
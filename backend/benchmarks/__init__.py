@@ -0,0 +1,8 @@
+"""
+Standalone performance benchmarks (run with python -m benchmarks.<name> from the backend directory)
+Persistent cache tiers go to a throwaway file so benchmark runs never touch the real cache database
+"""
+import os
+import tempfile
+
+os.environ.setdefault("CACHE_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="tourism-bench-"), "cache.sqlite3"))
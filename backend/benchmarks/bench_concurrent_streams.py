@@ -0,0 +1,98 @@
+"""
+Concurrency check: many simultaneous /chat/stream sessions sharing the one agent instance
+Each session asks a uniquely tagged question; a stand-in Gemini model answers with that tag
+after a random delay, so runs interleave. Every stream must receive exactly its own
+reasoning steps, answer deltas and final response.
+
+Usage (from the backend directory):
+    AI_PROVIDER=gemini GEMINI_API_KEY=dummy python -m benchmarks.bench_concurrent_streams --sessions 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.main import app
+from app.services.ai_client import ai_client
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeStream:
+    def __init__(self, parts):
+        self.parts = parts
+
+    async def __aiter__(self):
+        for part in self.parts:
+            await asyncio.sleep(random.uniform(0.001, 0.02))
+            yield FakeResponse(part)
+
+
+class TaggedModel:
+    """Echoes the session tag found in the prompt, with jittered latency"""
+
+    async def generate_content_async(self, prompt, generation_config=None, stream=False):
+        tag = re.search(r"session-\d+", prompt).group()
+        await asyncio.sleep(random.uniform(0.005, 0.05))
+        if "Analyze this tourism query" in prompt:
+            return FakeResponse(json.dumps({"location": None, "needs_weather": False, "needs_places": False}))
+        if stream:
+            return FakeStream([f"Answer ", f"for ", tag])
+        return FakeResponse(f"Answer for {tag}")
+
+
+async def run_session(client: httpx.AsyncClient, index: int) -> tuple[bool, float]:
+    tag = f"session-{index}"
+    start = time.perf_counter()
+    response = await client.post("/api/tourism/chat/stream", json={"query": f"Hello from {tag}"})
+    events = [json.loads(chunk[len("data: "):]) for chunk in response.text.split("\n\n") if chunk.startswith("data: ")]
+    elapsed = time.perf_counter() - start
+
+    reasoning = [e for e in events if e["type"] == "reasoning"]
+    deltas = "".join(e["data"] for e in events if e["type"] == "delta")
+    complete = [e for e in events if e["type"] == "complete"]
+    ok = (
+        len(reasoning) == 2
+        and deltas == f"Answer for {tag}"
+        and len(complete) == 1
+        and complete[0]["data"]["final_response"] == f"Answer for {tag}"
+    )
+    return ok, elapsed
+
+
+async def main(sessions: int) -> None:
+    if ai_client.provider != "gemini":
+        sys.exit("Set AI_PROVIDER=gemini (and any GEMINI_API_KEY) to run this check")
+    ai_client.primary.gemini_model = TaggedModel()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        start = time.perf_counter()
+        results = await asyncio.gather(*(run_session(client, i) for i in range(sessions)))
+        wall = time.perf_counter() - start
+
+    correct = sum(1 for ok, _ in results if ok)
+    latencies = sorted(elapsed for _, elapsed in results)
+    print(f"{sessions} concurrent streaming sessions on one agent instance, wall {wall * 1000:.0f} ms")
+    print(f"sessions with exactly their own events: {correct}/{sessions}")
+    print(f"latency p50 {latencies[len(latencies) // 2] * 1000:.0f} ms, max {latencies[-1] * 1000:.0f} ms")
+    if correct != sessions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.sessions))
@@ -0,0 +1,100 @@
+"""
+Benchmark: chat turns while Overpass is overloaded - per-call timeouts vs a request deadline
+Runs full graph turns ("places and weather in <city>") with a stand-in Gemini model, a local
+Open-Meteo stub and an Overpass stub that answers only after a long stall. Without a deadline
+each turn waits on Overpass for as long as it stalls (up to its 30 s read timeout); with one,
+the places fetch is cut off when only the synthesis reserve is left and the turn answers with
+the weather alone. A healthy phase first checks that the deadline changes nothing when the
+upstreams are fast. The time scale is compressed (default 8 s deadline, 3 s reserve).
+
+Usage (from the backend directory):
+    AI_PROVIDER=gemini GEMINI_API_KEY=dummy LLM_CACHE_DISK_ENABLED=false \\
+        python -m benchmarks.bench_deadline --turns 8 --stall-s 15 --deadline 8 --reserve 3
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_server import StubServer
+from benchmarks.bench_overpass_stream import overpass_payload
+from benchmarks.bench_weather_batch import open_meteo_handler
+from app.core.config import settings
+from app.core.deadline import deadline_stats, request_deadline
+from app.core.rate_limit import rate_limiters
+from app.repos.weather_repo import weather_cache
+from app.services.ai_client import ai_client
+from app.services.langgraph_tourism import langgraph_tourism_agent
+
+CITIES = ["Paris", "Tokyo", "Rome", "Berlin", "Madrid", "Vienna", "Prague", "Lisbon", "London", "Amsterdam"]
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeModel:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def generate_content_async(self, prompt, generation_config=None, stream=False):
+        await asyncio.sleep(self.latency)
+        return FakeResponse("Here is your answer.")
+
+
+async def turn(city: str, deadline: float) -> tuple:
+    start = time.perf_counter()
+    with request_deadline(deadline):
+        result = await langgraph_tourism_agent.process_query(f"What places should I visit in {city} and what's the weather?")
+    return time.perf_counter() - start, result
+
+
+async def run(turns: int, deadline: float) -> tuple:
+    weather_cache.clear()
+    deadline_stats.update(deadline_exceeded=0, skipped_fetches=0, degraded_answers=0)
+    outcomes = await asyncio.gather(*(turn(CITIES[i % len(CITIES)], deadline) for i in range(turns)))
+    latencies = sorted(elapsed for elapsed, _ in outcomes)
+    answered = sum(1 for _, result in outcomes if result["final_response"] == "Here is your answer.")
+    with_weather = sum(1 for _, result in outcomes if result.get("weather_info"))
+    return latencies, answered, with_weather, deadline_stats["degraded_answers"]
+
+
+async def main(turns: int, stall: float, deadline: float, reserve: float, llm_ms: float) -> None:
+    if ai_client.provider != "gemini":
+        sys.exit("Set AI_PROVIDER=gemini (and any GEMINI_API_KEY) to run this benchmark")
+    ai_client.primary.gemini_model = FakeModel(llm_ms / 1000)
+    settings.LLM_CACHE_ENABLED = False
+    settings.RESPONSE_CACHE_ENABLED = False
+    settings.PLACES_CACHE_ENABLED = False
+    settings.REQUEST_SYNTHESIS_RESERVE = reserve
+    rate_limiters["overpass"].max_wait = stall * 2  # Measure the deadline, not the rate limiter's own cut-off
+
+    async with StubServer(open_meteo_handler, response_delay=0.15) as weather_stub, \
+            StubServer(lambda method, path, body: (200, overpass_payload(50)), response_delay=0.3) as places_stub:
+        settings.OPEN_METEO_URL = f"{weather_stub.url}/v1/forecast"
+        settings.OVERPASS_URL = f"{places_stub.url}/api/interpreter"
+
+        print(f"{turns} concurrent turns, stand-in LLM {llm_ms:.0f} ms, Open-Meteo 150 ms; "
+              f"deadline {deadline:.0f}s with {settings.REQUEST_SYNTHESIS_RESERVE:.1f}s synthesis reserve")
+        print(f"{'overpass':<12}{'mode':<14}{'p50 s':>7}{'max s':>7}{'answered':>10}{'with weather':>14}{'degraded':>10}")
+        for phase, delay in (("healthy", 0.3), (f"stall {stall:.0f}s", stall)):
+            places_stub.response_delay = delay
+            for label, budget in (("no deadline", 0.0), ("deadline", deadline)):
+                latencies, answered, with_weather, degraded = await run(turns, budget)
+                print(f"{phase:<12}{label:<14}{latencies[len(latencies) // 2]:>7.2f}{latencies[-1]:>7.2f}"
+                      f"{answered:>7}/{turns:<2}{with_weather:>11}/{turns:<2}{degraded:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=8)
+    parser.add_argument("--stall-s", type=float, default=15.0)
+    parser.add_argument("--deadline", type=float, default=8.0)
+    parser.add_argument("--reserve", type=float, default=3.0)
+    parser.add_argument("--llm-ms", type=float, default=500.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.turns, args.stall_s, args.deadline, args.reserve, args.llm_ms))
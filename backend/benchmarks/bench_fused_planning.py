@@ -0,0 +1,87 @@
+"""
+Benchmark: separate analysis + planning LLM calls vs the fused analysis-and-plan call
+Runs an itinerary query through the full graph with a stand-in LLM of fixed latency and
+counts the LLM round-trips on the critical path. The rule-based fast path is disabled so
+the analysis LLM call always happens.
+
+Usage (from the backend directory):
+    AI_PROVIDER=gemini GEMINI_API_KEY=dummy python -m benchmarks.bench_fused_planning --llm-ms 1500
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.services import langgraph_tourism
+from app.services.langgraph_tourism import langgraph_tourism_agent
+
+QUERY = "Help me plan 3 days in Barcelona"
+PLAN = {
+    "execution_plan": ["Check weather", "Find top attractions", "Create itinerary"],
+    "travel_tips": "Book the Sagrada Familia online in advance."
+}
+
+
+class FakeLLM:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = []
+
+    async def chat_completion(self, messages, temperature=0.7, **kwargs) -> str:
+        prompt = messages[0]["content"]
+        await asyncio.sleep(self.latency)
+        if prompt.startswith("Analyze this tourism query"):
+            self.calls.append("analysis")
+            analysis = {"location": "Barcelona", "is_city": True, "needs_weather": True,
+                        "needs_places": True, "query_type": "detailed_places"}
+            if "execution_plan" in prompt:
+                analysis.update(PLAN)
+            return json.dumps(analysis)
+        if prompt.startswith("You are a travel planning AI"):
+            self.calls.append("planning")
+            return json.dumps(PLAN)
+        self.calls.append("synthesis")
+        return "Day 1 ..."
+
+
+async def run(fused: bool, llm: FakeLLM) -> float:
+    settings.FUSED_ANALYSIS_PLANNING_ENABLED = fused
+    llm.calls.clear()
+    start = time.perf_counter()
+    result = await langgraph_tourism_agent.process_query(QUERY)
+    assert result["final_response"] == "Day 1 ..."
+    return time.perf_counter() - start
+
+
+async def main(llm_ms: float) -> None:
+    settings.QUERY_FAST_PATH_ENABLED = False
+    llm = FakeLLM(llm_ms / 1000)
+    langgraph_tourism.ai_client = llm
+
+    # Keep the data nodes out of the measurement
+    async def no_weather(lat, lon):
+        return None
+
+    async def no_places(lat, lon, limit=5):
+        return []
+
+    langgraph_tourism_agent.weather_repo.get_current_weather = no_weather
+    langgraph_tourism_agent.places_repo.get_tourist_attractions = no_places
+
+    print(f'"{QUERY}", stand-in LLM latency {llm_ms:.0f} ms')
+    print(f"{'mode':<26}{'wall ms':>10}  llm calls")
+    for label, fused in (("analysis, then planning", False), ("fused analysis + plan", True)):
+        elapsed = await run(fused, llm)
+        print(f"{label:<26}{elapsed * 1000:>10.0f}  {', '.join(llm.calls)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--llm-ms", type=float, default=1500.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.llm_ms))
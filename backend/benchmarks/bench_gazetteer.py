@@ -0,0 +1,124 @@
+"""
+Benchmark: offline gazetteer lookups vs a Nominatim round trip
+Builds the gazetteer from the bundled sample and from a synthetic GeoNames-format file of
+--places rows (the size of cities15000), then times exact, alias and prefix lookups and
+free-text scanning, and compares GeoRepo answering from the gazetteer with GeoRepo going to a
+local Nominatim stub (with a simulated --latency-ms) for the same names.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_gazetteer --places 25000 --latency-ms 150
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_server import StubServer, json_handler
+from app.core.cache import TieredCache, TTLCache
+from app.core.config import settings
+from app.core.http_clients import HttpClientPool
+from app.repos.gazetteer_repo import Gazetteer, gazetteer as default_gazetteer
+from app.repos.geo_repo import GeoRepo
+
+NAMES = ["Paris", "Tokyo", "Bangalore", "New York", "Rome", "Eiffel Tower", "Barcelona", "Sydney"]
+PREFIXES = ["Par", "To", "Ban", "New", "San", "Ber", "Ca", "Lo"]
+TEXTS = [
+    "What's the weather in Paris and what can I see there?",
+    "I'm going to Bengaluru, what is the temperature there, and what are the places I can visit?",
+    "Plan a 3 day trip to Rome and Florence",
+    "Is the Eiffel Tower open today?",
+]
+NOMINATIM_PAYLOAD = [{"display_name": "Paris, France", "lat": "48.8566", "lon": "2.3522"}]
+SYLLABLES = ["ba", "ra", "lo", "ne", "sa", "to", "ki", "mu", "da", "ve", "po", "li", "an", "or", "es"]
+
+
+def synthetic_file(places: int) -> str:
+    """GeoNames-layout TSV with `places` random towns (two aliases each) plus the bundled sample"""
+    rng = random.Random(7)
+    path = os.path.join(tempfile.mkdtemp(), "synthetic.tsv")
+    with open(path, "w", encoding="utf-8") as out, open(settings.GAZETTEER_PATH, encoding="utf-8") as sample:
+        out.write(sample.read())
+        for i in range(places):
+            name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).title()
+            aliases = f"{name}burg,{name} City"
+            cols = [str(100000 + i), name, name, aliases, f"{rng.uniform(-60, 70):.5f}",
+                    f"{rng.uniform(-180, 180):.5f}", "P", "PPL", "XX", "", "", "", "", "",
+                    str(rng.randint(15000, 2000000)), "", "", "UTC", "2024-01-01"]
+            out.write("\t".join(cols) + "\n")
+    return path
+
+
+def per_call_us(fn, args: list, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for arg in args:
+            fn(arg)
+    return (time.perf_counter() - start) / (repeat * len(args)) * 1e6
+
+
+def measure(label: str, path: str, repeat: int) -> None:
+    tracemalloc.start()
+    probe = Gazetteer(path)
+    probe.load()
+    index_kb = tracemalloc.get_traced_memory()[0] / 1024
+    tracemalloc.stop()
+    del probe
+    start = time.perf_counter()
+    gazetteer = Gazetteer(path)
+    gazetteer.load()
+    load_ms = (time.perf_counter() - start) * 1000
+
+    exact = per_call_us(gazetteer.lookup, NAMES, repeat)
+    prefix = per_call_us(gazetteer.search_prefix, PREFIXES, repeat)
+    text = per_call_us(gazetteer.find_in_text, TEXTS, max(1, repeat // 10))
+    print(f"{label:<22}{len(gazetteer.names):>8}{len(gazetteer.keys):>8}{load_ms:>9.0f}{index_kb:>10.0f}"
+          f"{exact:>9.1f}{prefix:>10.1f}{text:>9.1f}")
+    if label == "bundled sample":
+        for prefix_text in PREFIXES[:4]:
+            print(f"{'':<22}prefix {prefix_text!r}: {', '.join(loc.name for loc in gazetteer.search_prefix(prefix_text, 3))}")
+
+
+async def geocode_round_trips(latency_ms: float) -> None:
+    """The same names through GeoRepo: gazetteer hit vs Nominatim stub (cache off, gazetteer off)"""
+    settings.GEO_CACHE_ENABLED = False
+    settings.GEO_HEDGE_ENABLED = False
+    settings.RATE_LIMIT_ENABLED = False  # Nominatim's 1 request/s would dominate
+    async with StubServer(json_handler(NOMINATIM_PAYLOAD), response_delay=latency_ms / 1000) as stub:
+        settings.NOMINATIM_URL = f"{stub.url}/search"
+        pool = HttpClientPool()
+        await pool.start()
+        repo = GeoRepo(http=pool, cache=TieredCache(TTLCache(16)))
+        default_gazetteer.load()  # Loaded at startup in the app
+        print(f"\nGeoRepo.get_coordinates for {len(NAMES)} names, Nominatim stub {latency_ms:.0f} ms")
+        for label, enabled in (("nominatim", False), ("gazetteer", True)):
+            settings.GAZETTEER_ENABLED = enabled
+            stub.reset_counters()
+            start = time.perf_counter()
+            for name in NAMES:
+                await repo.get_coordinates(name)
+            elapsed = time.perf_counter() - start
+            print(f"{label:<12}{elapsed / len(NAMES) * 1000:>10.3f} ms/lookup{stub.requests:>6} requests")
+        await pool.aclose()
+
+
+async def main(places: int, latency_ms: float, repeat: int) -> None:
+    print(f"{'index':<22}{'places':>8}{'names':>8}{'load ms':>9}{'index KB':>10}"
+          f"{'exact us':>9}{'prefix us':>10}{'text us':>9}")
+    measure("bundled sample", settings.GAZETTEER_PATH, repeat)
+    measure(f"synthetic {places}", synthetic_file(places), repeat)
+    await geocode_round_trips(latency_ms)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--places", type=int, default=25000)
+    parser.add_argument("--latency-ms", type=float, default=150.0)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.places, args.latency_ms, args.repeat))
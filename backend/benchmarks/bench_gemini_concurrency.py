@@ -0,0 +1,92 @@
+"""
+Benchmark: N parallel Gemini calls - blocking generate_content vs generate_content_async
+Swaps AIClient's GenerativeModel for a stand-in with a fixed latency, so no API key or
+network is needed. Also measures event-loop lag (how late a 10 ms heartbeat fires), which
+is what every other request and SSE stream on the worker experiences.
+
+Usage (from the backend directory):
+    AI_PROVIDER=gemini GEMINI_API_KEY=dummy python -m benchmarks.bench_gemini_concurrency --calls 8 --latency-ms 300
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.ai_client import ai_client
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    """Same call surface as genai.GenerativeModel, with a simulated model latency"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def generate_content(self, prompt, **kwargs) -> FakeResponse:
+        time.sleep(self.latency)
+        return FakeResponse("ok")
+
+    async def generate_content_async(self, prompt, **kwargs) -> FakeResponse:
+        await asyncio.sleep(self.latency)
+        return FakeResponse("ok")
+
+
+async def blocking_call(model: FakeGenerativeModel, messages) -> str:
+    """Old behaviour: synchronous SDK call inside a coroutine"""
+    return model.generate_content(messages[0]["content"]).text
+
+
+async def async_call(model: FakeGenerativeModel, messages) -> str:
+    """New behaviour: AIClient's Gemini path"""
+    return await ai_client.primary.complete(messages, temperature=0.3)
+
+
+async def heartbeat(stop: asyncio.Event, lags: list) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        lags.append(time.perf_counter() - start - 0.01)
+
+
+async def measure(runner, model: FakeGenerativeModel, calls: int):
+    messages = [{"role": "user", "content": "Plan a day in Paris"}]
+    stop, lags = asyncio.Event(), []
+    beat = asyncio.create_task(heartbeat(stop, lags))
+    await asyncio.sleep(0.02)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(runner(model, messages) for _ in range(calls)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await beat
+    return elapsed, max(lags) if lags else 0.0, sum(1 for r in results if r)
+
+
+async def main(calls: int, latency_ms: float) -> None:
+    if ai_client.provider != "gemini":
+        sys.exit("Set AI_PROVIDER=gemini (and any GEMINI_API_KEY) to run this benchmark")
+    model = FakeGenerativeModel(latency_ms / 1000)
+    ai_client.primary.gemini_model = model
+
+    results = {}
+    for label, runner in (("blocking generate_content", blocking_call), ("generate_content_async", async_call)):
+        results[label] = await measure(runner, model, calls)
+
+    print(f"{calls} parallel Gemini calls, simulated model latency {latency_ms:.0f} ms")
+    print(f"{'mode':<28}{'wall ms':>10}{'max loop lag ms':>18}{'ok':>5}")
+    for label, (elapsed, lag, ok) in results.items():
+        print(f"{label:<28}{elapsed * 1000:>10.1f}{lag * 1000:>18.1f}{ok:>5}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.latency_ms))
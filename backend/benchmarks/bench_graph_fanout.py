@@ -0,0 +1,119 @@
+"""
+Benchmark: end-to-end /api/tourism/chat latency with weather and places chained
+(previous wiring) vs fanned out as parallel branches (current wiring)
+
+The LLM and upstream repos are replaced by stubs with fixed latencies so the numbers
+only reflect graph orchestration.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_graph_fanout --requests 20 --weather-ms 300 --places-ms 800
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("AI_PROVIDER", "gemini")
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+import httpx
+from langgraph.graph import StateGraph, END
+
+from app.main import app
+from app.models.location_models import LocationData
+from app.models.weather_models import WeatherData
+from app.services import langgraph_tourism
+from app.services.langgraph_tourism import TourismState
+
+LLM_DELAY = 0.05
+
+
+def install_stubs(agent, weather_delay: float, places_delay: float) -> None:
+    async def chat_completion(messages, temperature=0.7, **kwargs):
+        await asyncio.sleep(LLM_DELAY)
+        if "Analyze this tourism query" in messages[-1]["content"]:
+            return json.dumps({"location": "Paris", "is_city": True, "needs_weather": True,
+                               "needs_places": True, "query_type": "detailed_places"})
+        return "Paris is lovely."
+
+    async def get_coordinates(place_name):
+        return LocationData(name=place_name, lat=48.8566, lon=2.3522)
+
+    async def get_current_weather(lat, lon):
+        await asyncio.sleep(weather_delay)
+        return WeatherData(temperature=18.0, precipitation_probability=20.0)
+
+    async def get_tourist_attractions(lat, lon, limit=5):
+        await asyncio.sleep(places_delay)
+        return ["Eiffel Tower", "Louvre Museum"]
+
+    langgraph_tourism.ai_client.chat_completion = chat_completion
+    agent.geo_repo.get_coordinates = get_coordinates
+    agent.weather_repo.get_current_weather = get_current_weather
+    agent.places_repo.get_tourist_attractions = get_tourist_attractions
+
+
+def build_chained_graph(agent):
+    """The previous wiring: geocode -> weather -> places -> synthesize"""
+    workflow = StateGraph(TourismState)
+    workflow.add_node("analyze", agent.analyze_query_node)
+    workflow.add_node("planning", agent.planning_node)
+    workflow.add_node("geocode", agent.geocode_node)
+    workflow.add_node("weather", agent.weather_node)
+    workflow.add_node("places", agent.places_node)
+    workflow.add_node("synthesize", agent.synthesize_node)
+    workflow.set_entry_point("analyze")
+    workflow.add_conditional_edges(
+        "analyze",
+        agent.route_after_analysis,
+        {"planning": "planning", "fetch_data": "geocode", "synthesize": "synthesize"},
+    )
+    workflow.add_edge("planning", "geocode")
+    workflow.add_edge("geocode", "weather")
+    workflow.add_edge("weather", "places")
+    workflow.add_edge("places", "synthesize")
+    workflow.add_edge("synthesize", END)
+    return workflow.compile()
+
+
+async def measure(requests: int) -> list[float]:
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(requests):
+            start = time.perf_counter()
+            response = await client.post("/api/tourism/chat", json={"query": "What to see in Paris and what's the weather?"})
+            response.raise_for_status()
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+async def main(requests: int, weather_ms: float, places_ms: float) -> None:
+    agent = langgraph_tourism.langgraph_tourism_agent
+    install_stubs(agent, weather_ms / 1000, places_ms / 1000)
+    parallel_graph = agent.graph
+
+    results = {}
+    agent.graph = build_chained_graph(agent)
+    results["chained"] = await measure(requests)
+    agent.graph = parallel_graph
+    results["fan-out"] = await measure(requests)
+
+    print(f"{requests} requests, weather {weather_ms:.0f} ms, places {places_ms:.0f} ms, LLM {LLM_DELAY * 1000:.0f} ms/call")
+    print(f"{'wiring':<10}{'p50 ms':>10}{'p95 ms':>10}")
+    for label, latencies in results.items():
+        p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+        print(f"{label:<10}{statistics.median(latencies):>10.1f}{p95:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--weather-ms", type=float, default=300.0)
+    parser.add_argument("--places-ms", type=float, default=800.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.weather_ms, args.places_ms))
@@ -0,0 +1,87 @@
+"""
+Benchmark: fresh AsyncClient per call vs the shared keep-alive pool
+Runs GeoRepo/WeatherRepo against a local stub server that charges a simulated
+handshake cost for every new connection.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_http_pool --calls 50 --handshake-ms 40
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_server import StubServer, json_handler
+from app.core.config import settings
+from app.core.http_clients import HttpClientPool
+from app.repos.geo_repo import GeoRepo
+from app.repos.weather_repo import WeatherRepo
+
+NOMINATIM_PAYLOAD = [{"display_name": "Paris, France", "lat": "48.8566", "lon": "2.3522"}]
+WEATHER_PAYLOAD = {
+    "current_weather": {"temperature": 18.0, "windspeed": 9.0, "weathercode": 1},
+    "hourly": {"precipitation_probability": [10, 20, 30, 10, 0, 0]},
+}
+
+
+async def run_fresh(calls: int) -> float:
+    """Old behaviour: every call builds (and tears down) its own client"""
+    start = time.perf_counter()
+    for _ in range(calls):
+        pool = HttpClientPool()
+        await GeoRepo(http=pool).get_coordinates("Paris")
+        await WeatherRepo(http=pool).get_current_weather(48.8566, 2.3522)
+        await pool.aclose()
+    return time.perf_counter() - start
+
+
+async def run_pooled(calls: int) -> float:
+    """New behaviour: one pool for the process lifetime"""
+    pool = HttpClientPool()
+    await pool.start()
+    geo, weather = GeoRepo(http=pool), WeatherRepo(http=pool)
+    start = time.perf_counter()
+    for _ in range(calls):
+        await geo.get_coordinates("Paris")
+        await weather.get_current_weather(48.8566, 2.3522)
+    elapsed = time.perf_counter() - start
+    await pool.aclose()
+    return elapsed
+
+
+async def main(calls: int, handshake_ms: float) -> None:
+    # Every turn must reach the stubs - caches and the gazetteer would answer all but the first
+    settings.GEO_CACHE_ENABLED = False
+    settings.WEATHER_CACHE_ENABLED = False
+    settings.GAZETTEER_ENABLED = False
+    settings.GEO_HEDGE_ENABLED = False
+    settings.RATE_LIMIT_ENABLED = False  # Nominatim's 1 request/s would dominate
+    delay = handshake_ms / 1000
+    async with StubServer(json_handler(NOMINATIM_PAYLOAD), handshake_delay=delay) as geo_stub, \
+            StubServer(json_handler(WEATHER_PAYLOAD), handshake_delay=delay) as weather_stub:
+        settings.NOMINATIM_URL = f"{geo_stub.url}/search"
+        settings.OPEN_METEO_URL = f"{weather_stub.url}/v1/forecast"
+
+        results = {}
+        for label, runner in (("fresh client per call", run_fresh), ("shared pool", run_pooled)):
+            geo_stub.reset_counters()
+            weather_stub.reset_counters()
+            elapsed = await runner(calls)
+            results[label] = (elapsed, geo_stub.connections + weather_stub.connections,
+                              geo_stub.requests + weather_stub.requests)
+
+    print(f"{calls} chat turns (geocode + weather), simulated handshake {handshake_ms:.0f} ms")
+    print(f"{'mode':<24}{'total s':>10}{'ms/turn':>10}{'connections':>14}{'requests':>10}")
+    for label, (elapsed, connections, requests) in results.items():
+        print(f"{label:<24}{elapsed:>10.3f}{elapsed / calls * 1000:>10.1f}{connections:>14}{requests:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--handshake-ms", type=float, default=40.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.handshake_ms))
@@ -0,0 +1,112 @@
+"""
+Benchmark: a throttled LLM provider - fixed-sleep retries vs circuit breaker + budgeted retries
+A stand-in Gemini model answers 429 "Please retry in Ns" for the first N seconds, then
+recovers. User requests arrive steadily throughout. The old retry loop sleeps for the
+provider's hint inside each request; the new one fails fast once the breaker has opened,
+and resumes with one half-open probe after the cooldown. The time scale is compressed
+(a 6 s hint with a 3 s budget stands in for the usual 60 s hint and 30 s budget).
+
+Usage (from the backend directory):
+    AI_PROVIDER=gemini GEMINI_API_KEY=dummy LLM_CACHE_DISK_ENABLED=false \\
+        python -m benchmarks.bench_llm_breaker --requests 20 --throttle-s 6
+"""
+import argparse
+import asyncio
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.config import settings
+from app.services.ai_client import ai_client
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class ThrottledModel:
+    """429 with a retry hint until `recovers_at`, then normal answers after a short latency"""
+
+    def __init__(self, throttle: float):
+        self.throttle = throttle
+        self.recovers_at = 0.0
+        self.calls = 0
+
+    async def generate_content_async(self, prompt, generation_config=None, stream=False):
+        self.calls += 1
+        remaining = self.recovers_at - time.monotonic()
+        if remaining > 0:
+            raise Exception(f"429 Resource has been exhausted. Please retry in {self.throttle:.1f}s")
+        await asyncio.sleep(0.05)
+        return FakeResponse("ok")
+
+
+async def fixed_sleep_retries(messages, max_retries: int = 3) -> str:
+    """Old behaviour: sleep for the provider's hint (or 2**attempt) inside the request"""
+    for attempt in range(max_retries):
+        try:
+            return await ai_client.primary.complete(messages, 0.7)
+        except Exception as e:
+            error = str(e).lower()
+            if attempt == max_retries - 1:
+                raise
+            match = re.search(r"retry in (\d+\.?\d*)", error)
+            await asyncio.sleep(float(match.group(1)) if "429" in error and match else 2 ** attempt)
+
+
+async def breaker_retries(messages) -> str:
+    """New behaviour: AIClient.chat_completion"""
+    return await ai_client.chat_completion(messages, temperature=0.7)
+
+
+async def run(policy, model: ThrottledModel, requests: int, spacing: float) -> tuple:
+    ai_client.primary.breaker = CircuitBreaker(
+        "gemini", settings.LLM_BREAKER_FAILURE_THRESHOLD, settings.LLM_BREAKER_RECOVERY_TIMEOUT
+    )
+    model.calls = 0
+    model.recovers_at = time.monotonic() + model.throttle
+
+    async def one(index: int) -> tuple:
+        await asyncio.sleep(index * spacing)
+        start = time.monotonic()
+        try:
+            await policy([{"role": "user", "content": f"question {index}"}])
+            ok = True
+        except Exception:
+            ok = False
+        return ok, time.monotonic() - start
+
+    results = await asyncio.gather(*(one(i) for i in range(requests)))
+    latencies = sorted(elapsed for _, elapsed in results)
+    return sum(1 for ok, _ in results if ok), latencies, model.calls
+
+
+async def main(requests: int, throttle: float) -> None:
+    if ai_client.provider != "gemini":
+        sys.exit("Set AI_PROVIDER=gemini (and any GEMINI_API_KEY) to run this benchmark")
+    model = ThrottledModel(throttle)
+    ai_client.primary.gemini_model = model
+    settings.LLM_CACHE_ENABLED = False
+    settings.LLM_CALL_BUDGET = throttle / 2  # Same ratio as a 60 s hint against the default 30 s budget
+    spacing = throttle * 2 / requests  # Arrivals spread over twice the throttled window
+
+    print(f"{requests} requests over {throttle * 2:.0f}s; provider throttled for the first {throttle:.0f}s "
+          f"(retry hint {throttle:.0f}s, call budget {settings.LLM_CALL_BUDGET:.0f}s)")
+    print(f"{'policy':<30}{'answered':>10}{'p50 s':>8}{'max s':>8}{'provider calls':>16}")
+    for label, policy in (("fixed sleeps (old)", fixed_sleep_retries), ("breaker + budget", breaker_retries)):
+        ok, latencies, calls = await run(policy, model, requests, spacing)
+        print(f"{label:<30}{ok:>7}/{requests:<2}{latencies[len(latencies) // 2]:>8.2f}{latencies[-1]:>8.2f}{calls:>16}")
+    print(f"breaker: {ai_client.primary.breaker.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--throttle-s", type=float, default=6.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.throttle_s))
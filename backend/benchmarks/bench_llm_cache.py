@@ -0,0 +1,103 @@
+"""
+Benchmark: repeated suggestion clicks with and without the LLM completion cache
+Replays a stream of chat turns drawn from the proactive-suggestion queries through the full
+graph, with a stand-in Gemini model of fixed latency, and reports LLM calls, cache hit rate,
+estimated tokens saved and wall time.
+
+Usage (from the backend directory):
+    AI_PROVIDER=gemini GEMINI_API_KEY=dummy LLM_CACHE_DISK_ENABLED=false \\
+        python -m benchmarks.bench_llm_cache --turns 40 --llm-ms 400
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.services.ai_client import ai_client, llm_cache, llm_cache_stats
+from app.services.langgraph_tourism import langgraph_tourism_agent
+
+# What _generate_suggestions offers after a Paris / Tokyo answer
+SUGGESTIONS = [
+    "What's the weather in Paris?",
+    "What places should I visit in Paris?",
+    "Help me plan 3 days in Paris",
+    "What's the weather in Tokyo?",
+    "What places should I visit in Tokyo?",
+    "Help me plan 3 days in Tokyo",
+]
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeModel:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    async def generate_content_async(self, prompt, generation_config=None, stream=False):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if "You are a travel planning AI" in prompt:
+            return FakeResponse(json.dumps({"execution_plan": ["Check weather", "Plan days"], "travel_tips": "Walk."}))
+        return FakeResponse("Here is your answer.")
+
+
+async def replay(turns: list, enabled: bool, synthesis_ttl, model: FakeModel) -> tuple:
+    settings.LLM_CACHE_ENABLED = enabled
+    settings.LLM_CACHE_SYNTHESIS_TTL = synthesis_ttl
+    llm_cache.memory.clear()
+    llm_cache_stats.update(hits=0, misses=0, stores=0, tokens_saved_estimate=0)
+    model.calls = 0
+    start = time.perf_counter()
+    for query in turns:
+        await langgraph_tourism_agent.process_query(query)
+    return time.perf_counter() - start, model.calls, dict(llm_cache_stats)
+
+
+async def main(turns: int, llm_ms: float) -> None:
+    if ai_client.provider != "gemini":
+        sys.exit("Set AI_PROVIDER=gemini (and any GEMINI_API_KEY) to run this benchmark")
+    model = FakeModel(llm_ms / 1000)
+    ai_client.primary.gemini_model = model
+
+    # Keep the data nodes out of the measurement
+    async def no_weather(lat, lon):
+        return None
+
+    async def no_places(lat, lon, limit=5):
+        return []
+
+    langgraph_tourism_agent.weather_repo.get_current_weather = no_weather
+    langgraph_tourism_agent.places_repo.get_tourist_attractions = no_places
+
+    random.seed(7)
+    sequence = [random.choice(SUGGESTIONS) for _ in range(turns)]
+
+    print(f"{turns} turns over {len(SUGGESTIONS)} suggestion queries, stand-in LLM latency {llm_ms:.0f} ms")
+    print(f"{'mode':<26}{'wall s':>9}{'llm calls':>11}{'hits':>7}{'misses':>8}{'tokens saved':>14}")
+    modes = (
+        ("no cache", False, None),
+        ("llm cache (defaults)", True, None),
+        ("llm cache + answers 15m", True, 900),
+    )
+    for label, enabled, synthesis_ttl in modes:
+        elapsed, calls, stats = await replay(sequence, enabled, synthesis_ttl, model)
+        print(f"{label:<26}{elapsed:>9.2f}{calls:>11}{stats['hits']:>7}{stats['misses']:>8}"
+              f"{stats['tokens_saved_estimate']:>14}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--llm-ms", type=float, default=400.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.turns, args.llm_ms))
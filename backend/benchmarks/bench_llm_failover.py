@@ -0,0 +1,101 @@
+"""
+Benchmark: one LLM vendor having a slow day - single provider vs failover vs hedged requests
+Uses local stub providers (no SDKs or keys). The primary usually answers in ~400 ms but
+stalls for several seconds on a fraction of calls; the backup is steadier but slower on
+average. A second scenario rate-limits the primary outright, so its breaker trips and
+calls move to the backup without waiting.
+
+Usage (from the backend directory):
+    AI_PROVIDER=gemini GEMINI_API_KEY=dummy LLM_CACHE_DISK_ENABLED=false \\
+        python -m benchmarks.bench_llm_failover --calls 200 --stall-rate 0.1
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.services.ai_client import AIClient
+from app.services.llm_providers import LLMProvider
+
+
+class StubProvider(LLMProvider):
+    """Answers after `base` seconds (+/-20%); stalls for `stall` seconds with probability `stall_rate`"""
+
+    def __init__(self, name: str, base: float, stall: float = 0.0, stall_rate: float = 0.0, throttled: bool = False):
+        self.name = name
+        super().__init__(model=f"{name}-stub")
+        self.base, self.stall, self.stall_rate, self.throttled = base, stall, stall_rate, throttled
+        self.calls = 0
+
+    async def complete(self, messages, temperature):
+        self.calls += 1
+        if self.throttled:
+            raise Exception("429 Too Many Requests. Please retry in 30s")
+        delay = self.stall if random.random() < self.stall_rate else self.base * random.uniform(0.8, 1.2)
+        await asyncio.sleep(delay)
+        return f"answer from {self.name}"
+
+    async def stream(self, messages, temperature):
+        yield await self.complete(messages, temperature)
+
+
+def percentile(values: list, pct: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+
+async def run(client: AIClient, calls: int) -> list:
+    async def one(index: int) -> float:
+        await asyncio.sleep(index * 0.01)  # Steady arrivals
+        start = time.perf_counter()
+        await client.chat_completion([{"role": "user", "content": f"q{index}"}], temperature=0.7, hedge_after=1.0)
+        return time.perf_counter() - start
+
+    return sorted(await asyncio.gather(*(one(i) for i in range(calls))))
+
+
+async def main(calls: int, stall_rate: float) -> None:
+    settings.LLM_CACHE_ENABLED = False
+    random.seed(5)
+
+    def pool(throttled: bool = False) -> list:
+        return [
+            StubProvider("primary", base=0.4, stall=6.0, stall_rate=stall_rate, throttled=throttled),
+            StubProvider("backup", base=0.7),
+        ]
+
+    print(f"{calls} calls; primary ~400 ms with {stall_rate:.0%} stalls of 6 s, backup ~700 ms; hedge after 1.0 s")
+    print(f"{'mode':<28}{'p50 ms':>8}{'p95 ms':>8}{'p99 ms':>8}{'hedges':>8}{'failovers':>11}{'backup wins':>13}")
+    modes = (
+        ("primary only", lambda: AIClient(providers=pool()[:1]), True),
+        ("failover, no hedging", lambda: AIClient(providers=pool()), False),
+        ("failover + hedging", lambda: AIClient(providers=pool()), True),
+        ("primary rate-limited", lambda: AIClient(providers=pool(throttled=True)), True),
+    )
+    for label, build, hedging in modes:
+        settings.LLM_HEDGE_ENABLED = hedging
+        client = build()
+        try:
+            latencies = await run(client, calls)
+        except Exception as e:
+            print(f"{label:<28}failed: {e}")
+            continue
+        print(f"{label:<28}{percentile(latencies, 0.5) * 1000:>8.0f}{percentile(latencies, 0.95) * 1000:>8.0f}"
+              f"{percentile(latencies, 0.99) * 1000:>8.0f}{client.hedges:>8}{client.failovers:>11}"
+              f"{client.wins.get('backup', 0):>13}")
+        if label == "primary rate-limited":
+            primary = client.providers[0]
+            print(f"  primary breaker {primary.breaker.state}, provider calls {primary.calls}, "
+                  f"rejected by breaker {primary.breaker.rejected}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--stall-rate", type=float, default=0.1)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.stall_rate))
@@ -0,0 +1,112 @@
+"""
+Benchmark: buffered Overpass parse (response.json()) vs streaming, early-terminating parse
+Serves a large synthetic Overpass response from a local stub server that trickles the body
+out in chunks, and measures time-to-result, bytes read and Python heap peak for both paths.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_overpass_stream --elements 20000 --chunk-kb 16 --chunk-ms 2
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_server import StubServer
+from app.core.config import settings
+from app.core.http_clients import HttpClientPool
+from app.repos.places_repo import PlacesRepo
+
+
+def overpass_payload(elements: int) -> bytes:
+    """Overpass-shaped response with many tagged nodes around Paris"""
+    rows = []
+    for i in range(elements):
+        rows.append({
+            "type": "node",
+            "id": 1000000 + i,
+            "lat": 48.8566 + (i % 200) * 0.0005,
+            "lon": 2.3522 + (i // 200) * 0.0005,
+            "tags": {
+                "name": f"Attraction {i}",
+                "name:en": f"Attraction {i}",
+                "tourism": "attraction",
+                "description": "Synthetic point of interest " * 4,
+                "wikidata": f"Q{500000 + i}",
+            },
+        })
+    return json.dumps({
+        "version": 0.6,
+        "generator": "Overpass API (stub)",
+        "osm3s": {"timestamp_osm_base": "2024-01-01T00:00:00Z"},
+        "elements": rows,
+    }).encode()
+
+
+async def run_buffered(pool: HttpClientPool, limit: int) -> list:
+    """Old behaviour: wait for the whole body, decode it, then pick the first names"""
+    response = await pool.client("overpass").post(settings.OVERPASS_URL, content="query")
+    response.raise_for_status()
+    data = response.json()
+    places, seen_names = [], set()
+    for element in data.get("elements", []):
+        name = element.get("tags", {}).get("name:en") or element.get("tags", {}).get("name")
+        if name and name not in seen_names:
+            places.append(name)
+            seen_names.add(name)
+            if len(places) >= limit:
+                break
+    return places
+
+
+async def run_streamed(pool: HttpClientPool, limit: int) -> list:
+    """New behaviour: parse elements as they arrive and close the connection once enough are found"""
+    return await PlacesRepo(http=pool)._fetch_around(48.8566, 2.3522, limit)
+
+
+async def measure(stub: StubServer, runner, limit: int):
+    pool = HttpClientPool()
+    stub.reset_counters()
+    tracemalloc.start()
+    start = time.perf_counter()
+    places = await runner(pool, limit)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    await pool.aclose()
+    # Let the server notice the closed connection before reading its counter
+    await asyncio.sleep(0.05)
+    return elapsed, stub.bytes_sent, peak, len(places)
+
+
+async def main(elements: int, chunk_kb: int, chunk_ms: float, limit: int) -> None:
+    payload = overpass_payload(elements)
+
+    def handle(method, path, body):
+        return 200, payload
+
+    async with StubServer(handle, chunk_size=chunk_kb * 1024, chunk_delay=chunk_ms / 1000) as stub:
+        settings.OVERPASS_URL = f"{stub.url}/api/interpreter"
+        results = {}
+        for label, runner in (("buffered .json()", run_buffered), ("streamed, early stop", run_streamed)):
+            results[label] = await measure(stub, runner, limit)
+
+    print(f"Overpass response: {elements} elements, {len(payload) / 1e6:.1f} MB, "
+          f"{chunk_kb} KB chunks every {chunk_ms:.0f} ms, limit {limit}")
+    print(f"{'mode':<24}{'ms':>10}{'KB sent':>12}{'heap peak KB':>15}{'places':>8}")
+    for label, (elapsed, sent, peak, count) in results.items():
+        print(f"{label:<24}{elapsed * 1000:>10.1f}{sent / 1024:>12.0f}{peak / 1024:>15.0f}{count:>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--elements", type=int, default=20000)
+    parser.add_argument("--chunk-kb", type=int, default=16)
+    parser.add_argument("--chunk-ms", type=float, default=2.0)
+    parser.add_argument("--limit", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.elements, args.chunk_kb, args.chunk_ms, args.limit))
@@ -0,0 +1,64 @@
+"""
+Benchmark: rule-based fast path vs LLM for query analysis
+Runs a set of representative chat queries through the classifier and reports how many are
+answered without an LLM call, and how long the fast path takes per query.
+
+Usage (from the backend directory):
+    AI_PROVIDER=gemini GEMINI_API_KEY=dummy python -m benchmarks.bench_query_fast_path
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.repos.gazetteer_repo import gazetteer
+from app.services.query_classifier import QueryClassifier
+
+QUERIES = [
+    "Weather in Tokyo?",
+    "What's the temperature in Bangalore right now?",
+    "Best places in Paris?",
+    "Top attractions in Rome",
+    "Things to do in NYC",
+    "Is it raining in London?",
+    "Tell me about the Eiffel Tower",
+    "What is the history of the Colosseum?",
+    "Plan my Bali trip",
+    "Help me plan 3 days in Barcelona",
+    "Plan 5 days across Rome, Florence and Venice",
+    "I'm going to Bengaluru, what is the temperature there, and what are the places I can visit?",
+    "Where should I go for my honeymoon?",
+    "Somewhere warm in December with good food",
+    "What about there?",
+    "Tell me about the Eiffel Tower in Paris",
+    "Paris",
+    "Recommend a quiet beach town in Portugal",
+]
+# What a typical analysis LLM round-trip costs in production (for the saving estimate)
+LLM_ANALYSIS_MS = 900
+
+
+def main() -> None:
+    gazetteer.load()
+    classifier = QueryClassifier()
+    rows = []
+    for query in QUERIES:
+        start = time.perf_counter()
+        analysis = classifier.classify(query)
+        rows.append((query, analysis, (time.perf_counter() - start) * 1e6))
+
+    print(f"{'query':<60}{'fast path':>12}{'us':>8}")
+    for query, analysis, micros in rows:
+        verdict = analysis["query_type"] if analysis else "-> LLM"
+        print(f"{query[:58]:<60}{verdict:>12}{micros:>8.0f}")
+
+    stats = classifier.stats()
+    hits = stats["fast_path_hits"]
+    print(f"\nfast-path hit rate {hits}/{len(QUERIES)} ({hits / len(QUERIES):.0%}), "
+          f"avg {stats['fast_path_avg_ms'] * 1000:.0f} us per query")
+    print(f"estimated LLM time saved at {LLM_ANALYSIS_MS} ms per analysis call: {hits * LLM_ANALYSIS_MS} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Load test: a burst of distinct geocodes against policy-enforcing Nominatim / Photon stubs
+The stubs answer 429 whenever requests arrive faster than their policy allows (Nominatim
+1/s, Photon 5/s, both token buckets). Without the client-side limiter the burst is mostly
+turned into 429s and failed lookups; with it, callers queue fairly, overflow goes to the
+backup geocoder and the burst is smoothed into successes.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_rate_limit --places 15 --latency-ms 80
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_server import StubServer
+from app.core.cache import TieredCache, TTLCache
+from app.core.config import settings
+from app.core.http_clients import HttpClientPool
+from app.core.latency_stats import ProviderStats
+from app.core.rate_limit import rate_limiters
+from app.repos.geo_repo import GeoRepo
+
+
+class PolicyHandler:
+    """Token-bucket policy on the server side: over-limit requests get 429"""
+
+    def __init__(self, rate: float, burst: int, payload):
+        self.rate, self.burst = rate, burst
+        self.tokens, self.updated = float(burst), time.monotonic()
+        self.body = json.dumps(payload).encode()
+        self.rejected = 0
+
+    def __call__(self, method: str, path: str, body: bytes):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            self.rejected += 1
+            return 429, b'{"error": "rate limited"}'
+        self.tokens -= 1
+        return 200, self.body
+
+
+async def burst(pool: HttpClientPool, places: int) -> tuple:
+    geo = GeoRepo(
+        http=pool,
+        stats={"nominatim": ProviderStats(), "photon": ProviderStats()},
+        cache=TieredCache(memory=TTLCache(max_entries=100)),
+    )
+
+    async def one(index: int) -> tuple:
+        start = time.perf_counter()
+        result = await geo.get_coordinates(f"Town {index}")
+        return result is not None, time.perf_counter() - start
+
+    results = await asyncio.gather(*(one(i) for i in range(places)))
+    latencies = sorted(elapsed for _, elapsed in results)
+    return sum(1 for ok, _ in results if ok), latencies
+
+
+async def main(places: int, latency_ms: float) -> None:
+    settings.GAZETTEER_ENABLED = False  # Force the geocoder path
+    delay = latency_ms / 1000
+    nominatim = PolicyHandler(1.0, 1, [{"lat": "45.0", "lon": "7.0", "display_name": "Town"}])
+    photon = PolicyHandler(5.0, 5, {"features": [{"geometry": {"coordinates": [7.0, 45.0]}, "properties": {"name": "Town"}}]})
+
+    async with StubServer(nominatim, response_delay=delay) as nominatim_stub, \
+            StubServer(photon, response_delay=delay) as photon_stub:
+        settings.NOMINATIM_URL = f"{nominatim_stub.url}/search"
+        settings.PHOTON_URL = f"{photon_stub.url}/api/"
+        pool = HttpClientPool()
+        await pool.start()
+
+        results = {}
+        for label, enabled in (("no limiter", False), ("rate limited", True)):
+            settings.RATE_LIMIT_ENABLED = enabled
+            nominatim.rejected = photon.rejected = 0
+            await asyncio.sleep(1.5)  # Let the server-side buckets refill between runs
+            start = time.perf_counter()
+            ok, latencies = await burst(pool, places)
+            wall = time.perf_counter() - start
+            results[label] = (ok, nominatim.rejected + photon.rejected, wall, latencies)
+        await pool.aclose()
+
+    print(f"{places} distinct geocodes at once; Nominatim allows 1/s, Photon 5/s; upstream latency {latency_ms:.0f} ms")
+    print(f"{'mode':<14}{'resolved':>10}{'429s':>7}{'wall ms':>9}{'p50 ms':>8}{'max ms':>8}")
+    for label, (ok, rejected, wall, latencies) in results.items():
+        print(f"{label:<14}{ok:>7}/{places:<2}{rejected:>7}{wall * 1000:>9.0f}"
+              f"{latencies[len(latencies) // 2] * 1000:>8.0f}{latencies[-1] * 1000:>8.0f}")
+    for name in ("nominatim", "photon"):
+        print(f"{name}: {rate_limiters[name].stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--places", type=int, default=15)
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.places, args.latency_ms))
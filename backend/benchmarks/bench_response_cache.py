@@ -0,0 +1,109 @@
+"""
+Benchmark: paraphrased repeat questions with and without the response cache
+Replays chat turns that ask the same few things in different words ("top things to do in
+Paris", "what should I see in Paris?") through the full graph, with a stand-in Gemini model
+and stand-in Open-Meteo / Overpass data. Halfway through, the weather cache is cleared to
+simulate an Open-Meteo update, which must invalidate every cached weather answer.
+
+Usage (from the backend directory):
+    AI_PROVIDER=gemini GEMINI_API_KEY=dummy LLM_CACHE_DISK_ENABLED=false \\
+        python -m benchmarks.bench_response_cache --turns 60 --llm-ms 400
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.models.weather_models import WeatherData
+from app.repos.weather_repo import weather_cache
+from app.services.ai_client import ai_client, llm_cache
+from app.services.langgraph_tourism import langgraph_tourism_agent
+from app.services.response_cache import response_cache, response_cache_stats
+
+PARAPHRASES = [
+    "What places should I visit in {city}?",
+    "Top things to do in {city}",
+    "What should I see in {city}?",
+    "Best attractions in {city}",
+    "What's the weather in {city}?",
+    "Weather in {city} right now",
+    "Help me plan 3 days in {city}",
+    "Plan a three day trip to {city}",
+    "Things to do in {city} with kids",
+]
+CITIES = ["Paris", "Tokyo", "Rome"]
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeModel:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    async def generate_content_async(self, prompt, generation_config=None, stream=False):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if "You are a travel planning AI" in prompt:
+            return FakeResponse(json.dumps({"execution_plan": ["Check weather", "Plan days"], "travel_tips": "Walk."}))
+        return FakeResponse("Here is your answer.")
+
+
+async def replay(turns: list, enabled: bool, model: FakeModel) -> tuple:
+    settings.RESPONSE_CACHE_ENABLED = enabled
+    response_cache.memory.clear()
+    weather_cache.clear()
+    response_cache_stats.update(hits=0, misses=0, stores=0, weather_invalidations=0)
+    model.calls = 0
+    start = time.perf_counter()
+    for index, query in enumerate(turns):
+        if index == len(turns) // 2:
+            weather_cache.clear()  # Open-Meteo published new conditions
+        await langgraph_tourism_agent.process_query(query)
+    return time.perf_counter() - start, model.calls, dict(response_cache_stats)
+
+
+async def main(turns: int, llm_ms: float) -> None:
+    if ai_client.provider != "gemini":
+        sys.exit("Set AI_PROVIDER=gemini (and any GEMINI_API_KEY) to run this benchmark")
+    model = FakeModel(llm_ms / 1000)
+    ai_client.primary.gemini_model = model
+    # Measure the response cache on its own
+    settings.LLM_CACHE_ENABLED = False
+    llm_cache.memory.clear()
+
+    async def fake_weather(lat, lon):
+        return WeatherData(temperature=21.0, precipitation_probability=10)
+
+    async def fake_places(lat, lon, limit=5):
+        return ["Museum", "Old Town", "Cathedral", "Park", "Market"][:limit]
+
+    langgraph_tourism_agent.weather_repo._fetch_current_weather = fake_weather
+    langgraph_tourism_agent.places_repo.get_tourist_attractions = fake_places
+
+    random.seed(11)
+    sequence = [random.choice(PARAPHRASES).format(city=random.choice(CITIES)) for _ in range(turns)]
+
+    print(f"{turns} turns over {len(PARAPHRASES)} phrasings x {len(CITIES)} cities, stand-in LLM latency {llm_ms:.0f} ms")
+    print(f"{'mode':<16}{'wall s':>9}{'llm calls':>11}{'hits':>7}{'misses':>8}{'weather invalidated':>21}")
+    for label, enabled in (("no cache", False), ("response cache", True)):
+        elapsed, calls, stats = await replay(sequence, enabled, model)
+        print(f"{label:<16}{elapsed:>9.2f}{calls:>11}{stats['hits']:>7}{stats['misses']:>8}"
+              f"{stats['weather_invalidations']:>21}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=60)
+    parser.add_argument("--llm-ms", type=float, default=400.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.turns, args.llm_ms))
@@ -0,0 +1,115 @@
+"""
+Benchmark: a long conversation - client-resent conversation_history vs server-side sessions
+Plays one session of N turns through the real /api/tourism/chat route (in-process ASGI)
+with a stand-in Gemini model that answers instantly with a typical ~1.2 KB reply and
+stand-in weather data. Reports request/response bytes, server time, and the time pydantic
+spends validating the request and serialising the response models for that turn. In legacy
+mode the client resends the whole history and the server echoes it back. With sessions,
+only the session ID travels and the response carries only the new turn.
+
+Usage (from the backend directory):
+    AI_PROVIDER=gemini GEMINI_API_KEY=dummy LLM_CACHE_DISK_ENABLED=false \\
+        python -m benchmarks.bench_sessions --turns 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from app.core.config import settings
+from app.models.agent_models import AgentResponse, UserQuery
+from app.models.weather_models import WeatherData
+from app.main import app
+from app.repos.session_repo import MemorySessionStore, SQLiteSessionStore, session_repo
+from app.services.ai_client import ai_client
+from app.services.langgraph_tourism import langgraph_tourism_agent
+
+ANSWER = ("Paris is lovely right now - around 18°C with a light breeze and only a small chance of rain. "
+          "A great day for the Louvre, a walk along the Seine and an evening in Montmartre. ") * 7
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeModel:
+    async def generate_content_async(self, prompt, generation_config=None, stream=False):
+        return FakeResponse(ANSWER)
+
+
+def model_cost(payload: str, response: bytes, repeat: int = 20) -> float:
+    """Seconds pydantic spends on one turn's request and response models"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        UserQuery.model_validate_json(payload)
+        AgentResponse.model_validate_json(response).model_dump_json()
+    return (time.perf_counter() - start) / repeat
+
+
+async def play(client: httpx.AsyncClient, turns: int, legacy: bool) -> list:
+    """Returns (request bytes, response bytes, seconds, model seconds) per turn"""
+    history, session_id, rows = [], None, []
+    for index in range(turns):
+        body = {"query": f"What's the weather in Paris today? ({index})"}
+        if legacy:
+            body["conversation_history"] = history
+        else:
+            body["session_id"] = session_id
+        payload = json.dumps(body)
+        start = time.perf_counter()
+        response = await client.post("/api/tourism/chat", content=payload, headers={"Content-Type": "application/json"})
+        elapsed = time.perf_counter() - start
+        data = response.json()
+        if legacy:
+            history = data["conversation_history"]
+        session_id = data["session_id"]
+        rows.append((len(payload), len(response.content), elapsed, model_cost(payload, response.content)))
+    return rows
+
+
+async def main(turns: int) -> None:
+    if ai_client.provider != "gemini":
+        sys.exit("Set AI_PROVIDER=gemini (and any GEMINI_API_KEY) to run this benchmark")
+    ai_client.primary.gemini_model = FakeModel()
+    settings.LLM_CACHE_ENABLED = False
+    settings.RESPONSE_CACHE_ENABLED = False
+
+    async def fake_weather(lat, lon):
+        return WeatherData(temperature=18.0, precipitation_probability=10)
+
+    langgraph_tourism_agent.weather_repo._fetch_current_weather = fake_weather
+
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+    db_path = os.path.join(tempfile.mkdtemp(), "sessions.sqlite3")
+    modes = (
+        ("history resent (legacy)", True, MemorySessionStore(1000, 3600)),
+        ("session, memory store", False, MemorySessionStore(1000, 3600)),
+        ("session, sqlite store", False, SQLiteSessionStore(db_path, 3600)),
+    )
+    checkpoints = sorted({1, turns // 4, turns // 2, turns} - {0})
+    print(f"One {turns}-turn conversation, ~{len(ANSWER)} character answers, instant stand-in LLM")
+    print(f"{'mode':<26}{'turn':>6}{'request B':>11}{'response B':>12}{'server ms':>11}{'models ms':>11}")
+    for label, legacy, store in modes:
+        session_repo.store = store
+        rows = await play(client, turns, legacy)
+        for turn in checkpoints:
+            request_bytes, response_bytes, elapsed, models = rows[turn - 1]
+            print(f"{label:<26}{turn:>6}{request_bytes:>11}{response_bytes:>12}{elapsed * 1000:>11.1f}{models * 1000:>11.2f}")
+        total = sum(row[0] + row[1] for row in rows)
+        print(f"{label:<26}{'total':>6}{total:>23}{sum(row[2] for row in rows) * 1000:>11.0f}"
+              f"{sum(row[3] for row in rows) * 1000:>11.1f}")
+    await client.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.turns))
@@ -0,0 +1,116 @@
+"""
+Load test: thundering herd on one trending city, with and without singleflight coalescing
+Many concurrent chat turns geocode the same place and then fetch its weather and attractions
+against local stub servers (Nominatim, Open-Meteo, Overpass) with a fixed latency, starting
+from cold caches. Reports upstream requests per service and latency. A second phase cancels
+waiters mid-flight to check that the survivors still get a result from the one shared call.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_singleflight --turns 200 --latency-ms 150
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_server import StubServer, json_handler
+from benchmarks.bench_overpass_stream import overpass_payload
+from benchmarks.bench_weather_batch import open_meteo_handler
+from app.core.cache import TieredCache, TTLCache
+from app.core.config import settings
+from app.core.http_clients import HttpClientPool
+from app.repos.geo_repo import GeoRepo, geo_flight
+from app.repos.places_repo import PlacesRepo, places_flight
+from app.repos.weather_repo import WeatherRepo, weather_flight
+
+NOMINATIM_PAYLOAD = [{"lat": "48.8566", "lon": "2.3522", "display_name": "Paris, France"}]
+
+
+def overpass_handler(payload: bytes):
+    def handle(method: str, path: str, body: bytes):
+        return 200, payload
+    return handle
+
+
+async def chat_turn(geo: GeoRepo, weather: WeatherRepo, places: PlacesRepo) -> float:
+    start = time.perf_counter()
+    location = await geo.get_coordinates("Paris")
+    await asyncio.gather(
+        weather.get_current_weather(location.lat, location.lon),
+        places.get_tourist_attractions(location.lat, location.lon),
+    )
+    return time.perf_counter() - start
+
+
+def fresh_repos(pool: HttpClientPool):
+    return (
+        GeoRepo(http=pool, cache=TieredCache(memory=TTLCache(max_entries=100))),
+        WeatherRepo(http=pool, cache=TTLCache(max_entries=100)),
+        PlacesRepo(http=pool, cache=TieredCache(memory=TTLCache(max_entries=100))),
+    )
+
+
+async def cancellation_check(pool: HttpClientPool, stub: StubServer, waiters: int) -> tuple:
+    """Cancel a random half of the waiters on one cold weather cell; the rest must still succeed"""
+    _, weather, _ = fresh_repos(pool)
+    stub.reset_counters()
+    tasks = [asyncio.create_task(weather.get_current_weather(48.8566, 2.3522)) for _ in range(waiters)]
+    await asyncio.sleep(0.02)
+    cancelled = random.sample(tasks, waiters // 2)
+    for task in cancelled:
+        task.cancel()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    survivors = [r for task, r in zip(tasks, results) if task not in cancelled]
+    return sum(1 for r in survivors if r is not None and not isinstance(r, BaseException)), len(survivors), stub.requests
+
+
+async def main(turns: int, latency_ms: float) -> None:
+    settings.GAZETTEER_ENABLED = False  # Force the geocoder path
+    settings.GEO_HEDGE_ENABLED = False
+    settings.RATE_LIMIT_ENABLED = False  # Measure coalescing alone (Nominatim's 1 request/s would dominate)
+    delay = latency_ms / 1000
+    async with StubServer(json_handler(NOMINATIM_PAYLOAD), response_delay=delay) as geo_stub, \
+            StubServer(open_meteo_handler, response_delay=delay) as weather_stub, \
+            StubServer(overpass_handler(overpass_payload(300)), response_delay=delay) as places_stub:
+        settings.NOMINATIM_URL = f"{geo_stub.url}/search"
+        settings.OPEN_METEO_URL = f"{weather_stub.url}/v1/forecast"
+        settings.OVERPASS_URL = f"{places_stub.url}/api/interpreter"
+        pool = HttpClientPool()
+        await pool.start()
+
+        results = {}
+        for label, enabled in (("no coalescing", False), ("singleflight", True)):
+            settings.SINGLEFLIGHT_ENABLED = enabled
+            geo, weather, places = fresh_repos(pool)
+            for stub in (geo_stub, weather_stub, places_stub):
+                stub.reset_counters()
+            start = time.perf_counter()
+            latencies = sorted(await asyncio.gather(*(chat_turn(geo, weather, places) for _ in range(turns))))
+            wall = time.perf_counter() - start
+            results[label] = (wall, latencies, geo_stub.requests, weather_stub.requests, places_stub.requests)
+
+        settings.SINGLEFLIGHT_ENABLED = True
+        random.seed(3)
+        ok, survivors, requests = await cancellation_check(pool, weather_stub, 50)
+        await pool.aclose()
+
+    print(f"{turns} concurrent turns for one city, cold caches, simulated upstream latency {latency_ms:.0f} ms")
+    print(f"{'mode':<16}{'wall ms':>9}{'p50 ms':>8}{'p99 ms':>8}{'nominatim':>11}{'open-meteo':>12}{'overpass':>10}")
+    for label, (wall, latencies, geo_req, weather_req, places_req) in results.items():
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"{label:<16}{wall * 1000:>9.0f}{latencies[len(latencies) // 2] * 1000:>8.0f}{p99 * 1000:>8.0f}"
+              f"{geo_req:>11}{weather_req:>12}{places_req:>10}")
+    print(f"coalesced callers: geo {geo_flight.coalesced}, weather {weather_flight.coalesced}, places {places_flight.coalesced}")
+    print(f"cancellation: {ok}/{survivors} surviving waiters got weather from {requests} upstream request(s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=150.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.turns, args.latency_ms))
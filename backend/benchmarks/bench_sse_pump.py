@@ -0,0 +1,77 @@
+"""
+Benchmark: 100 ms polling SSE pump vs the event-driven pump used by /chat/stream
+Opens many concurrent streams whose query task is mostly idle (as while waiting on the LLM),
+then measures process CPU time per idle stream-second and the delay between the task
+finishing and the consumer seeing the end of the stream.
+
+Usage (from the backend directory):
+    AI_PROVIDER=gemini GEMINI_API_KEY=dummy python -m benchmarks.bench_sse_pump --streams 500 --idle-s 2
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.routes.tourism_routes import pump_events
+
+
+async def poll_events(queue: asyncio.Queue, task: asyncio.Task):
+    """Old behaviour: wake up every 100 ms to check whether the task is done"""
+    while not task.done() or not queue.empty():
+        try:
+            yield await asyncio.wait_for(queue.get(), timeout=0.1)
+        except asyncio.TimeoutError:
+            continue
+
+
+async def fake_query(queue: asyncio.Queue, idle: float, finished: list) -> None:
+    """Reasoning step, long idle wait (LLM call), last answer token, graph wrap-up, done"""
+    await queue.put({"type": "reasoning"})
+    await asyncio.sleep(idle)
+    await queue.put({"type": "delta"})
+    await asyncio.sleep(0.005)  # Final state assembly / suggestions after the last token
+    finished.append(time.perf_counter())
+
+
+async def one_stream(pump, idle: float) -> float:
+    queue, finished = asyncio.Queue(), []
+    task = asyncio.create_task(fake_query(queue, idle, finished))
+    async for _ in pump(queue, task):
+        pass
+    ended = time.perf_counter()
+    await task
+    return ended - finished[0]
+
+
+async def measure(pump, streams: int, idle: float):
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    delays = await asyncio.gather(*(one_stream(pump, idle) for _ in range(streams)))
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    delays = sorted(delays)
+    p99 = delays[min(len(delays) - 1, int(len(delays) * 0.99))]
+    return cpu, wall, statistics.median(delays), p99
+
+
+async def main(streams: int, idle: float) -> None:
+    results = {}
+    for label, pump in (("poll every 100 ms", poll_events), ("event-driven", pump_events)):
+        results[label] = await measure(pump, streams, idle)
+
+    print(f"{streams} concurrent streams, {idle:.1f} s idle each")
+    print(f"{'pump':<20}{'cpu ms':>10}{'cpu us/stream-s':>18}{'end p50 ms':>12}{'end p99 ms':>12}")
+    for label, (cpu, wall, p50, p99) in results.items():
+        per_stream = cpu / (streams * idle) * 1e6
+        print(f"{label:<20}{cpu * 1000:>10.1f}{per_stream:>18.1f}{p50 * 1000:>12.2f}{p99 * 1000:>12.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--streams", type=int, default=500)
+    parser.add_argument("--idle-s", type=float, default=2.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.streams, args.idle_s))
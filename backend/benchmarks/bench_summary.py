@@ -0,0 +1,124 @@
+"""
+Benchmark: prompt context over a long session - full history vs recent turns vs rolling summary
+Plays one session of N turns through the real /api/tourism/chat route (in-process ASGI) with
+a stand-in Gemini model whose latency grows with prompt length (50 ms + 0.1 ms per prompt
+token, a rough prefill cost) and stand-in weather data. The first turn states a preference
+("vegetarian, travelling with a toddler") that later answers should still honour. Reports the
+largest prompt of each checkpoint turn, the turn's server time, and whether that preference
+still reached the prompt. The stand-in summariser keeps the first sentence of each folded user
+message. Summary updates run in the background; the benchmark waits for them between turns.
+
+Usage (from the backend directory):
+    AI_PROVIDER=gemini GEMINI_API_KEY=dummy LLM_CACHE_DISK_ENABLED=false \\
+        python -m benchmarks.bench_summary --turns 40
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from app.core.config import settings
+from app.models.weather_models import WeatherData
+from app.main import app
+from app.repos.session_repo import MemorySessionStore, session_repo
+from app.services import conversation_summary
+from app.services.ai_client import ai_client, estimate_tokens
+from app.services.langgraph_tourism import langgraph_tourism_agent
+
+FIRST_QUERY = "We're vegetarian and travelling with a toddler. What's the weather in Kyoto today?"
+ANSWER = ("Kyoto is mild today - around 18°C with a light breeze and only a small chance of rain. "
+          "A good day for Fushimi Inari in the morning, a walk through Gion and dinner in Pontocho. ") * 6
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeModel:
+    """Answers after a delay that grows with the prompt; records the prompt sizes of the current turn"""
+
+    def __init__(self):
+        self.prompts = []
+
+    async def generate_content_async(self, prompt, generation_config=None, stream=False):
+        await asyncio.sleep(0.05 + estimate_tokens(prompt) * 0.0001)
+        if "You maintain the running summary" in prompt:
+            previous = prompt.split("Current summary:\n", 1)[1].split("\n\nNew messages:", 1)[0]
+            folded = re.findall(r"^user: ([^.?!]*[.?!])", prompt, re.M)
+            kept = [] if previous == "(none yet)" else [previous]
+            return FakeResponse(" ".join(kept + [f"The traveller said: {sentence}" for sentence in folded]))
+        self.prompts.append(prompt)
+        return FakeResponse(ANSWER)
+
+
+async def play(client: httpx.AsyncClient, model: FakeModel, turns: int) -> list:
+    """Returns (largest prompt tokens, seconds, preference in prompt) per turn"""
+    session_id, rows = None, []
+    for index in range(turns):
+        query = FIRST_QUERY if index == 0 else f"What's the weather in Kyoto today? ({index})"
+        model.prompts = []
+        start = time.perf_counter()
+        response = await client.post("/api/tourism/chat", content=json.dumps({"query": query, "session_id": session_id}),
+                                     headers={"Content-Type": "application/json"})
+        elapsed = time.perf_counter() - start
+        session_id = response.json()["session_id"]
+        largest = max(model.prompts, key=len)
+        rows.append((estimate_tokens(largest), elapsed, "vegetarian" in largest))
+        # Summaries are folded between turns, as they would be while the user reads the answer
+        await asyncio.gather(*list(conversation_summary._background_tasks))
+    return rows
+
+
+async def main(turns: int) -> None:
+    if ai_client.provider != "gemini":
+        sys.exit("Set AI_PROVIDER=gemini (and any GEMINI_API_KEY) to run this benchmark")
+    model = FakeModel()
+    ai_client.primary.gemini_model = model
+    settings.LLM_CACHE_ENABLED = False
+    settings.RESPONSE_CACHE_ENABLED = False
+
+    async def fake_weather(lat, lon):
+        return WeatherData(temperature=18.0, precipitation_probability=10)
+
+    langgraph_tourism_agent.weather_repo._fetch_current_weather = fake_weather
+
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+    unlimited = 10 ** 9
+    modes = (
+        ("full history", dict(SUMMARY_ENABLED=False, CONVERSATION_CONTEXT_TOKENS=unlimited,
+                              CONVERSATION_MESSAGE_MAX_TOKENS=unlimited, SESSION_MAX_MESSAGES=unlimited)),
+        ("recent turns only", dict(SUMMARY_ENABLED=False)),
+        ("rolling summary", dict(SUMMARY_ENABLED=True)),
+    )
+    defaults = {name: getattr(settings, name) for name in modes[0][1]}
+    checkpoints = sorted({1, 2, turns // 4, turns // 2, turns} - {0})
+    print(f"One {turns}-turn session, ~{len(ANSWER)} character answers, "
+          f"{settings.CONVERSATION_CONTEXT_TOKENS}-token context budget")
+    print(f"{'mode':<20}{'turn':>6}{'prompt tokens':>15}{'server ms':>11}{'preference kept':>17}")
+    for label, overrides in modes:
+        for name, value in {**defaults, **overrides}.items():
+            setattr(settings, name, value)
+        session_repo.store = MemorySessionStore(1000, 3600)
+        rows = await play(client, model, turns)
+        for turn in checkpoints:
+            tokens, elapsed, kept = rows[turn - 1]
+            print(f"{label:<20}{turn:>6}{tokens:>15}{elapsed * 1000:>11.1f}{'yes' if kept else 'no':>17}")
+        later = rows[1:]
+        print(f"{label:<20}{'all':>6}{max(row[0] for row in rows):>15}{sum(row[1] for row in rows) * 1000:>11.0f}"
+              f"{sum(row[2] for row in later):>13}/{len(later):<3}")
+    print(f"Summary updates: {conversation_summary.summary_stats}")
+    await client.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=40)
+    args = parser.parse_args()
+    asyncio.run(main(args.turns))
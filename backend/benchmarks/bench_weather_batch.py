@@ -0,0 +1,88 @@
+"""
+Benchmark: one Open-Meteo request per location vs a single multi-coordinate batch request
+Runs WeatherRepo against a local stub server that answers like Open-Meteo (a JSON array
+when several coordinates are requested) and charges a fixed per-request latency.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_weather_batch --locations 5 --latency-ms 120
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_server import StubServer
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.http_clients import HttpClientPool
+from app.repos.weather_repo import WeatherRepo, weather_cache_stats
+
+# Rome, Florence, Venice, Milan, Naples, Turin, Bologna, Verona
+CITIES = [
+    (41.9028, 12.4964), (43.7696, 11.2558), (45.4408, 12.3155), (45.4642, 9.19),
+    (40.8518, 14.2681), (45.0703, 7.6869), (44.4949, 11.3426), (45.4384, 10.9916),
+]
+
+
+def open_meteo_handler(method: str, path: str, body: bytes):
+    """Echo one forecast per requested coordinate, as Open-Meteo does"""
+    query = parse_qs(urlsplit(path).query)
+    lats = query["latitude"][0].split(",")
+    forecasts = [
+        {
+            "latitude": float(lat),
+            "current_weather": {"temperature": 20.0 + i, "windspeed": 8.0, "weathercode": 1},
+            "hourly": {"precipitation_probability": [10, 20, 30, 10, 0, 0]},
+        }
+        for i, lat in enumerate(lats)
+    ]
+    payload = forecasts[0] if len(forecasts) == 1 else forecasts
+    return 200, json.dumps(payload).encode()
+
+
+async def run_individual(repo: WeatherRepo, coordinates) -> list:
+    """Old behaviour: one request per location (sequential, as the graph did per city)"""
+    return [await repo.get_current_weather(lat, lon) for lat, lon in coordinates]
+
+
+async def run_batched(repo: WeatherRepo, coordinates) -> list:
+    """New behaviour: every uncached location in one request"""
+    return await repo.get_current_weather_batch(coordinates)
+
+
+async def main(locations: int, latency_ms: float) -> None:
+    coordinates = CITIES[:locations]
+    async with StubServer(open_meteo_handler, response_delay=latency_ms / 1000) as stub:
+        settings.OPEN_METEO_URL = f"{stub.url}/v1/forecast"
+        pool = HttpClientPool()
+        await pool.start()
+
+        results = {}
+        for label, runner in (("one request per city", run_individual), ("batched", run_batched)):
+            # Fresh cache each run so both modes go to the network
+            repo = WeatherRepo(http=pool, cache=TTLCache(max_entries=100))
+            stub.reset_counters()
+            start = time.perf_counter()
+            weathers = await runner(repo, coordinates)
+            elapsed = time.perf_counter() - start
+            results[label] = (elapsed, stub.requests, sum(1 for w in weathers if w))
+        await pool.aclose()
+
+    print(f"{locations} locations, simulated Open-Meteo latency {latency_ms:.0f} ms")
+    print(f"{'mode':<24}{'ms':>10}{'requests':>10}{'results':>10}")
+    for label, (elapsed, requests, count) in results.items():
+        print(f"{label:<24}{elapsed * 1000:>10.1f}{requests:>10}{count:>10}")
+    print(f"batch requests recorded: {weather_cache_stats['batch_requests']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--locations", type=int, default=5, choices=range(1, len(CITIES) + 1))
+    parser.add_argument("--latency-ms", type=float, default=120.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.locations, args.latency_ms))
@@ -0,0 +1,116 @@
+"""
+Minimal local HTTP/1.1 stub server used by the benchmarks
+Supports keep-alive, counts accepted connections and requests, and can simulate
+connection setup cost (DNS/TCP/TLS handshake) and per-request latency
+"""
+import asyncio
+import json
+from typing import Callable, Dict, Optional, Tuple
+
+Handler = Callable[[str, str, bytes], Tuple[int, bytes]]
+
+
+def json_handler(payload) -> Handler:
+    """Handler that returns the same JSON body for every request"""
+    body = json.dumps(payload).encode()
+
+    def handle(method: str, path: str, request_body: bytes) -> Tuple[int, bytes]:
+        return 200, body
+
+    return handle
+
+
+class StubServer:
+    def __init__(
+        self,
+        handler: Handler,
+        handshake_delay: float = 0.0,
+        response_delay: float = 0.0,
+        chunk_size: Optional[int] = None,
+        chunk_delay: float = 0.0,
+    ):
+        self.handler = handler
+        self.handshake_delay = handshake_delay
+        self.response_delay = response_delay
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        self.connections = 0
+        self.requests = 0
+        self.bytes_sent = 0
+        self._server: Optional[asyncio.base_events.Server] = None
+        self.port: Optional[int] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def reset_counters(self) -> None:
+        self.connections = 0
+        self.requests = 0
+        self.bytes_sent = 0
+
+    async def __aenter__(self) -> "StubServer":
+        self._server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        method, path, _ = request_line.decode().split(" ", 2)
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode().partition(":")
+            headers[key.strip().lower()] = value.strip()
+        body = b""
+        if "content-length" in headers:
+            body = await reader.readexactly(int(headers["content-length"]))
+        return method, path, headers, body
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        if self.handshake_delay:
+            # Stand-in for the DNS + TCP + TLS round-trips a fresh connection costs
+            await asyncio.sleep(self.handshake_delay)
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                self.requests += 1
+                if self.response_delay:
+                    await asyncio.sleep(self.response_delay)
+                status, payload = self.handler(method, path, body)
+                head = (
+                    f"HTTP/1.1 {status} OK\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"Connection: keep-alive\r\n\r\n"
+                ).encode()
+                writer.write(head)
+                if self.chunk_size:
+                    for start in range(0, len(payload), self.chunk_size):
+                        writer.write(payload[start:start + self.chunk_size])
+                        self.bytes_sent += min(self.chunk_size, len(payload) - start)
+                        await writer.drain()
+                        if self.chunk_delay:
+                            await asyncio.sleep(self.chunk_delay)
+                else:
+                    writer.write(payload)
+                    self.bytes_sent += len(payload)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionResetError, BrokenPipeError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
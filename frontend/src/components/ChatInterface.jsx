@@ -18,6 +18,9 @@ function ChatInterface() {
   const [isLoading, setIsLoading] = useState(false);
   const [currentReasoning, setCurrentReasoning] = useState([]);
   const [isThinkingComplete, setIsThinkingComplete] = useState(false);
+  const [streamingText, setStreamingText] = useState('');
+  // Conversation history is kept server-side under this ID (returned with every answer)
+  const [sessionId, setSessionId] = useState(null);
   const messagesEndRef = useRef(null);
 
   const scrollToBottom = () => {
@@ -44,16 +47,9 @@ function ChatInterface() {
     setIsLoading(true);
     setCurrentReasoning([]);
     setIsThinkingComplete(false);
+    setStreamingText('');
 
     try {
-      // Build conversation history
-      const conversationHistory = messages
-        .filter(msg => !msg.timestamp || messages.indexOf(msg) > 0)
-        .map(msg => ({
-          role: msg.role,
-          content: msg.content
-        }));
-
       // Use fetch with streaming for SSE
       const response = await fetch(`${API_BASE_URL}/tourism/chat/stream`, {
         method: 'POST',
@@ -62,7 +58,7 @@ function ChatInterface() {
         },
         body: JSON.stringify({
           query: queryText,
-          conversation_history: conversationHistory,
+          session_id: sessionId,
         }),
       });
 
@@ -84,8 +80,12 @@ function ChatInterface() {
             
             if (data.type === 'reasoning') {
               setCurrentReasoning(prev => [...prev, data.data]);
+            } else if (data.type === 'delta') {
+              setIsThinkingComplete(true);
+              setStreamingText(prev => prev + data.data);
             } else if (data.type === 'complete') {
               setIsThinkingComplete(true);
+              setSessionId(data.data.session_id);
               const assistantMessage = {
                 role: 'assistant',
                 content: data.data.final_response,
@@ -95,6 +95,7 @@ function ChatInterface() {
               };
               setMessages((prev) => [...prev, assistantMessage]);
               setCurrentReasoning([]);
+              setStreamingText('');
             } else if (data.type === 'error') {
               throw new Error(data.message);
             }
@@ -110,6 +111,7 @@ function ChatInterface() {
       };
       setMessages((prev) => [...prev, errorMessage]);
       setCurrentReasoning([]);
+      setStreamingText('');
     } finally {
       setIsLoading(false);
       setIsThinkingComplete(false);
@@ -152,16 +154,9 @@ function ChatInterface() {
                 setIsLoading(true);
                 setCurrentReasoning([]);
                 setIsThinkingComplete(false);
+                setStreamingText('');
 
                 try {
-                  // Build conversation history
-                  const conversationHistory = messages
-                    .filter(msg => !msg.timestamp || messages.indexOf(msg) > 0)
-                    .map(msg => ({
-                      role: msg.role,
-                      content: msg.content
-                    }));
-
                   // Use fetch with streaming
                   const response = await fetch(`${API_BASE_URL}/tourism/chat/stream`, {
                     method: 'POST',
@@ -170,7 +165,7 @@ function ChatInterface() {
                     },
                     body: JSON.stringify({
                       query: query,
-                      conversation_history: conversationHistory,
+                      session_id: sessionId,
                     }),
                   });
 
@@ -192,8 +187,12 @@ function ChatInterface() {
                         
                         if (data.type === 'reasoning') {
                           setCurrentReasoning(prev => [...prev, data.data]);
+                        } else if (data.type === 'delta') {
+                          setIsThinkingComplete(true);
+                          setStreamingText(prev => prev + data.data);
                         } else if (data.type === 'complete') {
                           setIsThinkingComplete(true);
+                          setSessionId(data.data.session_id);
                           const assistantMessage = {
                             role: 'assistant',
                             content: data.data.final_response,
@@ -203,6 +202,7 @@ function ChatInterface() {
                           };
                           setMessages((prev) => [...prev, assistantMessage]);
                           setCurrentReasoning([]);
+                          setStreamingText('');
                         } else if (data.type === 'error') {
                           throw new Error(data.message);
                         }
@@ -218,6 +218,7 @@ function ChatInterface() {
                   };
                   setMessages((prev) => [...prev, errorMessage]);
                   setCurrentReasoning([]);
+                  setStreamingText('');
                 } finally {
                   setIsLoading(false);
                   setIsThinkingComplete(false);
@@ -231,11 +232,15 @@ function ChatInterface() {
                 reasoningSteps={currentReasoning} 
                 isComplete={isThinkingComplete} 
               />
-              <div className="flex justify-start animate-fadeIn">
-                <div className="bg-white/20 backdrop-blur-md rounded-2xl px-5 py-4 border border-white/30">
-                  <LoadingDots />
+              {streamingText ? (
+                <MessageBubble message={{ role: 'assistant', content: streamingText, timestamp: new Date() }} />
+              ) : (
+                <div className="flex justify-start animate-fadeIn">
+                  <div className="bg-white/20 backdrop-blur-md rounded-2xl px-5 py-4 border border-white/30">
+                    <LoadingDots />
+                  </div>
                 </div>
-              </div>
+              )}
             </>
           )}
           <div ref={messagesEndRef} />